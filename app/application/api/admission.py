@@ -0,0 +1,54 @@
+from collections.abc import AsyncIterator
+from math import ceil
+from typing import Annotated
+
+from fastapi import (
+    Depends,
+    Request,
+    status,
+)
+from fastapi.responses import JSONResponse
+
+from application.api.dependencies import provide
+from infra.metrics.instruments import APPLICATION_EXCEPTIONS
+from logic.exceptions.admission import OverloadedException
+from logic.services.admission import AdmissionService
+from logic.services.rate_limits import RateLimiter
+
+
+async def admit_read(
+    admission: Annotated[AdmissionService, Depends(provide(AdmissionService))],
+) -> AsyncIterator[None]:
+    """Holds a read slot while the request runs; saturated reads are rejected with 429."""
+    async with admission.read.admit():
+        yield
+
+
+async def admit_write(
+    admission: Annotated[AdmissionService, Depends(provide(AdmissionService))],
+) -> AsyncIterator[None]:
+    """Holds a write slot while the request runs; saturated writes are rejected with 429."""
+    async with admission.write.admit():
+        yield
+
+
+async def limit_rate(
+    request: Request,
+    rate_limiter: Annotated[RateLimiter, Depends(provide(RateLimiter))],
+):
+    """Rejects the request with 429 when its client, or the wallet in its path, is over the rate limit.
+
+    Clients are counted by address, never by a header they choose themselves. Behind a proxy, uvicorn must trust
+    its ``X-Forwarded-For`` header (``--forwarded-allow-ips``), or every client counts as the proxy.
+    """
+    client = request.client.host if request.client else None
+    await rate_limiter.check(wallet_oid=request.path_params.get("wallet_uuid"), client=client)
+
+
+async def overloaded_exception_handler(request: Request, exception: OverloadedException) -> JSONResponse:
+    APPLICATION_EXCEPTIONS.labels(type(exception).__name__).inc()
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": {"error": exception.message}},
+        headers={"Retry-After": str(ceil(exception.retry_after))},
+    )
@@ -0,0 +1,33 @@
+from collections.abc import Callable
+from typing import (
+    Annotated,
+    TypeVar,
+)
+from weakref import WeakKeyDictionary
+
+from fastapi import Depends
+
+from punq import Container
+
+from logic.initial_container import init_container
+
+
+T = TypeVar("T")
+
+
+def provide(dependency: type[T]) -> Callable[[Container], T]:
+    """Builds a FastAPI dependency that returns ``dependency`` from the application container.
+
+    The instance is resolved once per container and reused by later requests, so a request only pays for a
+    dictionary lookup. The container still comes from ``init_container``, which keeps ``dependency_overrides``
+    working.
+    """
+    instances: WeakKeyDictionary[Container, T] = WeakKeyDictionary()
+
+    async def resolve(container: Annotated[Container, Depends(init_container)]) -> T:
+        instance = instances.get(container)
+        if instance is None:
+            instance = instances[container] = container.resolve(dependency)
+        return instance
+
+    return resolve
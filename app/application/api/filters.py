@@ -10,3 +10,4 @@ class PaginationOut(BaseModel):
 class PaginationIn(BaseModel):
     offset: int = 0
     limit: int = 20
+    cursor: str | None = None
@@ -0,0 +1,63 @@
+from typing import Annotated
+
+from fastapi import (
+    Depends,
+    HTTPException,
+    status,
+)
+from fastapi.routing import APIRouter
+
+from punq import Container
+
+from application.api.dependencies import provide
+from application.api.internal.schemas import (
+    OutCacheStatsSchema,
+    OutPoolStatsSchema,
+)
+from application.api.schemas import ErrorSchema
+from infra.cache.wallets import BaseWalletCache
+from infra.database.manager import DatabaseManager
+from logic.initial_container import init_container
+from settings.config import Settings
+
+
+router = APIRouter(
+    tags=["Internal"],
+)
+
+
+@router.get(
+    "/cache",
+    status_code=status.HTTP_200_OK,
+    description="Wallet cache counters",
+    responses={
+        status.HTTP_200_OK: {"model": OutCacheStatsSchema},
+        status.HTTP_404_NOT_FOUND: {"model": ErrorSchema},
+    },
+)
+async def get_cache_stats_handler(
+    settings: Annotated[Settings, Depends(provide(Settings))],
+    container: Annotated[Container, Depends(init_container)],
+) -> OutCacheStatsSchema:
+    if not settings.WALLET_CACHE_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"error": "Wallet cache is disabled"},
+        )
+
+    cache: BaseWalletCache = container.resolve(BaseWalletCache)
+    return OutCacheStatsSchema.from_stats(stats=cache.stats(), size=len(cache))
+
+
+@router.get(
+    "/pool",
+    status_code=status.HTTP_200_OK,
+    description="Database connection pool usage and checkout wait time",
+    responses={
+        status.HTTP_200_OK: {"model": OutPoolStatsSchema},
+    },
+)
+async def get_pool_stats_handler(
+    database_manager: Annotated[DatabaseManager, Depends(provide(DatabaseManager))],
+) -> OutPoolStatsSchema:
+    return OutPoolStatsSchema.from_stats(stats=database_manager.pool_stats())
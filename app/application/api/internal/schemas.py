@@ -0,0 +1,42 @@
+from pydantic import BaseModel
+
+from infra.cache.lru import CacheStats
+from infra.database.pool import PoolStats
+
+
+class OutCacheStatsSchema(BaseModel):
+    size: int
+    hits: int
+    misses: int
+    evictions: int
+
+    @classmethod
+    def from_stats(cls, stats: CacheStats, size: int) -> "OutCacheStatsSchema":
+        return cls(
+            size=size,
+            hits=stats.hits,
+            misses=stats.misses,
+            evictions=stats.evictions,
+        )
+
+
+class OutPoolStatsSchema(BaseModel):
+    size: int
+    checked_out: int
+    idle: int
+    overflow: int
+    checkouts: int
+    wait_time_total_ms: float
+    wait_time_max_ms: float
+
+    @classmethod
+    def from_stats(cls, stats: PoolStats) -> "OutPoolStatsSchema":
+        return cls(
+            size=stats.size,
+            checked_out=stats.checked_out,
+            idle=stats.idle,
+            overflow=stats.overflow,
+            checkouts=stats.checkouts,
+            wait_time_total_ms=stats.total_wait * 1000,
+            wait_time_max_ms=stats.max_wait * 1000,
+        )
@@ -1,18 +1,44 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import (
+    asynccontextmanager,
+    suppress,
+)
 
+from application.api.admission import overloaded_exception_handler
+from application.api.internal.handlers import router as internal_router
+from application.api.metrics.handlers import router as metrics_router
+from application.api.metrics.middlewares import MetricsMiddleware
+from application.api.middlewares import ClientMiddleware
 from application.api.wallets.v1.handlers import router as wallet_router
 from fastapi import FastAPI
 from infra.database.manager import DatabaseManager
+from logic.exceptions.admission import OverloadedException
 from logic.initial_container import init_container
+from logic.services.events import BaseWalletEventService
 from punq import Container
+from settings.config import Settings
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     container: Container = init_container()
-    database_manager: DatabaseManager = container.resolve(DatabaseManager)
-    await database_manager.init_models()
-    yield
+    settings: Settings = container.resolve(Settings)
+    if settings.REPOSITORY_BACKEND == "sqlalchemy":
+        database_manager: DatabaseManager = container.resolve(DatabaseManager)
+        await database_manager.init_models()
+
+    if not settings.WALLET_EVENTS_ENABLED:
+        yield
+        return
+
+    event_service: BaseWalletEventService = container.resolve(BaseWalletEventService)
+    dispatcher = asyncio.create_task(event_service.run_dispatcher())
+    try:
+        yield
+    finally:
+        dispatcher.cancel()
+        with suppress(asyncio.CancelledError):
+            await dispatcher
 
 
 def create_app() -> FastAPI:
@@ -23,5 +49,10 @@ def create_app() -> FastAPI:
         lifespan=lifespan,
     )
     app.include_router(wallet_router, prefix="/v1/wallets")
+    app.include_router(internal_router, prefix="/internal")
+    app.include_router(metrics_router)
+    app.add_exception_handler(OverloadedException, overloaded_exception_handler)
+    app.add_middleware(ClientMiddleware)
+    app.add_middleware(MetricsMiddleware)
 
     return app
@@ -0,0 +1,26 @@
+from fastapi import status
+from fastapi.responses import Response
+from fastapi.routing import APIRouter
+
+from infra.metrics.registry import (
+    CONTENT_TYPE,
+    REGISTRY,
+)
+
+
+router = APIRouter(
+    tags=["Metrics"],
+)
+
+
+@router.get(
+    "/metrics",
+    status_code=status.HTTP_200_OK,
+    description="Metrics in the Prometheus text exposition format",
+    response_class=Response,
+    responses={
+        status.HTTP_200_OK: {"content": {"text/plain": {}}},
+    },
+)
+async def get_metrics_handler() -> Response:
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
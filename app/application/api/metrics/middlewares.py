@@ -0,0 +1,46 @@
+from time import perf_counter
+
+from starlette.types import (
+    ASGIApp,
+    Message,
+    Receive,
+    Scope,
+    Send,
+)
+
+from infra.metrics.instruments import HTTP_REQUEST_DURATION
+
+
+class MetricsMiddleware:
+    """Records the latency of every HTTP request, labelled by method, handler name and response status.
+
+    A plain ASGI middleware: unlike ``BaseHTTPMiddleware`` it does not run the endpoint in a separate task or
+    buffer the response. Requests that match no route are labelled ``unmatched`` to keep the label set bounded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # the router adds the matched endpoint to the scope it was given
+            endpoint = scope.get("endpoint")
+            handler = endpoint.__name__ if endpoint is not None else "unmatched"
+            HTTP_REQUEST_DURATION.labels(scope["method"], handler, str(status_code)).observe(
+                perf_counter() - started,
+            )
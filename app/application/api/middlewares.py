@@ -0,0 +1,66 @@
+from starlette.types import (
+    ASGIApp,
+    Message,
+    Receive,
+    Scope,
+    Send,
+)
+
+from infra.database.replicas import (
+    current_client,
+    current_write_token,
+    WriteToken,
+)
+
+
+CLIENT_ID_HEADER = b"x-client-id"
+LAST_WRITE_HEADER = b"x-last-write"
+
+
+def parse_write_token(value: bytes | None) -> float | None:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class ClientMiddleware:
+    """Tells the database layer which client the request comes from, so its reads can follow its writes.
+
+    Clients are told apart by the ``X-Client-Id`` header, or by their address when they send none; the header
+    only routes reads, so a client can choose it freely. A response to a request that committed a write carries
+    an ``X-Last-Write`` header; a client that sends it back with its next requests reads its own writes whichever
+    worker serves them.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        client = headers.get(CLIENT_ID_HEADER)
+        if client is not None:
+            client = client.decode("latin-1")
+        elif scope.get("client"):
+            client = scope["client"][0]
+        write_token = WriteToken(seen=parse_write_token(headers.get(LAST_WRITE_HEADER)))
+
+        async def send_with_write_token(message: Message):
+            if message["type"] == "http.response.start" and write_token.written is not None:
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    (LAST_WRITE_HEADER, f"{write_token.written:.6f}".encode("latin-1")),
+                ]
+            await send(message)
+
+        client_token = current_client.set(client)
+        write_token_token = current_write_token.set(write_token)
+        try:
+            await self.app(scope, receive, send_with_write_token)
+        finally:
+            current_write_token.reset(write_token_token)
+            current_client.reset(client_token)
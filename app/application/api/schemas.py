@@ -18,3 +18,4 @@ class BaseQueryResponseSchema(BaseModel, Generic[R]):
     offset: int
     limit: int
     items: R
+    next_cursor: str | None = None
@@ -0,0 +1,52 @@
+import csv
+import io
+from collections.abc import AsyncIterator
+from enum import Enum
+
+from application.api.wallets.v1.schemas import OutTransactionSchema
+from application.api.wallets.v1.serializers import (
+    encode_transaction,
+    to_transaction_payload,
+    transaction_adapter,
+)
+from domain.entities.wallets import Transaction as TransactionEntity
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+    @property
+    def media_type(self) -> str:
+        return "application/x-ndjson" if self is ExportFormat.NDJSON else "text/csv"
+
+
+CSV_COLUMNS = list(OutTransactionSchema.model_fields)
+
+
+async def encode_ndjson(batches: AsyncIterator[list[TransactionEntity]]) -> AsyncIterator[bytes]:
+    async for transactions in batches:
+        yield b"".join(encode_transaction(transaction) + b"\n" for transaction in transactions)
+
+
+async def encode_csv(batches: AsyncIterator[list[TransactionEntity]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    yield buffer.getvalue().encode()
+
+    async for transactions in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            transaction_adapter.dump_python(to_transaction_payload(transaction), mode="json").values()
+            for transaction in transactions
+        )
+        yield buffer.getvalue().encode()
+
+
+def encode_transactions(
+    batches: AsyncIterator[list[TransactionEntity]],
+    export_format: ExportFormat,
+) -> AsyncIterator[bytes]:
+    return encode_ndjson(batches) if export_format is ExportFormat.NDJSON else encode_csv(batches)
@@ -1,29 +1,76 @@
+from datetime import (
+    date,
+    datetime,
+)
 from typing import Annotated
 
 from fastapi import (
     Depends,
+    Header,
     HTTPException,
+    Query,
     status,
 )
+from fastapi.responses import (
+    Response,
+    StreamingResponse,
+)
 from fastapi.routing import APIRouter
 
-from punq import Container
-
+from application.api.admission import (
+    admit_read,
+    admit_write,
+    limit_rate,
+)
+from application.api.dependencies import provide
 from application.api.filters import PaginationIn
 from application.api.schemas import ErrorSchema
+from application.api.wallets.v1.exports import (
+    encode_transactions,
+    ExportFormat,
+)
 from application.api.wallets.v1.schemas import (
     GetTransactionsQueryResponseSchema,
+    InBulkOperationsSchema,
     InTransactionSchema,
+    InTransferSchema,
     InWalletSchema,
+    InWalletsLookupSchema,
+    OutBulkOperationsSchema,
+    OutPeriodTotalsSchema,
+    OutStatementSchema,
     OutTransactionSchema,
+    OutTransferSchema,
     OutWalletSchema,
+    OutWalletsSchema,
+)
+from application.api.wallets.v1.serializers import (
+    encode_transaction,
+    encode_transactions_page,
+    encode_wallet,
+    encode_wallet_events,
+    encode_wallets,
+    json_response,
 )
 from domain.exceptions import ApplicationException
-from logic.initial_container import init_container
+from domain.values.cursors import TransactionCursor
+from domain.values.statements import Granularity
+from infra.metrics.instruments import APPLICATION_EXCEPTIONS
+from logic.use_cases.transactions.bulk import CreateTransactionsBulkUseCase
 from logic.use_cases.transactions.create import CreateTransactionUseCase
+from logic.use_cases.transactions.export import ExportTransactionsUseCase
 from logic.use_cases.transactions.get import GetTransactionsUseCase
-from logic.use_cases.wallets.create import CreateWalletUseCase
-from logic.use_cases.wallets.get import GetWalletUseCase
+from logic.use_cases.transactions.transfer import CreateTransferUseCase
+from logic.use_cases.wallets.create import (
+    CreateWalletsBatchUseCase,
+    CreateWalletUseCase,
+)
+from logic.use_cases.wallets.events import StreamWalletEventsUseCase
+from logic.use_cases.wallets.get import (
+    GetWalletUseCase,
+    LookupWalletsUseCase,
+)
+from logic.use_cases.wallets.statement import GetWalletStatementUseCase
 
 
 router = APIRouter(
@@ -31,10 +78,25 @@ router = APIRouter(
 )
 
 
+def bad_request(exception: ApplicationException) -> HTTPException:
+    count_exception(exception)
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail={"error": exception.message},
+    )
+
+
+def count_exception(exception: ApplicationException):
+    APPLICATION_EXCEPTIONS.labels(type(exception).__name__).inc()
+
+
 @router.post(
     "/{wallet_uuid}/operation",
+    dependencies=[Depends(limit_rate), Depends(admit_write)],
     status_code=status.HTTP_201_CREATED,
-    description="Create new transaction",
+    response_model=OutTransactionSchema,
+    description="Create new transaction. Requests repeated with the same Idempotency-Key return the transaction "
+    "created by the first one",
     responses={
         status.HTTP_201_CREATED: {"model": OutTransactionSchema},
         status.HTTP_400_BAD_REQUEST: {"model": ErrorSchema},
@@ -43,24 +105,70 @@ router = APIRouter(
 async def create_transaction_handler(
     wallet_uuid: str,
     schema: InTransactionSchema,
-    container: Annotated[Container, Depends(init_container)],
-) -> OutTransactionSchema:
-    use_case: CreateTransactionUseCase = container.resolve(CreateTransactionUseCase)
+    use_case: Annotated[CreateTransactionUseCase, Depends(provide(CreateTransactionUseCase))],
+    idempotency_key: Annotated[str | None, Header(alias="Idempotency-Key", max_length=255)] = None,
+) -> Response:
+    try:
+        transaction = await use_case.execute(
+            transaction=schema.to_entity(wallet_oid=wallet_uuid),
+            idempotency_key=idempotency_key,
+        )
+    except ApplicationException as exception:
+        raise bad_request(exception) from exception
+
+    return json_response(encode_transaction(transaction), status_code=status.HTTP_201_CREATED)
+
+
+@router.post(
+    "/operations:batch",
+    dependencies=[Depends(limit_rate), Depends(admit_write)],
+    status_code=status.HTTP_200_OK,
+    description="Create many transactions in one request. In atomic mode any rejected operation rolls back all of "
+    "them; otherwise every operation is accepted or rejected on its own",
+    responses={
+        status.HTTP_200_OK: {"model": OutBulkOperationsSchema},
+    },
+)
+async def create_transactions_bulk_handler(
+    schema: InBulkOperationsSchema,
+    use_case: Annotated[CreateTransactionsBulkUseCase, Depends(provide(CreateTransactionsBulkUseCase))],
+) -> OutBulkOperationsSchema:
+    results = await use_case.execute(transactions=schema.to_entities(), atomic=schema.atomic)
+    for result in results:
+        if isinstance(result, ApplicationException):
+            count_exception(result)
 
+    return OutBulkOperationsSchema.from_results(results)
+
+
+@router.post(
+    "/transfers",
+    dependencies=[Depends(limit_rate), Depends(admit_write)],
+    status_code=status.HTTP_201_CREATED,
+    description="Move money from one wallet to another atomically. Each wallet gets a TRANSFER transaction, with a "
+    "negative amount on the sending side",
+    responses={
+        status.HTTP_201_CREATED: {"model": OutTransferSchema},
+        status.HTTP_400_BAD_REQUEST: {"model": ErrorSchema},
+    },
+)
+async def create_transfer_handler(
+    schema: InTransferSchema,
+    use_case: Annotated[CreateTransferUseCase, Depends(provide(CreateTransferUseCase))],
+) -> OutTransferSchema:
     try:
-        transaction = await use_case.execute(transaction=schema.to_entity(wallet_oid=wallet_uuid))
+        transfer = await use_case.execute(transfer=schema.to_entity())
     except ApplicationException as exception:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={"error": exception.message},
-        ) from exception
+        raise bad_request(exception) from exception
 
-    return OutTransactionSchema.from_entity(transaction=transaction)
+    return OutTransferSchema.from_entity(transfer)
 
 
 @router.post(
     "/",
+    dependencies=[Depends(limit_rate), Depends(admit_write)],
     status_code=status.HTTP_201_CREATED,
+    response_model=OutWalletSchema,
     description="Create new wallet",
     responses={
         status.HTTP_201_CREATED: {"model": OutWalletSchema},
@@ -69,24 +177,60 @@ async def create_transaction_handler(
 )
 async def create_wallet_handler(
     schema: InWalletSchema,
-    container: Annotated[Container, Depends(init_container)],
-) -> OutWalletSchema:
-    use_case: CreateWalletUseCase = container.resolve(CreateWalletUseCase)
-
+    use_case: Annotated[CreateWalletUseCase, Depends(provide(CreateWalletUseCase))],
+) -> Response:
     try:
         wallet = await use_case.execute(wallet=schema.to_entity())
     except ApplicationException as exception:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={"error": exception.message},
-        ) from exception
+        raise bad_request(exception) from exception
 
-    return OutWalletSchema.from_entity(wallet=wallet)
+    return json_response(encode_wallet(wallet), status_code=status.HTTP_201_CREATED)
+
+
+@router.post(
+    ":batch",
+    dependencies=[Depends(limit_rate), Depends(admit_write)],
+    status_code=status.HTTP_201_CREATED,
+    response_model=OutWalletsSchema,
+    description="Create many empty wallets with a single insert",
+    responses={
+        status.HTTP_201_CREATED: {"model": OutWalletsSchema},
+    },
+)
+async def create_wallets_batch_handler(
+    use_case: Annotated[CreateWalletsBatchUseCase, Depends(provide(CreateWalletsBatchUseCase))],
+    count: Annotated[int, Query(ge=1, le=1000)] = 1,
+) -> Response:
+    wallets = await use_case.execute(count=count)
+
+    return json_response(encode_wallets(wallets), status_code=status.HTTP_201_CREATED)
+
+
+@router.post(
+    ":lookup",
+    dependencies=[Depends(admit_read)],
+    status_code=status.HTTP_200_OK,
+    response_model=OutWalletsSchema,
+    description="Get many wallets with a single query. Items follow the order of the requested uuids and are null "
+    "for unknown ones",
+    responses={
+        status.HTTP_200_OK: {"model": OutWalletsSchema},
+    },
+)
+async def lookup_wallets_handler(
+    schema: InWalletsLookupSchema,
+    use_case: Annotated[LookupWalletsUseCase, Depends(provide(LookupWalletsUseCase))],
+) -> Response:
+    wallets = await use_case.execute(wallet_oids=schema.uuids)
+
+    return json_response(encode_wallets(wallets))
 
 
 @router.get(
     "/{wallet_uuid}",
+    dependencies=[Depends(admit_read)],
     status_code=status.HTTP_200_OK,
+    response_model=OutWalletSchema,
     description="Get wallet",
     responses={
         status.HTTP_200_OK: {"model": OutWalletSchema},
@@ -95,23 +239,20 @@ async def create_wallet_handler(
 )
 async def get_wallet_handler(
     wallet_uuid: str,
-    container: Annotated[Container, Depends(init_container)],
-) -> OutWalletSchema:
-    use_case: GetWalletUseCase = container.resolve(GetWalletUseCase)
-
+    use_case: Annotated[GetWalletUseCase, Depends(provide(GetWalletUseCase))],
+) -> Response:
     try:
         wallet = await use_case.execute(wallet_oid=wallet_uuid)
     except ApplicationException as exception:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={"error": exception.message},
-        ) from exception
-    return OutWalletSchema.from_entity(wallet=wallet)
+        raise bad_request(exception) from exception
+    return json_response(encode_wallet(wallet))
 
 
 @router.get(
     "/{wallet_uuid}/transactions",
+    dependencies=[Depends(admit_read)],
     status_code=status.HTTP_200_OK,
+    response_model=GetTransactionsQueryResponseSchema,
     description="Get transactions by wallet uuid",
     responses={
         status.HTTP_200_OK: {"model": GetTransactionsQueryResponseSchema},
@@ -121,23 +262,121 @@ async def get_wallet_handler(
 async def get_transactions_handler(
     wallet_uuid: str,
     pagination_in: Annotated[PaginationIn, Depends()],
-    container: Annotated[Container, Depends(init_container)],
-) -> GetTransactionsQueryResponseSchema:
-    use_case: GetTransactionsUseCase = container.resolve(GetTransactionsUseCase)
-
+    use_case: Annotated[GetTransactionsUseCase, Depends(provide(GetTransactionsUseCase))],
+) -> Response:
     try:
         transactions = await use_case.execute(wallet_oid=wallet_uuid, pagination=pagination_in)
     except ApplicationException as exception:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail={
-                "error": exception.message,
-            },
-        ) from exception
-
-    return GetTransactionsQueryResponseSchema(
-        count=len(transactions),
-        limit=pagination_in.limit,
-        offset=pagination_in.offset,
-        items=[OutTransactionSchema.from_entity(transaction) for transaction in transactions],
+        raise bad_request(exception) from exception
+
+    next_cursor = None
+    if transactions and len(transactions) == pagination_in.limit:
+        next_cursor = TransactionCursor.from_transaction(transactions[-1]).encode()
+
+    return json_response(
+        encode_transactions_page(
+            transactions,
+            limit=pagination_in.limit,
+            offset=pagination_in.offset,
+            next_cursor=next_cursor,
+        ),
+    )
+
+
+@router.get(
+    "/{wallet_uuid}/statement",
+    dependencies=[Depends(admit_read)],
+    status_code=status.HTTP_200_OK,
+    description="Deposit, withdrawal and transfer totals of a wallet per day or month, for the days from `from` to "
+    "`to` inclusive. Periods without operations are left out",
+    responses={
+        status.HTTP_200_OK: {"model": OutStatementSchema},
+        status.HTTP_400_BAD_REQUEST: {"model": ErrorSchema},
+    },
+)
+async def get_wallet_statement_handler(
+    wallet_uuid: str,
+    use_case: Annotated[GetWalletStatementUseCase, Depends(provide(GetWalletStatementUseCase))],
+    day_from: Annotated[date, Query(alias="from")],
+    day_to: Annotated[date, Query(alias="to")],
+    granularity: Granularity = Granularity.DAY,
+) -> OutStatementSchema:
+    try:
+        totals = await use_case.execute(
+            wallet_oid=wallet_uuid,
+            day_from=day_from,
+            day_to=day_to,
+            granularity=granularity,
+        )
+    except ApplicationException as exception:
+        raise bad_request(exception) from exception
+
+    return OutStatementSchema(
+        wallet_uuid=wallet_uuid,
+        granularity=granularity,
+        from_date=day_from,
+        to_date=day_to,
+        items=[OutPeriodTotalsSchema.from_totals(item) for item in totals],
+    )
+
+
+@router.get(
+    "/{wallet_uuid}/transactions/export",
+    status_code=status.HTTP_200_OK,
+    description="Stream the full transaction history of a wallet as NDJSON or CSV",
+    response_class=StreamingResponse,
+    responses={
+        status.HTTP_200_OK: {"content": {"application/x-ndjson": {}, "text/csv": {}}},
+        status.HTTP_400_BAD_REQUEST: {"model": ErrorSchema},
+    },
+)
+async def export_transactions_handler(
+    wallet_uuid: str,
+    use_case: Annotated[ExportTransactionsUseCase, Depends(provide(ExportTransactionsUseCase))],
+    export_format: Annotated[ExportFormat, Query(alias="format")] = ExportFormat.NDJSON,
+    created_from: Annotated[datetime | None, Query(alias="from")] = None,
+    created_to: Annotated[datetime | None, Query(alias="to")] = None,
+) -> StreamingResponse:
+    try:
+        batches = await use_case.execute(wallet_oid=wallet_uuid, created_from=created_from, created_to=created_to)
+    except ApplicationException as exception:
+        raise bad_request(exception) from exception
+
+    return StreamingResponse(
+        encode_transactions(batches, export_format),
+        media_type=export_format.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{wallet_uuid}.{export_format.value}"'},
+    )
+
+
+@router.get(
+    "/{wallet_uuid}/events",
+    status_code=status.HTTP_200_OK,
+    description="Stream balance changes of a wallet as Server-Sent Events. Each event id is an offset; a client "
+    "that reconnects with it in Last-Event-ID (or the after parameter) receives every later event exactly once. "
+    "Without either, the stream starts with the next change",
+    response_class=StreamingResponse,
+    responses={
+        status.HTTP_200_OK: {"content": {"text/event-stream": {}}},
+        status.HTTP_400_BAD_REQUEST: {"model": ErrorSchema},
+    },
+)
+async def stream_wallet_events_handler(
+    wallet_uuid: str,
+    use_case: Annotated[StreamWalletEventsUseCase, Depends(provide(StreamWalletEventsUseCase))],
+    after: Annotated[int | None, Query(ge=0)] = None,
+    last_event_id: Annotated[int | None, Header(alias="Last-Event-ID", ge=0)] = None,
+) -> StreamingResponse:
+    try:
+        events = await use_case.execute(
+            wallet_oid=wallet_uuid,
+            after=last_event_id if last_event_id is not None else after,
+        )
+    except ApplicationException as exception:
+        raise bad_request(exception) from exception
+
+    return StreamingResponse(
+        encode_wallet_events(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
@@ -1,5 +1,9 @@
-from datetime import datetime
+from datetime import (
+    date,
+    datetime,
+)
 from decimal import Decimal
+from typing import Literal
 
 from application.api.schemas import BaseQueryResponseSchema
 from domain.entities.wallets import (
@@ -8,10 +12,22 @@ from domain.entities.wallets import (
 from domain.entities.wallets import (
     Transaction as TransactionEntity,
 )
+from domain.entities.wallets import (
+    Transfer as TransferEntity,
+)
 from domain.entities.wallets import (
     Wallet as WalletEntity,
 )
-from pydantic import BaseModel
+from domain.exceptions import ApplicationException
+from domain.values.statements import (
+    Granularity,
+    PeriodTotals,
+)
+from logic.exceptions.transactions import BulkOperationRolledBackException
+from pydantic import (
+    BaseModel,
+    Field,
+)
 
 
 class InTransactionSchema(BaseModel):
@@ -61,6 +77,127 @@ class OutWalletSchema(BaseModel):
         )
 
 
+class InWalletsLookupSchema(BaseModel):
+    uuids: list[str] = Field(min_length=1, max_length=5000)
+
+
+class OutWalletsSchema(BaseModel):
+    items: list[OutWalletSchema | None]
+
+
 class GetTransactionsQueryResponseSchema(
     BaseQueryResponseSchema[list[OutTransactionSchema]],
 ): ...
+
+
+class InTransferSchema(BaseModel):
+    from_wallet_uuid: str
+    to_wallet_uuid: str
+    amount: Decimal
+
+    def to_entity(self) -> TransferEntity:
+        return TransferEntity(
+            source_wallet_oid=self.from_wallet_uuid,
+            destination_wallet_oid=self.to_wallet_uuid,
+            amount=self.amount,
+        )
+
+
+class OutTransferSchema(BaseModel):
+    uuid: str
+    from_wallet_uuid: str
+    to_wallet_uuid: str
+    amount: Decimal
+    created_at: datetime
+
+    @classmethod
+    def from_entity(cls, transfer: TransferEntity) -> "OutTransferSchema":
+        return cls(
+            uuid=transfer.oid,
+            from_wallet_uuid=transfer.source_wallet_oid,
+            to_wallet_uuid=transfer.destination_wallet_oid,
+            amount=transfer.amount,
+            created_at=transfer.created_at,
+        )
+
+
+class InBulkOperationSchema(BaseModel):
+    wallet_uuid: str
+    operationType: OperationType  # noqa: N815
+    amount: Decimal
+
+    def to_entity(self) -> TransactionEntity:
+        return TransactionEntity(
+            operation_type=self.operationType,
+            amount=self.amount,
+            wallet_oid=self.wallet_uuid,
+        )
+
+
+class InBulkOperationsSchema(BaseModel):
+    operations: list[InBulkOperationSchema] = Field(min_length=1, max_length=10_000)
+    atomic: bool = False
+
+    def to_entities(self) -> list[TransactionEntity]:
+        return [operation.to_entity() for operation in self.operations]
+
+
+class OutBulkOperationResultSchema(BaseModel):
+    index: int
+    status: Literal["accepted", "rejected", "rolled_back"]
+    transaction: OutTransactionSchema | None = None
+    error: str | None = None
+
+    @classmethod
+    def from_result(
+        cls,
+        index: int,
+        result: TransactionEntity | ApplicationException,
+    ) -> "OutBulkOperationResultSchema":
+        if isinstance(result, BulkOperationRolledBackException):
+            return cls(index=index, status="rolled_back", error=result.message)
+        if isinstance(result, ApplicationException):
+            return cls(index=index, status="rejected", error=result.message)
+        return cls(index=index, status="accepted", transaction=OutTransactionSchema.from_entity(result))
+
+
+class OutBulkOperationsSchema(BaseModel):
+    accepted: int
+    rejected: int
+    items: list[OutBulkOperationResultSchema]
+
+    @classmethod
+    def from_results(cls, results: list[TransactionEntity | ApplicationException]) -> "OutBulkOperationsSchema":
+        items = [OutBulkOperationResultSchema.from_result(index, result) for index, result in enumerate(results)]
+        accepted = sum(item.status == "accepted" for item in items)
+        return cls(accepted=accepted, rejected=len(items) - accepted, items=items)
+
+
+class OutPeriodTotalsSchema(BaseModel):
+    period: date
+    deposits: Decimal
+    withdrawals: Decimal
+    transfers_in: Decimal
+    transfers_out: Decimal
+    net: Decimal
+    operations: int
+
+    @classmethod
+    def from_totals(cls, totals: PeriodTotals) -> "OutPeriodTotalsSchema":
+        return cls(
+            period=totals.period,
+            deposits=totals.deposits,
+            withdrawals=totals.withdrawals,
+            transfers_in=totals.transfers_in,
+            transfers_out=totals.transfers_out,
+            net=totals.net,
+            operations=totals.operations,
+        )
+
+
+class OutStatementSchema(BaseModel):
+    wallet_uuid: str
+    granularity: Granularity
+    from_date: date
+    to_date: date
+    items: list[OutPeriodTotalsSchema]
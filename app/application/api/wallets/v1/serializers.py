@@ -0,0 +1,143 @@
+"""JSON encoders for the hot wallet and transaction responses.
+
+The payloads are TypedDicts with the fields, order and types of the response schemas, so pydantic encodes
+Decimal, datetime and enum values exactly as it does for the schemas. The adapters are built once at import,
+and encoding does not construct a model per item or validate again. Handlers that use them keep the schemas as
+``response_model`` for the OpenAPI document.
+"""
+from collections.abc import (
+    AsyncIterator,
+    Sequence,
+)
+from datetime import datetime
+from decimal import Decimal
+
+from fastapi import (
+    Response,
+    status,
+)
+from pydantic import TypeAdapter
+from typing_extensions import TypedDict
+
+from domain.entities.wallets import (
+    OperationType,
+    Transaction as TransactionEntity,
+    Wallet as WalletEntity,
+    WalletEvent as WalletEventEntity,
+)
+
+
+class TransactionPayload(TypedDict):
+    operationType: OperationType  # noqa: N815
+    amount: Decimal
+    created_at: datetime
+
+
+class WalletPayload(TypedDict):
+    uuid: str
+    balance: Decimal
+    created_at: datetime
+    updated_at: datetime
+
+
+class TransactionsPagePayload(TypedDict):
+    count: int
+    offset: int
+    limit: int
+    items: list[TransactionPayload]
+    next_cursor: str | None
+
+
+class WalletsPayload(TypedDict):
+    items: list[WalletPayload | None]
+
+
+class WalletEventPayload(TypedDict):
+    offset: int
+    wallet_uuid: str
+    transaction_uuid: str
+    operationType: OperationType  # noqa: N815
+    amount: Decimal
+    created_at: datetime
+
+
+transaction_adapter = TypeAdapter(TransactionPayload)
+wallet_adapter = TypeAdapter(WalletPayload)
+wallets_adapter = TypeAdapter(WalletsPayload)
+transactions_page_adapter = TypeAdapter(TransactionsPagePayload)
+wallet_event_adapter = TypeAdapter(WalletEventPayload)
+
+WALLET_EVENT_TYPE = "balance_changed"
+
+
+def to_transaction_payload(transaction: TransactionEntity) -> TransactionPayload:
+    return {
+        "operationType": transaction.operation_type,
+        "amount": transaction.amount,
+        "created_at": transaction.created_at,
+    }
+
+
+def encode_transaction(transaction: TransactionEntity) -> bytes:
+    return transaction_adapter.dump_json(to_transaction_payload(transaction))
+
+
+def to_wallet_payload(wallet: WalletEntity) -> WalletPayload:
+    return {
+        "uuid": wallet.oid,
+        "balance": wallet.balance,
+        "created_at": wallet.created_at,
+        "updated_at": wallet.updated_at,
+    }
+
+
+def encode_wallet(wallet: WalletEntity) -> bytes:
+    return wallet_adapter.dump_json(to_wallet_payload(wallet))
+
+
+def encode_wallets(wallets: Sequence[WalletEntity | None]) -> bytes:
+    return wallets_adapter.dump_json(
+        {"items": [None if wallet is None else to_wallet_payload(wallet) for wallet in wallets]},
+    )
+
+
+def encode_transactions_page(
+    transactions: Sequence[TransactionEntity],
+    limit: int,
+    offset: int,
+    next_cursor: str | None = None,
+) -> bytes:
+    return transactions_page_adapter.dump_json(
+        {
+            "count": len(transactions),
+            "offset": offset,
+            "limit": limit,
+            "items": [to_transaction_payload(transaction) for transaction in transactions],
+            "next_cursor": next_cursor,
+        },
+    )
+
+
+def encode_wallet_event(event: WalletEventEntity) -> bytes:
+    """One Server-Sent Events message; its id is the offset a reconnecting client sends as Last-Event-ID."""
+    data = wallet_event_adapter.dump_json(
+        {
+            "offset": event.offset,
+            "wallet_uuid": event.wallet_oid,
+            "transaction_uuid": event.transaction_oid,
+            "operationType": event.operation_type,
+            "amount": event.amount,
+            "created_at": event.created_at,
+        },
+    )
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (event.offset, WALLET_EVENT_TYPE.encode(), data)
+
+
+async def encode_wallet_events(events: AsyncIterator[WalletEventEntity | None]) -> AsyncIterator[bytes]:
+    # an idle stream gets comment lines, so proxies do not close it
+    async for event in events:
+        yield b": keep-alive\n\n" if event is None else encode_wallet_event(event)
+
+
+def json_response(content: bytes, status_code: int = status.HTTP_200_OK) -> Response:
+    return Response(content=content, status_code=status_code, media_type="application/json")
@@ -0,0 +1,59 @@
+"""Creates upcoming monthly partitions of the transactions table and detaches expired ones.
+
+    python -m application.jobs.maintain_partitions
+
+Creates partitions for the current month and TRANSACTION_PARTITIONS_AHEAD months after it. When
+TRANSACTION_PARTITION_RETENTION_MONTHS is set, partitions older than that are detached; run reconcile_ledger
+first, so every wallet has a snapshot newer than the detached history. Run it at least monthly. It does nothing
+on SQLite, or on a Postgres table created before partitioning, where the table is not partitioned.
+"""
+import asyncio
+import sys
+from datetime import datetime
+
+from infra.database.manager import DatabaseManager
+from infra.database.partitions import (
+    create_partitions,
+    detach_partitions,
+    is_partitioned,
+    PartitionMaintenanceReport,
+    TRANSACTIONS_TABLE,
+)
+from logic.initial_container import init_container
+from settings.config import Settings
+
+
+async def maintain() -> PartitionMaintenanceReport:
+    container = init_container()
+    settings: Settings = container.resolve(Settings)
+    database_manager: DatabaseManager = container.resolve(DatabaseManager)
+
+    report = PartitionMaintenanceReport()
+    now = datetime.now()
+    async with database_manager.engine.begin() as conn:
+        if not await is_partitioned(conn):
+            return report
+
+        report.created = await create_partitions(conn, TRANSACTIONS_TABLE, now, settings.TRANSACTION_PARTITIONS_AHEAD)
+        if settings.TRANSACTION_PARTITION_RETENTION_MONTHS is not None:
+            # detaching takes an exclusive lock on the parent table until the job commits
+            report.detached = await detach_partitions(
+                conn,
+                TRANSACTIONS_TABLE,
+                now,
+                settings.TRANSACTION_PARTITION_RETENTION_MONTHS,
+            )
+    return report
+
+
+def main():
+    report = asyncio.run(maintain())
+
+    sys.stdout.write(
+        f"partitions created: {', '.join(report.created) or 'none'}, "
+        f"detached: {', '.join(report.detached) or 'none'}\n",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""Deletes idempotency keys older than IDEMPOTENCY_KEY_TTL_SECONDS.
+
+    python -m application.jobs.purge_idempotency_keys
+
+Run it periodically; a request repeated after its key was purged creates a new transaction.
+"""
+import asyncio
+import sys
+from datetime import timedelta
+
+from logic.initial_container import init_container
+from logic.services.transactions import BaseTransactionService
+from settings.config import Settings
+
+
+async def purge() -> int:
+    container = init_container()
+    settings: Settings = container.resolve(Settings)
+    transaction_service: BaseTransactionService = container.resolve(BaseTransactionService)
+
+    return await transaction_service.purge_idempotency_keys(
+        older_than=timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS),
+    )
+
+
+def main():
+    purged = asyncio.run(purge())
+
+    sys.stdout.write(f"idempotency keys purged: {purged}\n")
+
+
+if __name__ == "__main__":
+    main()
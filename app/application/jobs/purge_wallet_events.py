@@ -0,0 +1,31 @@
+"""Deletes wallet events older than WALLET_EVENTS_RETENTION_SECONDS from the outbox.
+
+    python -m application.jobs.purge_wallet_events
+
+Run it periodically; a client that resumes from a purged offset only receives the events still stored.
+"""
+import asyncio
+import sys
+from datetime import timedelta
+
+from logic.initial_container import init_container
+from logic.services.events import BaseWalletEventService
+from settings.config import Settings
+
+
+async def purge() -> int:
+    container = init_container()
+    settings: Settings = container.resolve(Settings)
+    event_service: BaseWalletEventService = container.resolve(BaseWalletEventService)
+
+    return await event_service.purge_events(older_than=timedelta(seconds=settings.WALLET_EVENTS_RETENTION_SECONDS))
+
+
+def main():
+    purged = asyncio.run(purge())
+
+    sys.stdout.write(f"wallet events purged: {purged}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""Recomputes the daily totals of every wallet from the transaction log, for all days before today.
+
+    python -m application.jobs.rebuild_daily_totals
+
+Run it once after WALLET_DAILY_TOTALS_ENABLED is first turned on, the day after, so statements also cover the
+history recorded before. Today's totals are left to the running application, which keeps adding to them. On
+Postgres the rebuild only sees attached transaction partitions.
+"""
+import asyncio
+import sys
+from datetime import date
+
+from logic.initial_container import init_container
+from logic.services.statements import BaseWalletStatementService
+
+
+async def rebuild() -> int:
+    container = init_container()
+    statement_service: BaseWalletStatementService = container.resolve(BaseWalletStatementService)
+
+    return await statement_service.rebuild_daily_totals(before=date.today())
+
+
+def main():
+    rebuilt = asyncio.run(rebuild())
+
+    sys.stdout.write(f"wallets rebuilt: {rebuilt}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Replays wallet transactions from their latest snapshots, stores new snapshots and reports balance drift.
+
+    python -m application.jobs.reconcile_ledger
+
+Exits with status 1 when any wallet balance disagrees with its transaction history.
+"""
+import asyncio
+import sys
+
+from logic.initial_container import init_container
+from logic.services.ledger import (
+    BaseLedgerService,
+    ReconciliationReport,
+)
+
+
+async def reconcile() -> ReconciliationReport:
+    container = init_container()
+    ledger_service: BaseLedgerService = container.resolve(BaseLedgerService)
+
+    return await ledger_service.reconcile()
+
+
+def main():
+    report = asyncio.run(reconcile())
+
+    sys.stdout.write(
+        f"wallets checked: {report.wallets_checked}, transactions scanned: {report.transactions_scanned}, "
+        f"snapshots written: {report.snapshots_written}, drifted wallets: {len(report.drifts)}\n",
+    )
+    for drift in report.drifts:
+        sys.stdout.write(
+            f"{drift.wallet_oid}: expected {drift.expected_balance}, actual {drift.actual_balance}\n",
+        )
+
+    sys.exit(1 if report.drifts else 0)
+
+
+if __name__ == "__main__":
+    main()
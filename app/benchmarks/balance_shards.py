@@ -0,0 +1,88 @@
+"""Deposit throughput on one hot wallet as its balance is split over more rows.
+
+    python -m benchmarks.balance_shards --shards 1 2 4 8 16 --operations 2000 --concurrency 100
+
+Every run creates one wallet with the given number of balance shards and sends concurrent deposits to it;
+``--withdraw-ratio`` mixes in withdrawals, which collect the shards whenever the wallet row alone cannot cover
+them. SQLite serializes every write on the database, so shards only pay off with
+``--database-url postgresql+asyncpg://...``, where deposits to different rows no longer wait for each other.
+"""
+import argparse
+import asyncio
+import random
+from decimal import Decimal
+
+from benchmarks.common import (
+    benchmark_database,
+    report,
+    run_concurrently,
+    summarize,
+)
+from domain.entities.wallets import (
+    OperationType,
+    Transaction as TransactionEntity,
+    Wallet as WalletEntity,
+)
+from infra.database.manager import SessionManager
+from infra.repositories.idempotency.sqlalchemy_idempotency_repository import SQLAlchemyIdempotencyKeyRepository
+from infra.repositories.transactions.sqlalchemy_transaction_repository import SQLAlchemyTransactionRepository
+from infra.repositories.wallets.sqlalchemy_wallet_repository import SQLAlchemyWalletRepository
+from logic.services.transactions import TransactionService
+from logic.services.wallets import (
+    WalletManagementService,
+    WalletService,
+)
+
+
+async def run(args: argparse.Namespace):
+    results = {}
+    async with benchmark_database(args.database_url) as session_factory:
+        session_manager = SessionManager(session_factory)
+
+        for shards in args.shards:
+            wallet_repository = SQLAlchemyWalletRepository(balance_shards=shards)
+            wallet_service = WalletService(session_manager=session_manager, wallet_repository=wallet_repository)
+            service = TransactionService(
+                session_manager=session_manager,
+                transaction_repository=SQLAlchemyTransactionRepository(),
+                wallet_manager_service=WalletManagementService(wallet_repository=wallet_repository),
+                idempotency_key_repository=SQLAlchemyIdempotencyKeyRepository(),
+            )
+            wallet = await wallet_service.create_wallet(wallet=WalletEntity())
+            randomizer = random.Random(args.seed)  # noqa: S311
+
+            async def operation(
+                _: int,
+                service: TransactionService = service,
+                wallet: WalletEntity = wallet,
+                randomizer: random.Random = randomizer,
+            ):
+                withdraw = randomizer.random() < args.withdraw_ratio
+                await service.create_transaction(
+                    TransactionEntity(
+                        operation_type=OperationType.WITHDRAW if withdraw else OperationType.DEPOSIT,
+                        amount=Decimal(randomizer.randint(1, 100)),
+                        wallet_oid=wallet.oid,
+                    ),
+                )
+
+            latencies, elapsed = await run_concurrently(operation, args.operations, args.concurrency)
+            results[f"shards={shards}"] = summarize(latencies, elapsed)
+
+    report("balance_shards", results, as_json=args.json)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--operations", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--withdraw-ratio", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--json", action="store_true")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Latency of SELECT ... FOR UPDATE + UPDATE against a single conditional UPDATE ... RETURNING under contention.
+
+    python -m benchmarks.balance_update --operations 2000 --concurrency 100 --wallets 2
+
+SQLite ignores FOR UPDATE, so pass ``--database-url postgresql+asyncpg://...`` to measure real row-lock waits.
+"""
+import argparse
+import asyncio
+import random
+from decimal import Decimal
+
+from benchmarks.common import (
+    benchmark_database,
+    report,
+    run_concurrently,
+    summarize,
+)
+from domain.entities.wallets import (
+    OperationType,
+    Transaction as TransactionEntity,
+    Wallet as WalletEntity,
+)
+from infra.database.manager import SessionManager
+from infra.repositories.idempotency.sqlalchemy_idempotency_repository import SQLAlchemyIdempotencyKeyRepository
+from infra.repositories.transactions.sqlalchemy_transaction_repository import SQLAlchemyTransactionRepository
+from infra.repositories.wallets.sqlalchemy_wallet_repository import SQLAlchemyWalletRepository
+from logic.exceptions.wallets import (
+    NotEnoughFundsException,
+    WalletNotFoundException,
+)
+from logic.services.transactions import TransactionService
+from logic.services.wallets import (
+    WalletManagementService,
+    WalletService,
+)
+
+
+async def create_locked_transaction(service: TransactionService, transaction: TransactionEntity):
+    """The write path before the conditional update: lock the row, check funds, insert, update."""
+    wallet_repository = service.wallet_manager_service.wallet_repository
+    async with service.session_manager as session:
+        wallet = await wallet_repository.get_wallet_with_lock(wallet_oid=transaction.wallet_oid, session=session)
+        if wallet is None:
+            raise WalletNotFoundException()
+        if transaction.operation_type == OperationType.WITHDRAW and wallet.balance < transaction.amount:
+            raise NotEnoughFundsException()
+        await service.transaction_repository.add(transaction=transaction, session=session)
+        await wallet_repository.update_balance(
+            wallet_oid=transaction.wallet_oid,
+            amount=transaction.balance_delta,
+            session=session,
+        )
+
+
+async def run(args: argparse.Namespace):
+    results = {}
+    async with benchmark_database(args.database_url) as session_factory:
+        session_manager = SessionManager(session_factory)
+        wallet_service = WalletService(session_manager=session_manager, wallet_repository=SQLAlchemyWalletRepository())
+        service = TransactionService(
+            session_manager=session_manager,
+            transaction_repository=SQLAlchemyTransactionRepository(),
+            wallet_manager_service=WalletManagementService(wallet_repository=SQLAlchemyWalletRepository()),
+            idempotency_key_repository=SQLAlchemyIdempotencyKeyRepository(),
+        )
+        paths = {
+            "select-for-update": lambda transaction: create_locked_transaction(service, transaction),
+            "conditional-update": lambda transaction: service.create_transaction(transaction),
+        }
+
+        for label, create in paths.items():
+            wallets = [await wallet_service.create_wallet(wallet=WalletEntity()) for _ in range(args.wallets)]
+            for wallet in wallets:
+                await service.create_transaction(
+                    TransactionEntity(operation_type=OperationType.DEPOSIT, amount=Decimal(10**6), wallet_oid=wallet.oid),
+                )
+            randomizer = random.Random(args.seed)  # noqa: S311
+
+            async def operation(_: int, create=create, wallets: list = wallets, randomizer: random.Random = randomizer):
+                await create(
+                    TransactionEntity(
+                        operation_type=randomizer.choice((OperationType.DEPOSIT, OperationType.WITHDRAW)),
+                        amount=Decimal(randomizer.randint(1, 100)),
+                        wallet_oid=randomizer.choice(wallets).oid,
+                    ),
+                )
+
+            latencies, elapsed = await run_concurrently(operation, args.operations, args.concurrency)
+            results[label] = summarize(latencies, elapsed)
+
+    report("balance_update", results, as_json=args.json)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operations", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--wallets", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--json", action="store_true")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from collections.abc import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+)
+from contextlib import asynccontextmanager
+from dataclasses import (
+    asdict,
+    dataclass,
+)
+
+from sqlalchemy.ext.asyncio import (
+    async_sessionmaker,
+    AsyncSession,
+    create_async_engine,
+)
+
+from infra.database.models import Base
+
+
+@dataclass
+class LatencyStats:
+    count: int
+    ops_per_second: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    errors: int = 0
+
+
+def percentile(samples: list[float], q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies: list[float], elapsed: float, errors: int = 0) -> LatencyStats:
+    return LatencyStats(
+        count=len(latencies),
+        ops_per_second=len(latencies) / elapsed if elapsed else 0.0,
+        p50_ms=percentile(latencies, 50) * 1000,
+        p95_ms=percentile(latencies, 95) * 1000,
+        p99_ms=percentile(latencies, 99) * 1000,
+        max_ms=max(latencies, default=0.0) * 1000,
+        errors=errors,
+    )
+
+
+async def run_concurrently(
+    operation: Callable[[int], Awaitable[object]],
+    operations: int,
+    concurrency: int,
+) -> tuple[list[float], float]:
+    """Runs ``operation(i)`` for every ``i`` with at most ``concurrency`` calls in flight.
+
+    Returns per-call latencies in seconds and the wall-clock time of the whole run. Exceptions raised by the
+    operation are part of the measured workload and are swallowed.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def timed(index: int):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await operation(index)
+            except Exception:  # noqa: S110
+                pass
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(timed(index) for index in range(operations)))
+    return latencies, time.perf_counter() - started
+
+
+def configure_environment(**overrides: str):
+    """Sets the settings the application container needs; nothing connects to Postgres unless asked to."""
+    os.environ.update(overrides)
+    for name, value in (
+        ("POSTGRES_DB", "benchmark"),
+        ("POSTGRES_USER", "benchmark"),
+        ("POSTGRES_PASSWORD", "benchmark"),
+        ("POSTGRES_HOST", "localhost"),
+        ("POSTGRES_PORT", "5432"),
+    ):
+        os.environ.setdefault(name, value)
+
+
+@asynccontextmanager
+async def benchmark_database(database_url: str | None = None) -> AsyncIterator[async_sessionmaker]:
+    """Creates a fresh schema and yields a session factory bound to it.
+
+    Without ``database_url`` a throwaway SQLite file is used. SQLite has no row locks, so the pool is limited to
+    one connection: transactions then queue up the same way they do behind a hot row lock on Postgres.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = database_url or f"sqlite+aiosqlite:///{directory}/benchmark.db"
+        engine_options = {"pool_size": 1, "max_overflow": 0} if database_url.startswith("sqlite") else {}
+        engine = create_async_engine(database_url, **engine_options)
+
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+
+        try:
+            yield async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+        finally:
+            await engine.dispose()
+
+
+def report(name: str, results: dict[str, LatencyStats], as_json: bool = False):
+    if as_json:
+        sys.stdout.write(json.dumps({"benchmark": name, "results": {k: asdict(v) for k, v in results.items()}}) + "\n")
+        return
+
+    sys.stdout.write(f"{name}\n")
+    for label, stats in results.items():
+        sys.stdout.write(
+            f"  {label:<24} {stats.count:>7} ops  {stats.ops_per_second:>10.1f} ops/s  "
+            f"p50 {stats.p50_ms:>8.2f} ms  p95 {stats.p95_ms:>8.2f} ms  p99 {stats.p99_ms:>8.2f} ms"
+            + (f"  errors {stats.errors}" if stats.errors else "")
+            + "\n",
+        )
@@ -0,0 +1,71 @@
+"""Per-request cost of getting a use case out of the container.
+
+    python -m benchmarks.container_resolution --iterations 20000
+
+Compares rebuilding the graph on every request (transient registrations), resolving prebuilt singletons and the
+memoized FastAPI dependency the handlers use. Nothing connects to the database: engines are created lazily.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from punq import Scope
+
+from application.api.dependencies import provide
+from benchmarks.common import configure_environment
+from logic.initial_container import (
+    _init_container,
+    USE_CASES,
+)
+
+
+def measure(resolve, iterations: int) -> float:
+    """Returns the mean time of one request, in microseconds, where a request resolves every use case once."""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for use_case in USE_CASES:
+            resolve(use_case)
+    return (time.perf_counter() - started) / iterations * 1_000_000
+
+
+def measure_dependencies(container, iterations: int) -> float:
+    dependencies = [provide(use_case) for use_case in USE_CASES]
+
+    async def run() -> float:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            for dependency in dependencies:
+                await dependency(container)
+        return (time.perf_counter() - started) / iterations * 1_000_000
+
+    return asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+    configure_environment()
+
+    transient = _init_container(scope=Scope.transient)
+    singleton = _init_container()
+    results = {
+        "transient-resolve": measure(transient.resolve, args.iterations),
+        "singleton-resolve": measure(singleton.resolve, args.iterations),
+        "provide-dependency": measure_dependencies(singleton, args.iterations),
+    }
+
+    if args.json:
+        sys.stdout.write(json.dumps({"benchmark": "container_resolution", "us_per_request": results}) + "\n")
+        return
+
+    sys.stdout.write(f"container_resolution ({len(USE_CASES)} use cases per request)\n")
+    for label, micros in results.items():
+        sys.stdout.write(f"  {label:<24} {micros:>10.2f} us/request\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""Per-row cost and memory of reading a 10k-row transaction page.
+
+    python -m benchmarks.entity_mapping --rows 10000 --repeat 20
+
+``orm`` is the previous read path: ORM instances tracked by the session, copied field by field into entities.
+``core`` selects plain columns and builds the slotted entities straight from the rows. ``entity-size`` compares
+10k slotted entities against the same dataclass with a per-instance ``__dict__``.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import (
+    dataclass,
+    field,
+    make_dataclass,
+)
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import (
+    insert,
+    select,
+)
+
+from benchmarks.common import benchmark_database
+from domain.entities.wallets import (
+    OperationType,
+    Transaction as TransactionEntity,
+    Wallet as WalletEntity,
+)
+from infra.database.models import (
+    TransactionModel,
+    WalletModel,
+)
+from infra.repositories.transactions.sqlalchemy_transaction_repository import SQLAlchemyTransactionRepository
+
+
+@dataclass
+class Measurement:
+    us_per_row: float
+    peak_kib: float
+
+
+async def read_orm(session, wallet_oid: str, limit: int) -> list[TransactionEntity]:
+    result = await session.execute(
+        select(TransactionModel)
+        .where(TransactionModel.wallet_oid == wallet_oid)
+        .order_by(TransactionModel.created_at, TransactionModel.oid)
+        .limit(limit),
+    )
+    return [
+        TransactionEntity(
+            oid=transaction_model.oid,
+            created_at=transaction_model.created_at,
+            amount=transaction_model.amount,
+            operation_type=transaction_model.operation_type,
+            wallet_oid=transaction_model.wallet_oid,
+        )
+        for transaction_model in result.scalars().all()
+    ]
+
+
+async def read_core(session, wallet_oid: str, limit: int) -> list[TransactionEntity]:
+    return await SQLAlchemyTransactionRepository().get_all(wallet_oid=wallet_oid, limit=limit, session=session)
+
+
+async def measure(session_factory, read, wallet_oid: str, rows: int, repeat: int) -> Measurement:
+    timings = []
+    for _ in range(repeat):
+        async with session_factory() as session:
+            started = time.perf_counter()
+            page = await read(session, wallet_oid, rows)
+            timings.append(time.perf_counter() - started)
+        assert len(page) == rows
+
+    # tracing slows allocations down, so memory is measured on a separate read
+    async with session_factory() as session:
+        tracemalloc.start()
+        await read(session, wallet_oid, rows)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return Measurement(us_per_row=statistics.median(timings) / rows * 1_000_000, peak_kib=peak / 1024)
+
+
+def measure_entity_size(rows: int) -> dict[str, float]:
+    fields = [
+        ("oid", str),
+        ("created_at", datetime),
+        ("wallet_oid", str, field(kw_only=True)),
+        ("amount", Decimal, field(kw_only=True)),
+        ("operation_type", OperationType),
+    ]
+    entity_classes = {
+        "slotted": TransactionEntity,
+        "dict-based": make_dataclass("DictTransaction", fields),
+    }
+
+    sizes = {}
+    for label, entity_class in entity_classes.items():
+        tracemalloc.start()
+        entities = [
+            entity_class(
+                oid=str(index),
+                created_at=datetime.now(),
+                wallet_oid="wallet",
+                amount=Decimal(1),
+                operation_type=OperationType.DEPOSIT,
+            )
+            for index in range(rows)
+        ]
+        sizes[label] = tracemalloc.get_traced_memory()[0] / len(entities)
+        tracemalloc.stop()
+    return sizes
+
+
+async def run(args: argparse.Namespace) -> dict:
+    async with benchmark_database(args.database_url) as session_factory:
+        wallet = WalletEntity()
+        async with session_factory() as session:
+            await session.execute(insert(WalletModel).values(oid=wallet.oid, balance=0))
+            await session.execute(
+                insert(TransactionModel),
+                [
+                    {
+                        "oid": f"{index:08}",
+                        "created_at": datetime.now(),
+                        "amount": Decimal(1),
+                        "operation_type": OperationType.DEPOSIT,
+                        "wallet_oid": wallet.oid,
+                    }
+                    for index in range(args.rows)
+                ],
+            )
+            await session.commit()
+
+        return {
+            label: await measure(session_factory, read, wallet.oid, args.rows, args.repeat)
+            for label, read in (("orm", read_orm), ("core", read_core))
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    entity_sizes = measure_entity_size(args.rows)
+
+    if args.json:
+        sys.stdout.write(
+            json.dumps(
+                {
+                    "benchmark": "entity_mapping",
+                    "results": {label: vars(measurement) for label, measurement in results.items()},
+                    "bytes_per_entity": entity_sizes,
+                },
+            )
+            + "\n",
+        )
+        return
+
+    sys.stdout.write(f"entity_mapping ({args.rows} rows)\n")
+    for label, measurement in results.items():
+        sys.stdout.write(f"  {label:<12} {measurement.us_per_row:>8.2f} us/row  peak {measurement.peak_kib:>10.1f} KiB\n")
+    for label, size in entity_sizes.items():
+        sys.stdout.write(f"  entity-size {label:<12} {size:>8.1f} bytes/entity\n")
+
+
+if __name__ == "__main__":
+    main()
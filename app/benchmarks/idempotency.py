@@ -0,0 +1,102 @@
+"""Latency of keyed operations, of their retries and of a bare cache read.
+
+    python -m benchmarks.idempotency --operations 2000 --concurrency 50
+
+A retry answered from the in-process key cache never opens a database connection, so it should cost about as
+much as ``cache-read``; ``retry-uncached`` shows the same retry served by the database lookup.
+"""
+import argparse
+import asyncio
+import random
+from decimal import Decimal
+
+from benchmarks.common import (
+    benchmark_database,
+    report,
+    run_concurrently,
+    summarize,
+)
+from domain.entities.wallets import (
+    IdempotencyKey as IdempotencyKeyEntity,
+    OperationType,
+    Transaction as TransactionEntity,
+    Wallet as WalletEntity,
+)
+from infra.cache.lru import LRUCache
+from infra.database.manager import SessionManager
+from infra.repositories.idempotency.cached_idempotency_repository import CachedIdempotencyKeyRepository
+from infra.repositories.idempotency.sqlalchemy_idempotency_repository import SQLAlchemyIdempotencyKeyRepository
+from infra.repositories.transactions.sqlalchemy_transaction_repository import SQLAlchemyTransactionRepository
+from infra.repositories.wallets.sqlalchemy_wallet_repository import SQLAlchemyWalletRepository
+from logic.services.transactions import TransactionService
+from logic.services.wallets import (
+    WalletManagementService,
+    WalletService,
+)
+
+
+async def run(args: argparse.Namespace):
+    results = {}
+    async with benchmark_database(args.database_url) as session_factory:
+        session_manager = SessionManager(session_factory)
+        wallet_service = WalletService(session_manager=session_manager, wallet_repository=SQLAlchemyWalletRepository())
+        cache: LRUCache[tuple[str, str], IdempotencyKeyEntity] = LRUCache(max_size=args.operations)
+
+        def build_service(idempotency_key_repository) -> TransactionService:
+            return TransactionService(
+                session_manager=session_manager,
+                transaction_repository=SQLAlchemyTransactionRepository(),
+                wallet_manager_service=WalletManagementService(wallet_repository=SQLAlchemyWalletRepository()),
+                idempotency_key_repository=idempotency_key_repository,
+            )
+
+        cached_service = build_service(
+            CachedIdempotencyKeyRepository(repository=SQLAlchemyIdempotencyKeyRepository(), cache=cache),
+        )
+        uncached_service = build_service(SQLAlchemyIdempotencyKeyRepository())
+
+        wallets = [await wallet_service.create_wallet(wallet=WalletEntity()) for _ in range(args.wallets)]
+        randomizer = random.Random(args.seed)  # noqa: S311
+        requests = [
+            TransactionEntity(
+                operation_type=OperationType.DEPOSIT,
+                amount=Decimal(randomizer.randint(1, 100)),
+                wallet_oid=randomizer.choice(wallets).oid,
+            )
+            for _ in range(args.operations)
+        ]
+
+        def create(service: TransactionService):
+            async def operation(index: int):
+                await service.create_transaction(requests[index], idempotency_key=f"request-{index}")
+
+            return operation
+
+        async def cache_read(index: int):
+            cache.get((requests[index].wallet_oid, f"request-{index}"))
+
+        for label, operation in (
+            ("first-request", create(cached_service)),
+            ("retry-cached", create(cached_service)),
+            ("retry-uncached", create(uncached_service)),
+            ("cache-read", cache_read),
+        ):
+            latencies, elapsed = await run_concurrently(operation, args.operations, args.concurrency)
+            results[label] = summarize(latencies, elapsed)
+
+    report("idempotency", results, as_json=args.json)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operations", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--wallets", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--json", action="store_true")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
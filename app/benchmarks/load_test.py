@@ -0,0 +1,148 @@
+"""Load test of the wallet API, driven in process through httpx's ASGI transport.
+
+    python -m benchmarks.load_test --backend memory --backend sqlite --requests 5000 --concurrency 100
+    python -m benchmarks.load_test --mix deposit=1,get_wallet=4 --hot-wallets 2 --hot-ratio 0.9 --json
+
+``--hot-ratio`` of the requests go to one of ``--hot-wallets`` wallets, the rest are spread over ``--wallets``
+cold ones. ``--mix`` weights the endpoints. With ``--json`` every backend is reported on its own line, so the
+output of two commits can be diffed or fed to a regression check. Errors count 5xx responses; rejected
+withdrawals are a normal 400 and are part of the workload.
+"""
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from httpx import (
+    ASGITransport,
+    AsyncClient,
+    Response,
+)
+
+from application.api.main import create_app
+from benchmarks.common import (
+    configure_environment,
+    report,
+    run_concurrently,
+    summarize,
+)
+from infra.database.manager import DatabaseManager
+from logic.initial_container import init_container
+
+
+ENDPOINTS = ("deposit", "withdraw", "get_wallet", "list_transactions")
+DEFAULT_MIX = "deposit=4,withdraw=2,get_wallet=3,list_transactions=1"
+
+
+def parse_mix(mix: str) -> dict[str, float]:
+    weights = {}
+    for item in mix.split(","):
+        endpoint, _, weight = item.partition("=")
+        if endpoint not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"unknown endpoint {endpoint!r}, expected one of {', '.join(ENDPOINTS)}")
+        weights[endpoint] = float(weight or 1)
+    return weights
+
+
+@asynccontextmanager
+async def backend_app(backend: str, directory: str) -> AsyncIterator[FastAPI]:
+    if backend == "memory":
+        configure_environment(REPOSITORY_BACKEND="memory")
+    else:
+        configure_environment(REPOSITORY_BACKEND="sqlalchemy", DATABASE_URL=f"sqlite+aiosqlite:///{directory}/load.db")
+
+    # the app resolves everything through init_container, exactly as in production
+    init_container.cache_clear()
+    container = init_container()
+    database_manager: DatabaseManager = container.resolve(DatabaseManager)
+    if backend != "memory":
+        await database_manager.init_models()
+
+    try:
+        yield create_app()
+    finally:
+        await database_manager.engine.dispose()
+        init_container.cache_clear()
+
+
+async def request(client: AsyncClient, endpoint: str, wallet_uuid: str, amount: int) -> Response:
+    if endpoint == "deposit":
+        return await client.post(f"/v1/wallets/{wallet_uuid}/operation", json={"operationType": "DEPOSIT", "amount": amount})
+    if endpoint == "withdraw":
+        return await client.post(f"/v1/wallets/{wallet_uuid}/operation", json={"operationType": "WITHDRAW", "amount": amount})
+    if endpoint == "get_wallet":
+        return await client.get(f"/v1/wallets/{wallet_uuid}")
+    return await client.get(f"/v1/wallets/{wallet_uuid}/transactions", params={"limit": 20})
+
+
+async def run_backend(backend: str, args: argparse.Namespace) -> dict:
+    randomizer = random.Random(args.seed)  # noqa: S311
+    mix = parse_mix(args.mix)
+
+    with tempfile.TemporaryDirectory() as directory:
+        async with backend_app(backend, directory) as app, AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url="http://load-test",
+        ) as client:
+            wallets = []
+            for _ in range(args.hot_wallets + args.wallets):
+                wallet_uuid = (await client.post("/v1/wallets/", json={})).json()["uuid"]
+                await request(client, "deposit", wallet_uuid, args.initial_balance)
+                wallets.append(wallet_uuid)
+            hot, cold = wallets[: args.hot_wallets], wallets[args.hot_wallets :] or wallets
+
+            plan = [
+                (
+                    randomizer.choices(list(mix), weights=list(mix.values()))[0],
+                    randomizer.choice(hot if hot and randomizer.random() < args.hot_ratio else cold),
+                    randomizer.randint(1, 100),
+                )
+                for _ in range(args.requests)
+            ]
+            latencies: dict[str, list[float]] = defaultdict(list)
+            errors: dict[str, int] = defaultdict(int)
+
+            async def operation(index: int):
+                endpoint, wallet_uuid, amount = plan[index]
+                started = time.perf_counter()
+                response = await request(client, endpoint, wallet_uuid, amount)
+                latencies[endpoint].append(time.perf_counter() - started)
+                if response.status_code >= 500:
+                    errors[endpoint] += 1
+
+            _, elapsed = await run_concurrently(operation, args.requests, args.concurrency)
+
+    return {
+        endpoint: summarize(latencies[endpoint], elapsed, errors[endpoint])
+        for endpoint in ENDPOINTS
+        if endpoint in latencies
+    }
+
+
+async def run(args: argparse.Namespace):
+    for backend in args.backend or ["memory", "sqlite"]:
+        report(f"load_test[{backend}]", await run_backend(backend, args), as_json=args.json)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", action="append", choices=["memory", "sqlite"])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--wallets", type=int, default=100)
+    parser.add_argument("--hot-wallets", type=int, default=4)
+    parser.add_argument("--hot-ratio", type=float, default=0.5)
+    parser.add_argument("--initial-balance", type=int, default=10_000)
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
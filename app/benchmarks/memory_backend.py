@@ -0,0 +1,82 @@
+"""Throughput of the transaction service on the in-memory repositories, without HTTP in the way.
+
+    python -m benchmarks.memory_backend --operations 1000000 --concurrency 1000 --wallets 10000
+"""
+import argparse
+import asyncio
+import random
+from decimal import Decimal
+
+from sqlalchemy.ext.asyncio import (
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from benchmarks.common import (
+    report,
+    run_concurrently,
+    summarize,
+)
+from domain.entities.wallets import (
+    OperationType,
+    Transaction as TransactionEntity,
+    Wallet as WalletEntity,
+)
+from infra.database.manager import SessionManager
+from infra.repositories.idempotency.memo_idempotency_repository import MemoryIdempotencyKeyRepository
+from infra.repositories.transactions.memo_transaction_repository import MemoryTransactionRepository
+from infra.repositories.wallets.memo_wallet_repository import MemoryWalletRepository
+from logic.services.transactions import TransactionService
+from logic.services.wallets import (
+    WalletManagementService,
+    WalletService,
+)
+
+
+async def run(args: argparse.Namespace):
+    # sessions only carry the repositories' rollback and unlock hooks; the engine never connects
+    session_manager = SessionManager(async_sessionmaker(create_async_engine("sqlite+aiosqlite:///:memory:")))
+    wallet_repository = MemoryWalletRepository()
+    wallet_service = WalletService(session_manager=session_manager, wallet_repository=wallet_repository)
+    service = TransactionService(
+        session_manager=session_manager,
+        transaction_repository=MemoryTransactionRepository(),
+        wallet_manager_service=WalletManagementService(wallet_repository=wallet_repository),
+        idempotency_key_repository=MemoryIdempotencyKeyRepository(),
+    )
+
+    wallets = [await wallet_service.create_wallet(wallet=WalletEntity()) for _ in range(args.wallets)]
+    randomizer = random.Random(args.seed)  # noqa: S311
+
+    async def create(_: int):
+        await service.create_transaction(
+            TransactionEntity(
+                operation_type=randomizer.choice((OperationType.DEPOSIT, OperationType.WITHDRAW)),
+                amount=Decimal(randomizer.randint(1, 100)),
+                wallet_oid=randomizer.choice(wallets).oid,
+            ),
+        )
+
+    async def list_transactions(_: int):
+        await service.transaction_repository.get_all(wallet_oid=randomizer.choice(wallets).oid, limit=20)
+
+    results = {}
+    for label, operation in (("create_transaction", create), ("list_transactions", list_transactions)):
+        latencies, elapsed = await run_concurrently(operation, args.operations, args.concurrency)
+        results[label] = summarize(latencies, elapsed)
+
+    report("memory_backend", results, as_json=args.json)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operations", type=int, default=100_000)
+    parser.add_argument("--concurrency", type=int, default=1000)
+    parser.add_argument("--wallets", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
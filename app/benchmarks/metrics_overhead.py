@@ -0,0 +1,99 @@
+"""Cost of the metrics instrumentation, per recorded value and per request.
+
+    python -m benchmarks.metrics_overhead --requests 5000 --concurrency 50
+
+The first part times the primitives the hot paths use: observing a bound histogram sample, looking a sample
+up by labels first, and incrementing a counter. The second runs the same deposit/get_wallet workload against
+the in-memory backend with and without ``MetricsMiddleware``; the session and repository instrumentation is
+active in both runs, so the difference is the cost of the middleware alone.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+import timeit
+
+from httpx import (
+    ASGITransport,
+    AsyncClient,
+)
+
+from application.api.metrics.middlewares import MetricsMiddleware
+from benchmarks.common import (
+    report,
+    run_concurrently,
+    summarize,
+)
+from benchmarks.load_test import (
+    backend_app,
+    request,
+)
+from infra.metrics.registry import MetricsRegistry
+
+
+def measure_primitives(number: int) -> dict[str, float]:
+    registry = MetricsRegistry()
+    histogram = registry.histogram("benchmark_seconds", "Benchmark", ("method",))
+    counter = registry.counter("benchmark", "Benchmark", ("exception",))
+    sample = histogram.labels("get")
+
+    operations = {
+        "histogram.observe": lambda: sample.observe(0.003),
+        "histogram.labels.observe": lambda: histogram.labels("get").observe(0.003),
+        "counter.labels.inc": lambda: counter.labels("NotEnoughFundsException").inc(),
+    }
+    return {label: timeit.timeit(operation, number=number) / number * 1e9 for label, operation in operations.items()}
+
+
+async def measure_requests(instrumented: bool, args: argparse.Namespace) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        async with backend_app("memory", directory) as app:
+            if not instrumented:
+                app.user_middleware = [
+                    middleware for middleware in app.user_middleware if middleware.cls is not MetricsMiddleware
+                ]
+
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://metrics") as client:
+                wallet_uuid = (await client.post("/v1/wallets/", json={})).json()["uuid"]
+                latencies = []
+
+                async def operation(index: int):
+                    started = time.perf_counter()
+                    await request(client, "deposit" if index % 2 else "get_wallet", wallet_uuid, 1)
+                    latencies.append(time.perf_counter() - started)
+
+                _, elapsed = await run_concurrently(operation, args.requests, args.concurrency)
+
+    return summarize(latencies, elapsed)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    return {
+        label: await measure_requests(instrumented, args)
+        for label, instrumented in (("without-middleware", False), ("with-middleware", True))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=1_000_000)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    primitives = measure_primitives(args.number)
+    if args.json:
+        sys.stdout.write(json.dumps({"benchmark": "metrics_overhead[primitives]", "ns_per_op": primitives}) + "\n")
+    else:
+        sys.stdout.write("metrics_overhead[primitives]\n")
+        for label, nanoseconds in primitives.items():
+            sys.stdout.write(f"  {label:<26} {nanoseconds:>8.1f} ns/op\n")
+
+    report("metrics_overhead[requests]", asyncio.run(run(args)), as_json=args.json)
+
+
+if __name__ == "__main__":
+    main()
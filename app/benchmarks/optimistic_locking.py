@@ -0,0 +1,118 @@
+"""Single operations in pessimistic and optimistic concurrency mode, at low and high contention.
+
+    python -m benchmarks.optimistic_locking --operations 2000 --concurrency 100 --low-wallets 1000 --high-wallets 2
+
+Pessimistic operations wait on the wallet's row lock; optimistic ones read the wallet unlocked and retry with
+jittered backoff when its version changed in between. The conflicts of each optimistic run are printed after the
+latencies. SQLite serializes every transaction on one connection, so nothing ever conflicts there; pass
+``--database-url postgresql+asyncpg://...`` to measure real contention.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+from decimal import Decimal
+
+from benchmarks.common import (
+    benchmark_database,
+    report,
+    run_concurrently,
+    summarize,
+)
+from domain.entities.wallets import (
+    OperationType,
+    Transaction as TransactionEntity,
+    Wallet as WalletEntity,
+)
+from infra.database.manager import SessionManager
+from infra.metrics.instruments import WALLET_VERSION_CONFLICTS
+from infra.repositories.idempotency.sqlalchemy_idempotency_repository import SQLAlchemyIdempotencyKeyRepository
+from infra.repositories.transactions.sqlalchemy_transaction_repository import SQLAlchemyTransactionRepository
+from infra.repositories.wallets.sqlalchemy_wallet_repository import SQLAlchemyWalletRepository
+from logic.exceptions.wallets import NotEnoughFundsException
+from logic.services.transactions import TransactionService
+from logic.services.wallets import (
+    WalletManagementService,
+    WalletService,
+)
+
+
+async def run(args: argparse.Namespace):
+    results = {}
+    conflicts = {}
+    async with benchmark_database(args.database_url) as session_factory:
+        session_manager = SessionManager(session_factory)
+        wallet_service = WalletService(session_manager=session_manager, wallet_repository=SQLAlchemyWalletRepository())
+
+        for contention, wallet_count in (("low", args.low_wallets), ("high", args.high_wallets)):
+            for mode in ("pessimistic", "optimistic"):
+                service = TransactionService(
+                    session_manager=session_manager,
+                    transaction_repository=SQLAlchemyTransactionRepository(),
+                    wallet_manager_service=WalletManagementService(wallet_repository=SQLAlchemyWalletRepository()),
+                    idempotency_key_repository=SQLAlchemyIdempotencyKeyRepository(),
+                    concurrency_mode=mode,
+                    max_retries=args.max_retries,
+                    retry_backoff=args.backoff,
+                )
+                wallets = await wallet_service.create_wallets(count=wallet_count)
+                for wallet in wallets:
+                    deposit = TransactionEntity(
+                        operation_type=OperationType.DEPOSIT,
+                        amount=Decimal(10**6),
+                        wallet_oid=wallet.oid,
+                    )
+                    await service.create_transaction(deposit)
+                randomizer = random.Random(args.seed)  # noqa: S311
+                rejected = 0
+
+                async def operation(
+                    _: int,
+                    service: TransactionService = service,
+                    wallets: list[WalletEntity] = wallets,
+                    randomizer: random.Random = randomizer,
+                ):
+                    nonlocal rejected
+                    try:
+                        await service.create_transaction(
+                            TransactionEntity(
+                                operation_type=randomizer.choice((OperationType.DEPOSIT, OperationType.WITHDRAW)),
+                                amount=Decimal(randomizer.randint(1, 100)),
+                                wallet_oid=randomizer.choice(wallets).oid,
+                            ),
+                        )
+                    except NotEnoughFundsException:
+                        rejected += 1
+
+                label = f"{mode}-{contention}"
+                conflicts_before = WALLET_VERSION_CONFLICTS.labels().value
+                latencies, elapsed = await run_concurrently(operation, args.operations, args.concurrency)
+                results[label] = summarize(latencies, elapsed, rejected)
+                conflicts[label] = int(WALLET_VERSION_CONFLICTS.labels().value - conflicts_before)
+
+    report("optimistic_locking", results, as_json=args.json)
+    if args.json:
+        sys.stdout.write(json.dumps({"benchmark": "optimistic_locking[conflicts]", "conflicts": conflicts}) + "\n")
+    else:
+        sys.stdout.write("optimistic_locking[conflicts]\n")
+        for label, count in conflicts.items():
+            sys.stdout.write(f"  {label:<24} {count:>7}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operations", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--low-wallets", type=int, default=1000)
+    parser.add_argument("--high-wallets", type=int, default=2)
+    parser.add_argument("--max-retries", type=int, default=5)
+    parser.add_argument("--backoff", type=float, default=0.005)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--json", action="store_true")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Cost of the rate limiter, per check and per request.
+
+    python -m benchmarks.rate_limiter --keys 100000 --requests 5000 --concurrency 50
+
+The first part times ``RateLimiter.check`` on one hot wallet, on ``--keys`` wallets and clients taken in
+turn, and on a store already full of ``--keys`` keys that evicts one on every new key. The second runs the
+same deposit workload against the in-memory backend with the limiter disabled and enabled, with limits high
+enough that nothing is rejected, so the difference is what the limiter adds to a request.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+from httpx import (
+    ASGITransport,
+    AsyncClient,
+)
+
+from benchmarks.common import (
+    report,
+    run_concurrently,
+    summarize,
+)
+from benchmarks.load_test import (
+    backend_app,
+    request,
+)
+from infra.rate_limits.store import MemoryRateLimitStore
+from logic.services.rate_limits import RateLimiter
+
+
+async def time_checks(limiter: RateLimiter, keys: list[str], number: int) -> float:
+    started = time.perf_counter()
+    for index in range(number):
+        key = keys[index % len(keys)]
+        await limiter.check(wallet_oid=key, client=key)
+    return (time.perf_counter() - started) / number * 1e9
+
+
+async def measure_checks(args: argparse.Namespace) -> dict[str, float]:
+    limit = args.number + 1
+    keys = [f"wallet-{index}" for index in range(args.keys)]
+
+    def build(max_keys: int) -> RateLimiter:
+        store = MemoryRateLimitStore(max_keys=max_keys)
+        return RateLimiter(store=store, wallet_limit=limit, client_limit=limit, window=60)
+
+    return {
+        "hot-wallet": await time_checks(build(args.keys), keys[:1], args.number),
+        "spread-wallets": await time_checks(build(args.keys * 2), keys, args.number),
+        "evicting": await time_checks(build(args.keys // 2), keys, args.number),
+    }
+
+
+async def measure_requests(enabled: bool, args: argparse.Namespace) -> dict:
+    os.environ.update(
+        RATE_LIMIT_ENABLED=str(enabled),
+        RATE_LIMIT_WALLET_REQUESTS=str(args.requests + 1),
+        RATE_LIMIT_CLIENT_REQUESTS=str(args.requests + 1),
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        async with backend_app("memory", directory) as app:
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://rate-limiter") as client:
+                wallet_uuids = [(await client.post("/v1/wallets/", json={})).json()["uuid"] for _ in range(100)]
+                latencies = []
+                errors = 0
+
+                async def operation(index: int):
+                    nonlocal errors
+                    started = time.perf_counter()
+                    response = await request(client, "deposit", wallet_uuids[index % len(wallet_uuids)], 1)
+                    latencies.append(time.perf_counter() - started)
+                    errors += response.status_code != 201
+
+                _, elapsed = await run_concurrently(operation, args.requests, args.concurrency)
+
+    return summarize(latencies, elapsed, errors)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    return {
+        label: await measure_requests(enabled, args)
+        for label, enabled in (("limiter-disabled", False), ("limiter-enabled", True))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=200_000)
+    parser.add_argument("--keys", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    checks = asyncio.run(measure_checks(args))
+    if args.json:
+        sys.stdout.write(json.dumps({"benchmark": "rate_limiter[checks]", "ns_per_op": checks}) + "\n")
+    else:
+        sys.stdout.write("rate_limiter[checks]\n")
+        for label, nanoseconds in checks.items():
+            sys.stdout.write(f"  {label:<26} {nanoseconds:>8.1f} ns/op\n")
+
+    report("rate_limiter[requests]", asyncio.run(run(args)), as_json=args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Cost of encoding a transactions page at large page sizes.
+
+    python -m benchmarks.response_serialization --sizes 1000 10000 50000 --repeat 10
+
+``schema`` is the previous path: a response schema per item, validated again against ``response_model`` and
+rendered by ``JSONResponse``. ``adapter`` is what the listing handler does now: one ``TypeAdapter`` dump of plain
+dicts built from the entities. Both are checked to produce the same document before timing.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from datetime import (
+    datetime,
+    timedelta,
+)
+from decimal import Decimal
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from application.api.wallets.v1.schemas import (
+    GetTransactionsQueryResponseSchema,
+    OutTransactionSchema,
+)
+from application.api.wallets.v1.serializers import (
+    encode_transactions_page,
+    json_response,
+)
+from domain.entities.wallets import (
+    OperationType,
+    Transaction as TransactionEntity,
+)
+
+
+RESPONSE_FIELD = create_model_field(name="Response", type_=GetTransactionsQueryResponseSchema, mode="serialization")
+
+
+@dataclass
+class Measurement:
+    ms_per_page: float
+    us_per_item: float
+    bytes: int
+
+
+async def render_schema(transactions: list[TransactionEntity]) -> bytes:
+    schema = GetTransactionsQueryResponseSchema(
+        count=len(transactions),
+        limit=len(transactions),
+        offset=0,
+        items=[OutTransactionSchema.from_entity(transaction) for transaction in transactions],
+    )
+    content = await serialize_response(field=RESPONSE_FIELD, response_content=schema)
+    return JSONResponse(content=content).body
+
+
+async def render_adapter(transactions: list[TransactionEntity]) -> bytes:
+    return json_response(encode_transactions_page(transactions, limit=len(transactions), offset=0)).body
+
+
+def make_page(size: int) -> list[TransactionEntity]:
+    started = datetime.now()
+    return [
+        TransactionEntity(
+            created_at=started + timedelta(microseconds=index),
+            operation_type=OperationType.DEPOSIT if index % 2 else OperationType.WITHDRAW,
+            amount=Decimal(index) / 100,
+            wallet_oid="wallet",
+        )
+        for index in range(size)
+    ]
+
+
+async def measure(render, transactions: list[TransactionEntity], repeat: int) -> Measurement:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = await render(transactions)
+        timings.append(time.perf_counter() - started)
+
+    median = statistics.median(timings)
+    return Measurement(
+        ms_per_page=median * 1000,
+        us_per_item=median / len(transactions) * 1_000_000,
+        bytes=len(body),
+    )
+
+
+async def run(args: argparse.Namespace) -> dict[int, dict[str, Measurement]]:
+    results = {}
+    for size in args.sizes:
+        transactions = make_page(size)
+        if json.loads(await render_schema(transactions)) != json.loads(await render_adapter(transactions)):
+            raise AssertionError(f"encoders disagree on a page of {size}")
+
+        results[size] = {
+            label: await measure(render, transactions, args.repeat)
+            for label, render in (("schema", render_schema), ("adapter", render_adapter))
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    if args.json:
+        sys.stdout.write(
+            json.dumps(
+                {
+                    "benchmark": "response_serialization",
+                    "results": {
+                        size: {label: vars(measurement) for label, measurement in measurements.items()}
+                        for size, measurements in results.items()
+                    },
+                },
+            )
+            + "\n",
+        )
+        return
+
+    sys.stdout.write("response_serialization\n")
+    for size, measurements in results.items():
+        for label, measurement in measurements.items():
+            sys.stdout.write(
+                f"  {size:>6} items  {label:<8} {measurement.ms_per_page:>9.2f} ms/page  "
+                f"{measurement.us_per_item:>6.2f} us/item  {measurement.bytes:>9} bytes\n",
+            )
+
+
+if __name__ == "__main__":
+    main()
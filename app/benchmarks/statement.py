@@ -0,0 +1,132 @@
+"""Latency of a wallet statement read from the daily totals versus summing the transaction log.
+
+    python -m benchmarks.statement --days 365 --per-day 200 --repeat 20
+
+One wallet gets ``--per-day`` transactions on each of ``--days`` days, and the daily totals are built from them
+with the rebuild job's code path. ``rollups`` is the statement endpoint's query. ``transactions`` streams the
+same range through the transaction repository and sums it in Python, as clients paging ``get_all`` do today.
+The first grows with the number of days, the second with the number of transactions.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import (
+    date,
+    datetime,
+    time as day_start,
+    timedelta,
+)
+from decimal import Decimal
+
+from sqlalchemy import insert
+
+from benchmarks.common import (
+    benchmark_database,
+    LatencyStats,
+    report,
+)
+from domain.entities.wallets import (
+    OperationType,
+    Wallet as WalletEntity,
+)
+from domain.values.statements import (
+    Granularity,
+    PeriodTotals,
+    roll_up,
+)
+from infra.database.manager import SessionManager
+from infra.database.models import TransactionModel
+from infra.repositories.daily_totals.sqlalchemy_daily_totals_repository import SQLAlchemyWalletDailyTotalsRepository
+from infra.repositories.transactions.sqlalchemy_transaction_repository import SQLAlchemyTransactionRepository
+from infra.repositories.wallets.sqlalchemy_wallet_repository import SQLAlchemyWalletRepository
+from logic.services.statements import WalletStatementService
+
+
+def stats(timings: list[float]) -> LatencyStats:
+    mean = statistics.mean(timings)
+    return LatencyStats(
+        count=len(timings),
+        ops_per_second=1 / mean if mean else 0.0,
+        p50_ms=statistics.median(timings) * 1000,
+        p95_ms=sorted(timings)[int(len(timings) * 0.95) - 1] * 1000,
+        p99_ms=max(timings) * 1000,
+        max_ms=max(timings) * 1000,
+    )
+
+
+async def run(args: argparse.Namespace):
+    async with benchmark_database(args.database_url) as session_factory:
+        session_manager = SessionManager(session_factory)
+        transaction_repository = SQLAlchemyTransactionRepository()
+        service = WalletStatementService(
+            session_manager=session_manager,
+            daily_totals_repository=SQLAlchemyWalletDailyTotalsRepository(),
+            wallet_repository=SQLAlchemyWalletRepository(),
+            transaction_repository=transaction_repository,
+        )
+        async with session_manager as session:
+            wallet = await service.wallet_repository.add(wallet=WalletEntity(), session=session)
+
+        randomizer = random.Random(args.seed)  # noqa: S311
+        first_day = date.today() - timedelta(days=args.days)
+        async with session_manager as session:
+            for offset in range(args.days):
+                start = datetime.combine(first_day + timedelta(days=offset), day_start())
+                await session.execute(
+                    insert(TransactionModel),
+                    [
+                        {
+                            "oid": f"{offset}-{index}",
+                            "created_at": start + timedelta(seconds=index),
+                            "amount": Decimal(randomizer.randint(1, 100)),
+                            "operation_type": randomizer.choice((OperationType.DEPOSIT, OperationType.WITHDRAW)),
+                            "wallet_oid": wallet.oid,
+                        }
+                        for index in range(args.per_day)
+                    ],
+                )
+        await service.rebuild_wallet_daily_totals(wallet_oid=wallet.oid, before=date.today())
+
+        async def from_rollups() -> list[PeriodTotals]:
+            return await service.get_statement(
+                wallet_oid=wallet.oid,
+                day_from=first_day,
+                day_to=date.today(),
+                granularity=Granularity.MONTH,
+            )
+
+        async def from_transactions() -> list[PeriodTotals]:
+            totals: list[PeriodTotals] = []
+            async with session_manager as session:
+                async for transactions in transaction_repository.stream(wallet_oid=wallet.oid, session=session):
+                    totals = roll_up([*totals, *map(PeriodTotals.from_transaction, transactions)])
+            return roll_up(totals, Granularity.MONTH)
+
+        results, statements = {}, {}
+        for label, read in (("rollups", from_rollups), ("transactions", from_transactions)):
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                statements[label] = await read()
+                timings.append(time.perf_counter() - started)
+            results[label] = stats(timings)
+        assert statements["rollups"] == statements["transactions"]
+
+    report("statement", results, as_json=args.json)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--per-day", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--json", action="store_true")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
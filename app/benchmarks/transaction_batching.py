@@ -0,0 +1,95 @@
+"""Throughput of the per-request write path against group commit on a handful of hot wallets.
+
+    python -m benchmarks.transaction_batching --operations 2000 --concurrency 200 --wallets 4
+"""
+import argparse
+import asyncio
+import random
+from decimal import Decimal
+
+from benchmarks.common import (
+    benchmark_database,
+    report,
+    run_concurrently,
+    summarize,
+)
+from domain.entities.wallets import (
+    OperationType,
+    Transaction as TransactionEntity,
+    Wallet as WalletEntity,
+)
+from infra.database.manager import SessionManager
+from infra.repositories.idempotency.sqlalchemy_idempotency_repository import SQLAlchemyIdempotencyKeyRepository
+from infra.repositories.transactions.sqlalchemy_transaction_repository import SQLAlchemyTransactionRepository
+from infra.repositories.wallets.sqlalchemy_wallet_repository import SQLAlchemyWalletRepository
+from logic.services.transactions import (
+    BatchedTransactionService,
+    TransactionService,
+)
+from logic.services.wallets import (
+    WalletManagementService,
+    WalletService,
+)
+
+
+async def run(args: argparse.Namespace):
+    results = {}
+    async with benchmark_database(args.database_url) as session_factory:
+        session_manager = SessionManager(session_factory)
+        wallet_service = WalletService(session_manager=session_manager, wallet_repository=SQLAlchemyWalletRepository())
+        services = {
+            "per-request": TransactionService(
+                session_manager=session_manager,
+                transaction_repository=SQLAlchemyTransactionRepository(),
+                wallet_manager_service=WalletManagementService(wallet_repository=SQLAlchemyWalletRepository()),
+                idempotency_key_repository=SQLAlchemyIdempotencyKeyRepository(),
+            ),
+            "group-commit": BatchedTransactionService(
+                session_manager=session_manager,
+                transaction_repository=SQLAlchemyTransactionRepository(),
+                wallet_manager_service=WalletManagementService(wallet_repository=SQLAlchemyWalletRepository()),
+                idempotency_key_repository=SQLAlchemyIdempotencyKeyRepository(),
+                batch_window=args.window_ms / 1000,
+                batch_max_size=args.max_batch,
+            ),
+        }
+
+        for label, service in services.items():
+            wallets = [await wallet_service.create_wallet(wallet=WalletEntity()) for _ in range(args.wallets)]
+            randomizer = random.Random(args.seed)  # noqa: S311
+
+            async def operation(
+                _: int,
+                service: TransactionService = service,
+                wallets: list = wallets,
+                randomizer: random.Random = randomizer,
+            ):
+                await service.create_transaction(
+                    TransactionEntity(
+                        operation_type=randomizer.choice((OperationType.DEPOSIT, OperationType.WITHDRAW)),
+                        amount=Decimal(randomizer.randint(1, 100)),
+                        wallet_oid=randomizer.choice(wallets).oid,
+                    ),
+                )
+
+            latencies, elapsed = await run_concurrently(operation, args.operations, args.concurrency)
+            results[label] = summarize(latencies, elapsed)
+
+    report("transaction_batching", results, as_json=args.json)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operations", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--wallets", type=int, default=4)
+    parser.add_argument("--window-ms", type=float, default=2.0)
+    parser.add_argument("--max-batch", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--json", action="store_true")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Random cross transfers among a pool of wallets: throughput, failures and whether money is conserved.
+
+    python -m benchmarks.transfers --wallets 100 --operations 5000 --concurrency 100
+
+``transfer`` uses the single-transaction transfer, which locks both wallets in oid order. ``withdraw+deposit``
+is the previous two-call workaround. Every run starts each wallet with ``--initial-balance`` and checks
+afterwards that the balances still add up to the money put in. Any error other than a rejected overdraft, such
+as a deadlock, is counted. Row locks only contend with ``--database-url postgresql+asyncpg://...``; SQLite
+serializes the writers.
+"""
+import argparse
+import asyncio
+import random
+import sys
+from decimal import Decimal
+
+from benchmarks.common import (
+    benchmark_database,
+    report,
+    run_concurrently,
+    summarize,
+)
+from domain.entities.wallets import (
+    OperationType,
+    Transaction as TransactionEntity,
+    Transfer as TransferEntity,
+    Wallet as WalletEntity,
+)
+from infra.database.manager import SessionManager
+from infra.repositories.idempotency.sqlalchemy_idempotency_repository import SQLAlchemyIdempotencyKeyRepository
+from infra.repositories.transactions.sqlalchemy_transaction_repository import SQLAlchemyTransactionRepository
+from infra.repositories.wallets.sqlalchemy_wallet_repository import SQLAlchemyWalletRepository
+from logic.exceptions.wallets import NotEnoughFundsException
+from logic.services.transactions import TransactionService
+from logic.services.wallets import (
+    WalletManagementService,
+    WalletService,
+)
+
+
+async def transfer_in_two_calls(service: TransactionService, transfer: TransferEntity):
+    await service.create_transaction(
+        TransactionEntity(
+            operation_type=OperationType.WITHDRAW,
+            amount=transfer.amount,
+            wallet_oid=transfer.source_wallet_oid,
+        ),
+    )
+    await service.create_transaction(
+        TransactionEntity(
+            operation_type=OperationType.DEPOSIT,
+            amount=transfer.amount,
+            wallet_oid=transfer.destination_wallet_oid,
+        ),
+    )
+
+
+async def run(args: argparse.Namespace):
+    results = {}
+    async with benchmark_database(args.database_url) as session_factory:
+        session_manager = SessionManager(session_factory)
+        wallet_repository = SQLAlchemyWalletRepository()
+        wallet_service = WalletService(session_manager=session_manager, wallet_repository=wallet_repository)
+        service = TransactionService(
+            session_manager=session_manager,
+            transaction_repository=SQLAlchemyTransactionRepository(),
+            wallet_manager_service=WalletManagementService(wallet_repository=wallet_repository),
+            idempotency_key_repository=SQLAlchemyIdempotencyKeyRepository(),
+        )
+
+        for label in ("transfer", "withdraw+deposit"):
+            wallets = [await wallet_service.create_wallet(wallet=WalletEntity()) for _ in range(args.wallets)]
+            await service.create_transactions_bulk(
+                [
+                    TransactionEntity(
+                        operation_type=OperationType.DEPOSIT,
+                        amount=Decimal(args.initial_balance),
+                        wallet_oid=wallet.oid,
+                    )
+                    for wallet in wallets
+                ],
+            )
+            randomizer = random.Random(args.seed)  # noqa: S311
+            errors = 0
+
+            async def operation(
+                _: int,
+                label: str = label,
+                wallets: list[WalletEntity] = wallets,
+                randomizer: random.Random = randomizer,
+            ):
+                nonlocal errors
+                source, destination = randomizer.sample(wallets, 2)
+                transfer = TransferEntity(
+                    source_wallet_oid=source.oid,
+                    destination_wallet_oid=destination.oid,
+                    amount=Decimal(randomizer.randint(1, args.initial_balance)),
+                )
+                try:
+                    if label == "transfer":
+                        await service.create_transfer(transfer)
+                    else:
+                        await transfer_in_two_calls(service, transfer)
+                except NotEnoughFundsException:
+                    pass
+                except Exception:
+                    errors += 1
+                    raise
+
+            latencies, elapsed = await run_concurrently(operation, args.operations, args.concurrency)
+            results[label] = summarize(latencies, elapsed, errors=errors)
+
+            total = sum([(await wallet_service.get_wallet(wallet_oid=wallet.oid)).balance for wallet in wallets])
+            expected = Decimal(args.initial_balance * args.wallets)
+            if total != expected:
+                sys.stdout.write(f"{label}: total balance {total}, expected {expected}\n")
+
+    report("transfers", results, as_json=args.json)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wallets", type=int, default=100)
+    parser.add_argument("--operations", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--initial-balance", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--json", action="store_true")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,7 @@ from enum import Enum
 from uuid import uuid4
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class BaseEntity:
     oid: str = field(
         default_factory=lambda: str(uuid4()),
@@ -20,16 +20,117 @@ class BaseEntity:
 class OperationType(Enum):
     DEPOSIT = "DEPOSIT"
     WITHDRAW = "WITHDRAW"
+    # one leg of a transfer; the amount is negative on the sending wallet
+    TRANSFER = "TRANSFER"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Wallet(BaseEntity):
-    balance: Decimal = field(kw_only=True, default=0)
+    balance: Decimal = field(kw_only=True, default=Decimal(0))
     updated_at: datetime | None = field(default=None)
+    # bumped by every change to the wallet row, for optimistic updates
+    version: int = field(kw_only=True, default=0)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Transaction(BaseEntity):
     wallet_oid: str = field(kw_only=True)
     amount: Decimal = field(kw_only=True)
     operation_type: OperationType
+    counterparty_wallet_oid: str | None = field(default=None, kw_only=True)
+    transfer_oid: str | None = field(default=None, kw_only=True)
+
+    @property
+    def balance_delta(self) -> Decimal:
+        return -self.amount if self.operation_type == OperationType.WITHDRAW else self.amount
+
+
+@dataclass(slots=True, frozen=True)
+class Transfer(BaseEntity):
+    """Money moved from one wallet to another, recorded as a pair of TRANSFER transactions linked by its oid."""
+
+    source_wallet_oid: str = field(kw_only=True)
+    destination_wallet_oid: str = field(kw_only=True)
+    amount: Decimal = field(kw_only=True)
+
+    def to_transactions(self) -> tuple[Transaction, Transaction]:
+        debit = Transaction(
+            operation_type=OperationType.TRANSFER,
+            amount=-self.amount,
+            wallet_oid=self.source_wallet_oid,
+            counterparty_wallet_oid=self.destination_wallet_oid,
+            transfer_oid=self.oid,
+        )
+        credit = Transaction(
+            operation_type=OperationType.TRANSFER,
+            amount=self.amount,
+            wallet_oid=self.destination_wallet_oid,
+            counterparty_wallet_oid=self.source_wallet_oid,
+            transfer_oid=self.oid,
+        )
+        return debit, credit
+
+
+@dataclass(slots=True, frozen=True)
+class WalletSnapshot(BaseEntity):
+    """Balance of a wallet right after ``last_transaction_oid``, created at ``as_of``."""
+
+    wallet_oid: str = field(kw_only=True)
+    balance: Decimal = field(kw_only=True)
+    last_transaction_oid: str = field(kw_only=True)
+    as_of: datetime = field(kw_only=True)
+
+
+@dataclass(slots=True, frozen=True)
+class IdempotencyKey(BaseEntity):
+    """Client-supplied ``key`` of a request that created ``transaction``.
+
+    ``fingerprint`` identifies the operation the key was first used for, so a retry can be told apart from a
+    different request that reuses the key.
+    """
+
+    key: str = field(kw_only=True)
+    wallet_oid: str = field(kw_only=True)
+    fingerprint: str = field(kw_only=True)
+    transaction: Transaction = field(kw_only=True)
+
+    @classmethod
+    def for_transaction(cls, key: str, transaction: Transaction) -> "IdempotencyKey":
+        return cls(
+            key=key,
+            wallet_oid=transaction.wallet_oid,
+            fingerprint=cls.fingerprint_of(transaction),
+            transaction=transaction,
+        )
+
+    @staticmethod
+    def fingerprint_of(transaction: Transaction) -> str:
+        operation_type = OperationType(transaction.operation_type).value
+        return f"{operation_type}:{Decimal(str(transaction.amount)).normalize()}"
+
+    def matches(self, transaction: Transaction) -> bool:
+        return self.fingerprint == self.fingerprint_of(transaction)
+
+
+@dataclass(slots=True, frozen=True)
+class WalletEvent(BaseEntity):
+    """Change of a wallet's balance, written to the outbox in the database transaction that made it.
+
+    ``offset`` is assigned when the event is stored; it orders the events of all wallets and lets a consumer
+    resume right after the last event it has seen.
+    """
+
+    wallet_oid: str = field(kw_only=True)
+    transaction_oid: str = field(kw_only=True)
+    operation_type: OperationType = field(kw_only=True)
+    amount: Decimal = field(kw_only=True)
+    offset: int | None = field(default=None, kw_only=True)
+
+    @classmethod
+    def for_transaction(cls, transaction: Transaction) -> "WalletEvent":
+        return cls(
+            wallet_oid=transaction.wallet_oid,
+            transaction_oid=transaction.oid,
+            operation_type=transaction.operation_type,
+            amount=transaction.amount,
+        )
@@ -22,3 +22,21 @@ class TransactionAmountNegativeValueException(ApplicationException):
     @property
     def message(self):
         return "Invalid transaction amount"
+
+
+@dataclass
+class InvalidCursorException(ApplicationException):
+    cursor: str
+
+    @property
+    def message(self):
+        return f"Invalid pagination cursor: {self.cursor}"
+
+
+@dataclass
+class IdempotencyKeyConflictException(ApplicationException):
+    key: str
+
+    @property
+    def message(self):
+        return f"Idempotency key is already taken: {self.key}"
@@ -0,0 +1,34 @@
+import json
+from base64 import (
+    urlsafe_b64decode,
+    urlsafe_b64encode,
+)
+from dataclasses import dataclass
+from datetime import datetime
+
+from domain.entities.wallets import Transaction as TransactionEntity
+from domain.exceptions import InvalidCursorException
+
+
+@dataclass(frozen=True)
+class TransactionCursor:
+    """Position right after a transaction in the ``(created_at, oid)`` order, opaque to API clients."""
+
+    created_at: datetime
+    oid: str
+
+    @classmethod
+    def from_transaction(cls, transaction: TransactionEntity) -> "TransactionCursor":
+        return cls(created_at=transaction.created_at, oid=transaction.oid)
+
+    def encode(self) -> str:
+        raw = json.dumps([self.created_at.isoformat(), self.oid]).encode()
+        return urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, value: str) -> "TransactionCursor":
+        try:
+            created_at, oid = json.loads(urlsafe_b64decode(value + "=" * (-len(value) % 4)))
+            return cls(created_at=datetime.fromisoformat(created_at), oid=str(oid))
+        except (ValueError, TypeError) as exception:
+            raise InvalidCursorException(cursor=value) from exception
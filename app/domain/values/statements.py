@@ -0,0 +1,69 @@
+from collections.abc import Iterable
+from dataclasses import (
+    dataclass,
+    replace,
+)
+from datetime import date
+from decimal import Decimal
+from enum import Enum
+
+from domain.entities.wallets import (
+    OperationType,
+    Transaction as TransactionEntity,
+)
+
+
+class Granularity(Enum):
+    DAY = "day"
+    MONTH = "month"
+
+    def period_of(self, day: date) -> date:
+        return day if self == Granularity.DAY else day.replace(day=1)
+
+
+@dataclass(frozen=True)
+class PeriodTotals:
+    """Money moved in and out of a wallet during the period starting on ``period``."""
+
+    wallet_oid: str
+    period: date
+    deposits: Decimal = Decimal(0)
+    withdrawals: Decimal = Decimal(0)
+    transfers_in: Decimal = Decimal(0)
+    transfers_out: Decimal = Decimal(0)
+    operations: int = 0
+
+    @classmethod
+    def from_transaction(cls, transaction: TransactionEntity) -> "PeriodTotals":
+        totals = cls(wallet_oid=transaction.wallet_oid, period=transaction.created_at.date(), operations=1)
+        if transaction.operation_type == OperationType.DEPOSIT:
+            return replace(totals, deposits=transaction.amount)
+        if transaction.operation_type == OperationType.WITHDRAW:
+            return replace(totals, withdrawals=transaction.amount)
+        if transaction.amount >= 0:
+            return replace(totals, transfers_in=transaction.amount)
+        return replace(totals, transfers_out=-transaction.amount)
+
+    @property
+    def net(self) -> Decimal:
+        return self.deposits - self.withdrawals + self.transfers_in - self.transfers_out
+
+    def __add__(self, other: "PeriodTotals") -> "PeriodTotals":
+        return replace(
+            self,
+            deposits=self.deposits + other.deposits,
+            withdrawals=self.withdrawals + other.withdrawals,
+            transfers_in=self.transfers_in + other.transfers_in,
+            transfers_out=self.transfers_out + other.transfers_out,
+            operations=self.operations + other.operations,
+        )
+
+
+def roll_up(totals: Iterable[PeriodTotals], granularity: Granularity = Granularity.DAY) -> list[PeriodTotals]:
+    """Sums the totals per wallet and period of ``granularity``, in wallet and period order."""
+    rolled_up: dict[tuple[str, date], PeriodTotals] = {}
+    for item in totals:
+        key = (item.wallet_oid, granularity.period_of(item.period))
+        current = rolled_up.get(key)
+        rolled_up[key] = current + item if current else replace(item, period=key[1])
+    return [rolled_up[key] for key in sorted(rolled_up)]
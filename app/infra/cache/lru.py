@@ -0,0 +1,64 @@
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import (
+    dataclass,
+    field,
+)
+from time import monotonic
+from typing import (
+    Generic,
+    TypeVar,
+)
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+@dataclass
+class LRUCache(Generic[K, V]):
+    """Bounded in-process cache: least recently used entries are evicted first, entries expire after ``ttl``."""
+
+    max_size: int = 10_000
+    ttl: float | None = None
+    stats: CacheStats = field(default_factory=CacheStats)
+
+    _entries: OrderedDict[K, tuple[float, V]] = field(default_factory=OrderedDict, init=False)
+
+    def get(self, key: K) -> V | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at < monotonic():
+            del self._entries[key]
+            self.stats.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def set(self, key: K, value: V):
+        expires_at = monotonic() + self.ttl if self.ttl is not None else float("inf")
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def delete(self, key: K):
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
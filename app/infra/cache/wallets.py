@@ -0,0 +1,85 @@
+from abc import (
+    ABC,
+    abstractmethod,
+)
+from collections import OrderedDict
+from dataclasses import (
+    dataclass,
+    field,
+)
+
+from domain.entities.wallets import Wallet as WalletEntity
+from infra.cache.lru import (
+    CacheStats,
+    LRUCache,
+)
+
+
+@dataclass
+class BaseWalletCache(ABC):
+    """Wallet cache backend.
+
+    Read-through fills are guarded by versions: a reader takes ``current_version()`` before it queries the
+    database and passes it to ``set``, which must drop the value if the wallet was invalidated in between.
+    A shared backend such as Redis implements this with a per-key counter bumped by ``invalidate`` and a
+    compare-and-set on that counter in ``set``.
+    """
+
+    @abstractmethod
+    async def get(self, wallet_oid: str) -> WalletEntity | None: ...
+
+    @abstractmethod
+    async def current_version(self) -> int: ...
+
+    @abstractmethod
+    async def set(self, wallet_oid: str, wallet: WalletEntity, version: int): ...
+
+    @abstractmethod
+    async def invalidate(self, wallet_oid: str): ...
+
+    @abstractmethod
+    def stats(self) -> CacheStats: ...
+
+    @abstractmethod
+    def __len__(self) -> int: ...
+
+
+@dataclass
+class MemoryWalletCache(BaseWalletCache):
+    max_size: int = 10_000
+    ttl: float | None = 5.0
+
+    _entries: LRUCache[str, WalletEntity] = field(init=False)
+    _invalidations: OrderedDict[str, int] = field(default_factory=OrderedDict, init=False)
+    _version: int = field(default=0, init=False)
+    _forgotten_version: int = field(default=0, init=False)
+
+    def __post_init__(self):
+        self._entries = LRUCache(max_size=self.max_size, ttl=self.ttl)
+
+    async def get(self, wallet_oid: str) -> WalletEntity | None:
+        return self._entries.get(wallet_oid)
+
+    async def current_version(self) -> int:
+        return self._version
+
+    async def set(self, wallet_oid: str, wallet: WalletEntity, version: int):
+        # wallets whose invalidation record was dropped are compared against the newest dropped record
+        if self._invalidations.get(wallet_oid, self._forgotten_version) > version:
+            return
+        self._entries.set(wallet_oid, wallet)
+
+    async def invalidate(self, wallet_oid: str):
+        self._version += 1
+        self._entries.delete(wallet_oid)
+
+        self._invalidations[wallet_oid] = self._version
+        self._invalidations.move_to_end(wallet_oid)
+        while len(self._invalidations) > self.max_size:
+            _, self._forgotten_version = self._invalidations.popitem(last=False)
+
+    def stats(self) -> CacheStats:
+        return self._entries.stats
+
+    def __len__(self) -> int:
+        return len(self._entries)
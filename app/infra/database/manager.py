@@ -1,38 +1,247 @@
+import logging
+from collections.abc import (
+    Awaitable,
+    Callable,
+    Sequence,
+)
+from contextvars import ContextVar
+from datetime import datetime
+from time import perf_counter
+
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
     AsyncSession,
     create_async_engine,
 )
+from sqlalchemy.orm import (
+    ORMExecuteState,
+    Session,
+)
 
 from infra.database.models import Base
+from infra.database.partitions import (
+    create_partitions,
+    is_partitioned,
+    TRANSACTIONS_TABLE,
+)
+from infra.database.pool import (
+    get_pool_stats,
+    InstrumentedAsyncAdaptedQueuePool,
+    PoolStats,
+)
+from infra.database.replicas import (
+    ReadYourWrites,
+    ReplicaSelection,
+    ReplicaSessionFactory,
+)
+from infra.metrics.instruments import DB_SESSION_DURATION
+from settings.config import Settings
+
+
+logger = logging.getLogger(__name__)
+
+AFTER_COMMIT_KEY = "after_commit"
+ON_ROLLBACK_KEY = "on_rollback"
+ON_CLOSE_KEY = "on_close"
+STARTED_AT_KEY = "started_at"
+WROTE_KEY = "wrote"
+
+SESSION_DURATION = {outcome: DB_SESSION_DURATION.labels(outcome) for outcome in ("commit", "rollback", "unused")}
+
+
+async def after_commit(session: AsyncSession | None, callback: Callable[[], Awaitable[None]]):
+    """Runs ``callback`` once the session's transaction commits; it is dropped if the session rolls back.
+
+    In-memory repositories work without a session, in which case the callback runs right away.
+    """
+    if session is None:
+        await callback()
+        return
+
+    session.info.setdefault(AFTER_COMMIT_KEY, []).append(callback)
+
+
+def on_rollback(session: AsyncSession | None, callback: Callable[[], None]):
+    """Runs ``callback`` if the session's transaction rolls back; callbacks run in reverse registration order.
+
+    In-memory repositories use it to undo their writes, since the database rollback does not reach them.
+    """
+    if session is not None:
+        session.info.setdefault(ON_ROLLBACK_KEY, []).append(callback)
+
+
+def on_close(session: AsyncSession | None, callback: Callable[[], None]):
+    """Runs ``callback`` once the session is closed, whatever the outcome; right away when there is no session."""
+    if session is None:
+        callback()
+        return
+
+    session.info.setdefault(ON_CLOSE_KEY, []).append(callback)
+
+
+async def use_consistent_snapshot(session: AsyncSession):
+    """Makes every statement of the session's transaction read the same snapshot of the database.
+
+    Must be called before the session runs its first statement. Only Postgres is switched to REPEATABLE READ;
+    SQLite is used for tests, where nothing writes concurrently.
+    """
+    if session.bind.dialect.name == "postgresql":
+        await session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_statement_writes(orm_execute_state: ORMExecuteState):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[WROTE_KEY] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flush_writes(session: Session, flush_context):
+    session.info[WROTE_KEY] = True
+
+
+def get_engine_options(database_url: str, settings: Settings) -> dict:
+    options = {"echo": settings.DB_ECHO}
+    if database_url.startswith("sqlite"):
+        return options
+
+    options.update(
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    if database_url.startswith("postgresql+asyncpg"):
+        options["connect_args"] = {
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "server_settings": settings.DB_SERVER_SETTINGS,
+        }
+    return options
 
 
 class DatabaseManager:
-    def __init__(self, database_url: str):
-        self.engine = create_async_engine(database_url, echo=True)
+    def __init__(
+        self,
+        database_url: str,
+        partitions_ahead: int = 3,
+        replica_urls: Sequence[str] = (),
+        replica_selection: ReplicaSelection = "round_robin",
+        **engine_options,
+    ):
+        self.partitions_ahead = partitions_ahead
+        self.engine = create_async_engine(database_url, **engine_options)
         self.SessionLocal = async_sessionmaker(
             bind=self.engine,
             class_=AsyncSession,
             expire_on_commit=True,
         )
+        # replicas share the primary's dialect, so they get the same engine options
+        self.replica_engines = [create_async_engine(replica_url, **engine_options) for replica_url in replica_urls]
+        self.ReplicaSessionLocal = (
+            ReplicaSessionFactory(engines=self.replica_engines, selection=replica_selection)
+            if self.replica_engines
+            else None
+        )
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "DatabaseManager":
+        return cls(
+            settings.db_url,
+            partitions_ahead=settings.TRANSACTION_PARTITIONS_AHEAD,
+            replica_urls=settings.DB_REPLICA_URLS,
+            replica_selection=settings.DB_REPLICA_SELECTION,
+            **get_engine_options(settings.db_url, settings),
+        )
+
+    def pool_stats(self) -> PoolStats:
+        return get_pool_stats(self.engine.pool)
 
     async def init_models(self):
         async with self.engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+            # a partitioned table accepts no rows until a partition covers them
+            if await is_partitioned(conn):
+                await create_partitions(conn, TRANSACTIONS_TABLE, datetime.now(), self.partitions_ahead)
+            elif conn.dialect.name == "postgresql":
+                logger.warning("The %s table is not partitioned, no partitions are created", TRANSACTIONS_TABLE)
 
 
 class SessionManager:
-    def __init__(self, session_factory: async_sessionmaker):
+    """Opens one session per ``async with`` block.
+
+    The manager is shared between concurrent requests, so open sessions are kept in a context variable
+    instead of on the instance: every task sees only the sessions it opened itself.
+
+    With a ``read_session_factory``, ``reader`` is a second manager whose sessions go to the read replicas,
+    except for a client that committed a write less than the ``read_your_writes`` window ago: its reads stay
+    on the primary, so it sees its own writes despite replication lag. Without replicas ``reader`` is the
+    manager itself.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        read_session_factory: Callable[[], AsyncSession] | None = None,
+        read_your_writes: ReadYourWrites | None = None,
+    ):
         self.session_factory = session_factory
+        self.read_session_factory = read_session_factory
+        self.read_your_writes = read_your_writes
+        self._sessions: ContextVar[tuple[AsyncSession, ...]] = ContextVar(f"sessions_{id(self)}", default=())
+        self.reader = self if read_session_factory is None else SessionManager(self._open_read_session)
+
+    def _open_read_session(self) -> AsyncSession:
+        if self.read_your_writes is not None and self.read_your_writes.wrote_recently():
+            return self.session_factory()
+        return self.read_session_factory()
+
+    @property
+    def session(self) -> AsyncSession:
+        return self._sessions.get()[-1]
 
     async def __aenter__(self):
-        self.session: AsyncSession = self.session_factory()
-        return self.session
+        session: AsyncSession = self.session_factory()
+        session.info[STARTED_AT_KEY] = perf_counter()
+        self._sessions.set((*self._sessions.get(), session))
+        return session
 
     async def __aexit__(self, exc_type, exc_value, traceback):
-        if exc_type:
-            await self.session.rollback()
+        *opened, session = self._sessions.get()
+        self._sessions.set(tuple(opened))
+        callbacks = session.info.pop(AFTER_COMMIT_KEY, [])
+        rollback_callbacks = session.info.pop(ON_ROLLBACK_KEY, [])
+        close_callbacks = session.info.pop(ON_CLOSE_KEY, [])
+        # a session that never ran a statement has nothing to end, which spares the in-memory repositories
+        # and cache hits a round of greenlet switches
+        started = session.in_transaction()
+        outcome = "commit" if started else "unused"
+        try:
+            if exc_type:
+                if started:
+                    await session.rollback()
+                raise
+            elif started:
+                await session.commit()
+                if self.read_your_writes is not None and session.info.get(WROTE_KEY):
+                    self.read_your_writes.record_write()
+        except BaseException:
+            outcome = "rollback"
+            for callback in reversed(rollback_callbacks):
+                callback()
             raise
-        else:
-            await self.session.commit()
-        await self.session.close()
+        finally:
+            if started:
+                await session.close()
+            for callback in close_callbacks:
+                callback()
+            SESSION_DURATION[outcome].observe(perf_counter() - session.info.pop(STARTED_AT_KEY))
+
+        for callback in callbacks:
+            try:
+                await callback()
+            except Exception:
+                # the transaction is already committed, so the caller must still see it succeed
+                logger.exception("After-commit callback failed")
@@ -1,14 +1,21 @@
-from datetime import datetime
+from datetime import (
+    date,
+    datetime,
+)
 from decimal import Decimal
 
 from domain.entities.wallets import OperationType
 from sqlalchemy import (
+    BigInteger,
+    Date,
     DateTime,
     Enum,
     ForeignKey,
     Index,
+    Integer,
     Numeric,
     String,
+    UniqueConstraint,
 )
 from sqlalchemy.orm import (
     DeclarativeBase,
@@ -23,10 +30,18 @@ class Base(DeclarativeBase):
 
 
 class WalletModel(Base):
+    """``balance`` is the whole balance of a wallet with one shard.
+
+    A wallet with ``balance_shards`` > 1 also holds part of its balance in ``wallet_balance_shards`` rows
+    1 to ``balance_shards - 1``; ``balance`` is then shard 0.
+    """
+
     __tablename__ = "wallets"
 
     oid: Mapped[str] = mapped_column(String, primary_key=True, unique=True)
-    balance: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False, default=0)
+    balance: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False, default=Decimal(0))
+    balance_shards: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime,
@@ -41,16 +56,115 @@ class WalletModel(Base):
     )
 
 
+class WalletBalanceShardModel(Base):
+    __tablename__ = "wallet_balance_shards"
+
+    wallet_oid: Mapped[str] = mapped_column(ForeignKey("wallets.oid"), primary_key=True)
+    shard: Mapped[int] = mapped_column(Integer, primary_key=True)
+    balance: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False, default=Decimal(0))
+
+
+class WalletDailyTotalsModel(Base):
+    """Per-day totals of a wallet's operations, kept up to date in the transactions that make them.
+
+    A day's totals may be spread over several ``shard`` rows, like the balance, so concurrent deposits to a hot
+    wallet do not queue up on one row; reads sum them.
+    """
+
+    __tablename__ = "wallet_daily_totals"
+
+    wallet_oid: Mapped[str] = mapped_column(ForeignKey("wallets.oid"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    shard: Mapped[int] = mapped_column(Integer, primary_key=True, default=0)
+    # a day's turnover can exceed any balance the wallet ever holds
+    deposits: Mapped[Decimal] = mapped_column(Numeric(14, 2), nullable=False, default=Decimal(0))
+    withdrawals: Mapped[Decimal] = mapped_column(Numeric(14, 2), nullable=False, default=Decimal(0))
+    transfers_in: Mapped[Decimal] = mapped_column(Numeric(14, 2), nullable=False, default=Decimal(0))
+    transfers_out: Mapped[Decimal] = mapped_column(Numeric(14, 2), nullable=False, default=Decimal(0))
+    operations: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
 class TransactionModel(Base):
+    """On Postgres the table is range partitioned by month of ``created_at``; see ``infra.database.partitions``.
+
+    A partitioned table can only enforce keys that include the partition column, hence the ``(oid, created_at)``
+    primary key. SQLite ignores the partitioning clause and creates a plain table with the same columns.
+    """
+
     __tablename__ = "transactions"
 
-    oid: Mapped[str] = mapped_column(String, primary_key=True, unique=True)
+    oid: Mapped[str] = mapped_column(String, primary_key=True)
     amount: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
     operation_type: Mapped[OperationType] = mapped_column(Enum(OperationType), nullable=False)
     wallet_oid: Mapped[str] = mapped_column(ForeignKey("wallets.oid"), nullable=False)
+    # both legs of a transfer carry its oid and the wallet on the other side
+    counterparty_wallet_oid: Mapped[str | None] = mapped_column(String, nullable=True)
+    transfer_oid: Mapped[str | None] = mapped_column(String, nullable=True)
 
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+    created_at: Mapped[datetime] = mapped_column(DateTime, primary_key=True, default=datetime.now)
 
     wallet: Mapped["WalletModel"] = relationship("WalletModel", back_populates="transactions")
 
-    __table_args__ = (Index("ix_transactions_wallet_oid", "wallet_oid"),)
+    __table_args__ = (
+        Index("ix_transactions_wallet_oid_created_at_oid", "wallet_oid", "created_at", "oid"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+
+class WalletSnapshotModel(Base):
+    __tablename__ = "wallet_snapshots"
+
+    oid: Mapped[str] = mapped_column(String, primary_key=True, unique=True)
+    wallet_oid: Mapped[str] = mapped_column(ForeignKey("wallets.oid"), nullable=False)
+    balance: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
+    last_transaction_oid: Mapped[str] = mapped_column(String, nullable=False)
+    as_of: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+
+    __table_args__ = (Index("ix_wallet_snapshots_wallet_oid_as_of", "wallet_oid", "as_of"),)
+
+
+class IdempotencyKeyModel(Base):
+    __tablename__ = "idempotency_keys"
+
+    oid: Mapped[str] = mapped_column(String, primary_key=True, unique=True)
+    key: Mapped[str] = mapped_column(String, nullable=False)
+    wallet_oid: Mapped[str] = mapped_column(String, nullable=False)
+    fingerprint: Mapped[str] = mapped_column(String, nullable=False)
+    transaction_oid: Mapped[str] = mapped_column(String, nullable=False)
+    # with the oid, locates the transaction's row in a single partition
+    transaction_created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+
+    __table_args__ = (
+        UniqueConstraint("wallet_oid", "key", name="uq_idempotency_keys_wallet_oid_key"),
+        Index("ix_idempotency_keys_created_at", "created_at"),
+    )
+
+
+class WalletEventModel(Base):
+    """Outbox of balance changes. ``offset`` comes from the database, so it follows insertion order."""
+
+    __tablename__ = "wallet_events"
+
+    # SQLite only autoincrements a plain INTEGER primary key
+    offset: Mapped[int] = mapped_column(
+        "id",
+        BigInteger().with_variant(Integer, "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+    )
+    oid: Mapped[str] = mapped_column(String, nullable=False, unique=True)
+    wallet_oid: Mapped[str] = mapped_column(String, nullable=False)
+    transaction_oid: Mapped[str] = mapped_column(String, nullable=False)
+    operation_type: Mapped[OperationType] = mapped_column(Enum(OperationType), nullable=False)
+    amount: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+
+    __table_args__ = (
+        Index("ix_wallet_events_wallet_oid_id", "wallet_oid", "id"),
+        Index("ix_wallet_events_created_at", "created_at"),
+    )
@@ -0,0 +1,152 @@
+import re
+from dataclasses import (
+    dataclass,
+    field,
+)
+from datetime import (
+    date,
+    datetime,
+)
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import (
+    Engine,
+    text,
+)
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncSession,
+)
+
+
+TRANSACTIONS_TABLE = "transactions"
+
+# what ``is_partitioned`` last found on each engine, for reads that cannot query the catalog themselves
+_partitioned_engines: WeakKeyDictionary[Engine, bool] = WeakKeyDictionary()
+
+
+@dataclass(frozen=True)
+class MonthlyPartition:
+    """The partition of ``table`` that holds rows created from the first day of ``month`` to the next month.
+
+    Partitions are named ``<table>_pYYYYMM``, so their bounds can be read back from the catalog by name.
+    """
+
+    table: str
+    month: date
+
+    @classmethod
+    def containing(cls, table: str, moment: date) -> "MonthlyPartition":
+        return cls(table=table, month=date(moment.year, moment.month, 1))
+
+    @classmethod
+    def from_name(cls, table: str, name: str) -> "MonthlyPartition | None":
+        match = re.fullmatch(rf"{re.escape(table)}_p(\d{{4}})(\d{{2}})", name)
+        if match is None:
+            return None
+        return cls(table=table, month=date(int(match[1]), int(match[2]), 1))
+
+    @property
+    def name(self) -> str:
+        return f"{self.table}_p{self.month:%Y%m}"
+
+    @property
+    def end(self) -> date:
+        return self.shifted(1).month
+
+    def shifted(self, months: int) -> "MonthlyPartition":
+        year, month = divmod(self.month.year * 12 + self.month.month - 1 + months, 12)
+        return MonthlyPartition(table=self.table, month=date(year, month + 1, 1))
+
+
+@dataclass
+class PartitionMaintenanceReport:
+    created: list[str] = field(default_factory=list)
+    detached: list[str] = field(default_factory=list)
+
+
+async def is_partitioned(connection: AsyncConnection) -> bool:
+    """Whether the transactions table is partitioned, read from the catalog.
+
+    SQLite creates it as a plain table. So does Postgres when the table predates partitioning: ``create_all``
+    skips existing tables, and such a table accepts no partitions until it is migrated.
+    """
+    partitioned = False
+    if connection.dialect.name == "postgresql":
+        result = await connection.execute(
+            text(
+                "SELECT EXISTS (SELECT FROM pg_partitioned_table "
+                "JOIN pg_class ON pg_class.oid = pg_partitioned_table.partrelid "
+                "WHERE pg_class.relname = :table AND pg_class.relkind = 'p')",
+            ),
+            {"table": TRANSACTIONS_TABLE},
+        )
+        partitioned = result.scalar_one()
+
+    _partitioned_engines[connection.sync_engine] = partitioned
+    return partitioned
+
+
+def prunes_partitions(session: AsyncSession) -> bool:
+    """Whether reads through ``session`` can skip partitions, as ``is_partitioned`` last found on its engine.
+
+    Engines it has not checked, such as replicas, are assumed partitioned on Postgres: the bounds that let reads
+    skip partitions are still correct on a plain table.
+    """
+    engine = session.bind.sync_engine
+    return _partitioned_engines.get(engine, engine.dialect.name == "postgresql")
+
+
+async def list_partitions(connection: AsyncConnection, table: str) -> list[MonthlyPartition]:
+    result = await connection.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :table",
+        ),
+        {"table": table},
+    )
+    partitions = (MonthlyPartition.from_name(table, name) for name in result.scalars())
+    return sorted((partition for partition in partitions if partition is not None), key=lambda p: p.month)
+
+
+async def create_partitions(connection: AsyncConnection, table: str, now: datetime, months_ahead: int) -> list[str]:
+    """Creates the partitions for the current month and ``months_ahead`` months after it, if they are missing.
+
+    There is no default partition: a row outside every partition fails to insert instead of landing in a
+    catch-all table that would block creating its month's partition later.
+    """
+    existing = {partition.name for partition in await list_partitions(connection, table)}
+    current = MonthlyPartition.containing(table, now)
+
+    created = []
+    for partition in (current.shifted(offset) for offset in range(months_ahead + 1)):
+        if partition.name in existing:
+            continue
+        await connection.execute(
+            text(
+                f"CREATE TABLE {partition.name} PARTITION OF {partition.table} "  # noqa: S608
+                f"FOR VALUES FROM ('{partition.month}') TO ('{partition.end}')",
+            ),
+        )
+        created.append(partition.name)
+    return created
+
+
+async def detach_partitions(connection: AsyncConnection, table: str, now: datetime, retention_months: int) -> list[str]:
+    """Detaches partitions whose rows are all older than ``retention_months`` full months before ``now``.
+
+    Detached partitions stay in the database as standalone tables, for archiving or dropping, but reads of the
+    parent table no longer see them. Ledger replays start from wallet snapshots, which must therefore be newer
+    than the detached range.
+    """
+    cutoff = MonthlyPartition.containing(table, now).shifted(-retention_months).month
+
+    detached = []
+    for partition in await list_partitions(connection, table):
+        if partition.end > cutoff:
+            break
+        await connection.execute(text(f"ALTER TABLE {table} DETACH PARTITION {partition.name}"))
+        detached.append(partition.name)
+    return detached
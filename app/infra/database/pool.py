@@ -0,0 +1,64 @@
+from dataclasses import dataclass
+from time import perf_counter
+
+from sqlalchemy.pool import (
+    AsyncAdaptedQueuePool,
+    ConnectionPoolEntry,
+    Pool,
+)
+
+
+@dataclass
+class PoolWaitStats:
+    checkouts: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+
+@dataclass
+class PoolStats:
+    size: int
+    checked_out: int
+    idle: int
+    overflow: int
+    checkouts: int
+    total_wait: float
+    max_wait: float
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a free connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started = perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = perf_counter() - started
+            self.wait_stats.checkouts += 1
+            self.wait_stats.total_wait += waited
+            self.wait_stats.max_wait = max(self.wait_stats.max_wait, waited)
+
+    def recreate(self) -> "InstrumentedAsyncAdaptedQueuePool":
+        pool = super().recreate()
+        pool.wait_stats = self.wait_stats
+        return pool
+
+
+def get_pool_stats(pool: Pool) -> PoolStats:
+    # SQLite test pools have neither a size nor wait tracking
+    wait_stats = getattr(pool, "wait_stats", PoolWaitStats())
+    size = pool.size() if hasattr(pool, "size") else 0
+    return PoolStats(
+        size=size,
+        checked_out=pool.checkedout() if hasattr(pool, "checkedout") else 0,
+        idle=pool.checkedin() if hasattr(pool, "checkedin") else 0,
+        overflow=max(pool.overflow(), 0) if hasattr(pool, "overflow") else 0,
+        checkouts=wait_stats.checkouts,
+        total_wait=wait_stats.total_wait,
+        max_wait=wait_stats.max_wait,
+    )
@@ -0,0 +1,125 @@
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import (
+    dataclass,
+    field,
+)
+from itertools import count
+from time import (
+    monotonic,
+    time,
+)
+from typing import Literal
+
+from sqlalchemy.ext.asyncio import (
+    async_sessionmaker,
+    AsyncEngine,
+    AsyncSession,
+)
+
+from infra.database.pool import get_pool_stats
+
+
+REPLICA_SESSION_KEY = "replica"
+
+ReplicaSelection = Literal["round_robin", "least_connections"]
+
+# set by the API for every request, so the reads of a client can follow its writes
+current_client: ContextVar[str | None] = ContextVar("current_client", default=None)
+
+
+@dataclass
+class WriteToken:
+    """The last write of a client as it carries it between requests, so any worker can route its reads.
+
+    ``seen`` is the timestamp the client sent with the request, ``written`` the one of a write the request
+    committed. Both are wall-clock seconds, so the hosts' clocks must agree to well within the window.
+    """
+
+    seen: float | None = None
+    written: float | None = None
+
+
+current_write_token: ContextVar[WriteToken | None] = ContextVar("current_write_token", default=None)
+
+
+def is_replica_session(session: AsyncSession | None) -> bool:
+    return session is not None and session.info.get(REPLICA_SESSION_KEY, False)
+
+
+@dataclass
+class ReadYourWrites:
+    """Remembers when each client last committed a write, so its reads can go to the primary until the
+    replicas have caught up.
+
+    A client that sends back the write token of its last write reads from the primary on any worker. Without
+    the token this is best-effort: the clients are kept in this process only, so a read served by another
+    worker may go to a lagging replica, and the least recently writing clients are forgotten beyond
+    ``max_clients``. Code running outside a request has no client and always reads from the replicas.
+    """
+
+    window: float
+    max_clients: int = 100_000
+
+    _written_at: OrderedDict[str, float] = field(default_factory=OrderedDict, init=False)
+
+    def record_write(self):
+        write_token = current_write_token.get()
+        if write_token is not None:
+            write_token.written = time()
+
+        client = current_client.get()
+        if client is None or self.window <= 0:
+            return
+
+        self._written_at[client] = monotonic()
+        self._written_at.move_to_end(client)
+        while len(self._written_at) > self.max_clients:
+            self._written_at.popitem(last=False)
+
+    def wrote_recently(self) -> bool:
+        write_token = current_write_token.get()
+        if write_token is not None and write_token.seen is not None and time() - write_token.seen < self.window:
+            return True
+
+        client = current_client.get()
+        if client is None:
+            return False
+
+        written_at = self._written_at.get(client)
+        return written_at is not None and monotonic() - written_at < self.window
+
+
+@dataclass
+class ReplicaSessionFactory:
+    """Opens sessions on read-only replicas, choosing one per session.
+
+    ``round_robin`` takes the replicas in turn; ``least_connections`` takes the one whose pool has the fewest
+    checked-out connections, in turn among equally busy ones.
+    """
+
+    engines: list[AsyncEngine]
+    selection: ReplicaSelection = "round_robin"
+
+    _session_factories: list[async_sessionmaker] = field(init=False)
+    _turns: count = field(default_factory=count, init=False)
+
+    def __post_init__(self):
+        self._session_factories = [
+            async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=True) for engine in self.engines
+        ]
+
+    def select(self) -> int:
+        turn = next(self._turns)
+        if self.selection == "round_robin":
+            return turn % len(self.engines)
+
+        loads = [get_pool_stats(engine.pool).checked_out for engine in self.engines]
+        least = min(loads)
+        candidates = [index for index, load in enumerate(loads) if load == least]
+        return candidates[turn % len(candidates)]
+
+    def __call__(self) -> AsyncSession:
+        session = self._session_factories[self.select()]()
+        session.info[REPLICA_SESSION_KEY] = True
+        return session
@@ -0,0 +1,54 @@
+import asyncio
+from collections import defaultdict
+from dataclasses import (
+    dataclass,
+    field,
+)
+
+from domain.entities.wallets import WalletEvent as WalletEventEntity
+
+
+@dataclass(eq=False)
+class Subscription:
+    """Live events of one wallet. ``None`` in the queue means the subscriber fell behind and was dropped."""
+
+    wallet_oid: str
+    queue: asyncio.Queue[WalletEventEntity | None]
+
+
+@dataclass
+class WalletEventBroker:
+    """Fans the dispatched events out to the subscribers of their wallet, within one process.
+
+    Publishing never waits: a subscriber whose queue is full is dropped instead of slowing the dispatcher
+    down, and resumes from the outbox.
+    """
+
+    queue_size: int = 1000
+
+    _subscriptions: defaultdict[str, set[Subscription]] = field(default_factory=lambda: defaultdict(set), init=False)
+
+    def subscribe(self, wallet_oid: str) -> Subscription:
+        # one slot is kept free for the drop marker
+        subscription = Subscription(wallet_oid=wallet_oid, queue=asyncio.Queue(maxsize=self.queue_size + 1))
+        self._subscriptions[wallet_oid].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscriptions = self._subscriptions.get(subscription.wallet_oid)
+        if subscriptions is None:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscriptions[subscription.wallet_oid]
+
+    def publish(self, event: WalletEventEntity):
+        for subscription in tuple(self._subscriptions.get(event.wallet_oid, ())):
+            if subscription.queue.qsize() < self.queue_size:
+                subscription.queue.put_nowait(event)
+                continue
+            subscription.queue.put_nowait(None)
+            self.unsubscribe(subscription)
+
+    def __len__(self) -> int:
+        return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
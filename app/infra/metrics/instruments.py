@@ -0,0 +1,76 @@
+from infra.metrics.registry import REGISTRY
+
+
+ROW_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1_000, 5_000, 10_000, 50_000)
+
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of its response",
+    ("method", "handler", "status"),
+)
+
+DB_SESSION_DURATION = REGISTRY.histogram(
+    "db_session_duration_seconds",
+    "Time a session stays open, up to the end of its commit or rollback",
+    ("outcome",),
+)
+
+WALLET_LOCK_WAIT = REGISTRY.histogram(
+    "wallet_lock_wait_seconds",
+    "Time spent by statements that lock wallet rows, including the wait for the lock",
+    ("backend",),
+)
+
+WALLET_VERSION_CONFLICTS = REGISTRY.counter(
+    "wallet_version_conflicts",
+    "Optimistic wallet updates that found the wallet changed since it was read",
+)
+
+REPOSITORY_QUERY_DURATION = REGISTRY.histogram(
+    "repository_query_duration_seconds",
+    "Latency of repository calls that query the database",
+    ("repository", "method"),
+)
+
+REPOSITORY_QUERY_ROWS = REGISTRY.histogram(
+    "repository_query_rows",
+    "Rows returned by repository calls that query the database",
+    ("repository", "method"),
+    buckets=ROW_BUCKETS,
+)
+
+ADMISSION_IN_FLIGHT = REGISTRY.gauge(
+    "admission_in_flight",
+    "Requests holding an admission slot in this worker",
+    ("kind",),
+)
+
+ADMISSION_QUEUE_DEPTH = REGISTRY.gauge(
+    "admission_queue_depth",
+    "Requests waiting for an admission slot in this worker",
+    ("kind",),
+)
+
+ADMISSION_WAIT = REGISTRY.histogram(
+    "admission_wait_seconds",
+    "Time admitted requests waited in the admission queue",
+    ("kind",),
+)
+
+ADMISSION_REJECTED = REGISTRY.counter(
+    "admission_rejected",
+    "Requests rejected with 429 because the admission queue was full or the wait timed out",
+    ("kind", "reason"),
+)
+
+RATE_LIMIT_REJECTED = REGISTRY.counter(
+    "rate_limit_rejected",
+    "Requests rejected with 429 by the per-client or per-wallet rate limit",
+    ("scope",),
+)
+
+APPLICATION_EXCEPTIONS = REGISTRY.counter(
+    "application_exceptions",
+    "Application exceptions reported to clients, such as NotEnoughFundsException or WalletNotFoundException",
+    ("exception",),
+)
@@ -0,0 +1,231 @@
+from bisect import bisect_left
+from collections.abc import (
+    Iterator,
+    Sequence,
+)
+from dataclasses import (
+    dataclass,
+    field,
+)
+from time import perf_counter
+from typing import (
+    Generic,
+    TypeVar,
+)
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+S = TypeVar("S")
+
+
+class CounterSample:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+
+class GaugeSample:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+
+class HistogramSample:
+    """Observations of one label set. Bucket counts are kept per bucket and only made cumulative on render."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        # the last slot is the +Inf bucket
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def time(self) -> "Timer":
+        return Timer(self)
+
+
+class Timer:
+    __slots__ = ("sample", "started")
+
+    def __init__(self, sample: HistogramSample):
+        self.sample = sample
+
+    def __enter__(self):
+        self.started = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.sample.observe(perf_counter() - self.started)
+
+
+@dataclass
+class Metric(Generic[S]):
+    """A named metric with one sample per label set.
+
+    The process is single-threaded, so samples are updated without locks. Hot paths should keep the sample
+    returned by ``labels`` instead of looking it up on every call.
+    """
+
+    type = "untyped"
+
+    name: str
+    documentation: str
+    label_names: Sequence[str] = ()
+
+    _samples: dict[tuple[str, ...], S] = field(default_factory=dict, init=False)
+
+    def labels(self, *values: str) -> S:
+        sample = self._samples.get(values)
+        if sample is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} expects labels {tuple(self.label_names)}, got {values}")
+            sample = self._samples[values] = self._new_sample()
+        return sample
+
+    def _new_sample(self) -> S:
+        raise NotImplementedError
+
+    def _render_samples(self, labels: str, sample: S) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {escape_help(self.documentation)}"
+        yield f"# TYPE {self.name} {self.type}"
+        for values, sample in self._samples.items():
+            yield from self._render_samples(format_labels(self.label_names, values), sample)
+
+
+@dataclass
+class Counter(Metric[CounterSample]):
+    type = "counter"
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def _new_sample(self) -> CounterSample:
+        return CounterSample()
+
+    def _render_samples(self, labels: str, sample: CounterSample) -> Iterator[str]:
+        yield f"{self.name}_total{braced(labels)} {format_value(sample.value)}"
+
+
+@dataclass
+class Gauge(Metric[GaugeSample]):
+    type = "gauge"
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def _new_sample(self) -> GaugeSample:
+        return GaugeSample()
+
+    def _render_samples(self, labels: str, sample: GaugeSample) -> Iterator[str]:
+        yield f"{self.name}{braced(labels)} {format_value(sample.value)}"
+
+
+@dataclass
+class Histogram(Metric[HistogramSample]):
+    type = "histogram"
+
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def time(self) -> Timer:
+        return self.labels().time()
+
+    def _new_sample(self) -> HistogramSample:
+        return HistogramSample(self.buckets)
+
+    def _render_samples(self, labels: str, sample: HistogramSample) -> Iterator[str]:
+        separator = "," if labels else ""
+        cumulative = 0
+        for bound, count in zip((*sample.bounds, float("inf")), sample.counts, strict=True):
+            cumulative += count
+            yield f'{self.name}_bucket{{{labels}{separator}le="{format_value(bound)}"}} {cumulative}'
+        yield f"{self.name}_sum{braced(labels)} {format_value(sample.sum)}"
+        yield f"{self.name}_count{braced(labels)} {sample.count}"
+
+
+@dataclass
+class MetricsRegistry:
+    metrics: dict[str, Metric] = field(default_factory=dict)
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name=name, documentation=documentation, label_names=label_names))
+
+    def gauge(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name=name, documentation=documentation, label_names=label_names))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(
+            Histogram(name=name, documentation=documentation, label_names=label_names, buckets=tuple(sorted(buckets))),
+        )
+
+    def render(self) -> str:
+        """Renders every metric in the Prometheus text exposition format."""
+        return "".join(f"{line}\n" for metric in self.metrics.values() for line in metric.render())
+
+    def _register(self, metric: Metric) -> Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def format_labels(names: Sequence[str], values: tuple[str, ...]) -> str:
+    return ",".join(f'{name}="{escape_label(value)}"' for name, value in zip(names, values, strict=True))
+
+
+def braced(labels: str) -> str:
+    return f"{{{labels}}}" if labels else ""
+
+
+def escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def escape_label(value: str) -> str:
+    return escape_help(value).replace('"', '\\"')
+
+
+REGISTRY = MetricsRegistry()
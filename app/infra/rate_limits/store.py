@@ -0,0 +1,104 @@
+from abc import (
+    ABC,
+    abstractmethod,
+)
+from collections import OrderedDict
+from dataclasses import (
+    dataclass,
+    field,
+)
+from time import monotonic
+
+
+@dataclass
+class BaseRateLimitStore(ABC):
+    """Rate limit counters.
+
+    ``hit`` counts one request for ``key`` if the key stays within ``limit`` requests per sliding ``window``.
+    A shared backend such as Redis implements it with a script that keeps the same two counters per key,
+    expiring after two windows, so every worker enforces one limit.
+    """
+
+    @abstractmethod
+    async def hit(self, key: str, limit: int, window: float) -> float:
+        """Returns 0 when the request is counted, otherwise the seconds until it would be."""
+
+    @abstractmethod
+    def __len__(self) -> int: ...
+
+
+class SlidingWindow:
+    """Request counts of the current fixed window and of the one before it.
+
+    The rate over the sliding window is estimated as the current count plus the previous count weighted by
+    the share of the previous window the sliding one still overlaps.
+    """
+
+    __slots__ = ("window", "started", "count", "previous")
+
+    def __init__(self, window: float, started: float):
+        self.window = window
+        self.started = started
+        self.count = 0
+        self.previous = 0
+
+    def advance(self, now: float):
+        elapsed = now - self.started
+        if elapsed >= self.window:
+            windows = int(elapsed // self.window)
+            self.previous = self.count if windows == 1 else 0
+            self.count = 0
+            self.started += windows * self.window
+
+    def retry_after(self, now: float, limit: int) -> float:
+        """Seconds until one more request fits within ``limit``; 0 when it fits now."""
+        elapsed = now - self.started
+        if self.previous * (1 - elapsed / self.window) + self.count + 1 <= limit:
+            return 0.0
+        if self.count >= limit:
+            # nothing fits before the next window, where this window's count is the one weighted down
+            return self.started + self.window - now + self.window * (1 - (limit - 1) / self.count)
+        return self.window * (1 - (limit - self.count - 1) / self.previous) - elapsed
+
+    def is_idle(self, now: float) -> bool:
+        # after two windows without requests both counts are zero
+        return now - self.started >= 2 * self.window
+
+
+@dataclass
+class MemoryRateLimitStore(BaseRateLimitStore):
+    """Sliding-window counters of this process, two integers per key.
+
+    Keys are kept in least recently used order: idle keys are evicted as new keys come in, and the least
+    recently used keys beyond ``max_keys`` are evicted even when they are not idle yet.
+    """
+
+    max_keys: int = 100_000
+
+    _windows: OrderedDict[str, SlidingWindow] = field(default_factory=OrderedDict, init=False)
+
+    async def hit(self, key: str, limit: int, window: float) -> float:
+        now = monotonic()
+        entry = self._windows.get(key)
+        if entry is None:
+            # only new keys grow the store, so they pay for the eviction
+            self._evict(now)
+            entry = self._windows[key] = SlidingWindow(window, now)
+        else:
+            self._windows.move_to_end(key)
+            entry.advance(now)
+
+        retry_after = entry.retry_after(now, limit)
+        if not retry_after:
+            entry.count += 1
+        return retry_after
+
+    def _evict(self, now: float):
+        while self._windows:
+            key = next(iter(self._windows))
+            if len(self._windows) < self.max_keys and not self._windows[key].is_idle(now):
+                return
+            del self._windows[key]
+
+    def __len__(self) -> int:
+        return len(self._windows)
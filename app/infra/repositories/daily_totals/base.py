@@ -0,0 +1,23 @@
+from abc import (
+    ABC,
+    abstractmethod,
+)
+from dataclasses import dataclass
+from datetime import date
+
+from domain.values.statements import PeriodTotals
+
+
+@dataclass
+class BaseWalletDailyTotalsRepository(ABC):
+    @abstractmethod
+    async def add(self, totals: list[PeriodTotals]):
+        """Adds each item to the stored totals of its wallet and day, which start at zero."""
+
+    @abstractmethod
+    async def get_range(self, wallet_oid: str, day_from: date, day_to: date) -> list[PeriodTotals]:
+        """Returns the totals of the days from ``day_from`` to ``day_to`` inclusive that had operations, in order."""
+
+    @abstractmethod
+    async def replace_before(self, wallet_oid: str, before: date, totals: list[PeriodTotals]):
+        """Replaces every stored total of the wallet for days before ``before`` with ``totals``."""
@@ -0,0 +1,52 @@
+from dataclasses import (
+    dataclass,
+    field,
+)
+from datetime import date
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from domain.values.statements import PeriodTotals
+from infra.database.manager import on_rollback
+from infra.repositories.daily_totals.base import BaseWalletDailyTotalsRepository
+
+
+@dataclass
+class MemoryWalletDailyTotalsRepository(BaseWalletDailyTotalsRepository):
+    totals: dict[str, dict[date, PeriodTotals]] = field(default_factory=dict)
+
+    async def add(self, totals: list[PeriodTotals], session: AsyncSession | None = None):
+        replaced = []
+        for item in totals:
+            days = self.totals.setdefault(item.wallet_oid, {})
+            previous = days.get(item.period)
+            days[item.period] = previous + item if previous else item
+            replaced.append((days, item.period, previous))
+
+        def undo():
+            for days, day, previous in reversed(replaced):
+                if previous is None:
+                    del days[day]
+                else:
+                    days[day] = previous
+
+        on_rollback(session, undo)
+
+    async def get_range(self, wallet_oid: str, day_from: date, day_to: date, *args, **kwargs) -> list[PeriodTotals]:
+        days = self.totals.get(wallet_oid, {})
+        return [days[day] for day in sorted(days) if day_from <= day <= day_to]
+
+    async def replace_before(
+        self,
+        wallet_oid: str,
+        before: date,
+        totals: list[PeriodTotals],
+        session: AsyncSession | None = None,
+    ):
+        days = self.totals.setdefault(wallet_oid, {})
+        previous = dict(days)
+        for day in [day for day in days if day < before]:
+            del days[day]
+        days.update((item.period, item) for item in totals)
+        on_rollback(session, lambda: self.totals.__setitem__(wallet_oid, previous))
+
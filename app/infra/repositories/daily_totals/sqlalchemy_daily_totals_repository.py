@@ -0,0 +1,106 @@
+import random
+from dataclasses import dataclass
+from datetime import date
+
+from sqlalchemy import (
+    delete,
+    func,
+    insert,
+    Row,
+    select,
+)
+from sqlalchemy.dialects import (
+    postgresql,
+    sqlite,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from domain.values.statements import PeriodTotals
+from infra.database.models import WalletDailyTotalsModel
+from infra.repositories.daily_totals.base import BaseWalletDailyTotalsRepository
+from infra.repositories.instrumentation import instrument_repository
+
+
+TOTAL_COLUMNS = ("deposits", "withdrawals", "transfers_in", "transfers_out", "operations")
+
+
+def to_row(item: PeriodTotals, shard: int = 0) -> dict:
+    return {
+        "wallet_oid": item.wallet_oid,
+        "day": item.period,
+        "shard": shard,
+        **{column: getattr(item, column) for column in TOTAL_COLUMNS},
+    }
+
+
+def to_totals(wallet_oid: str, row: Row) -> PeriodTotals:
+    day, deposits, withdrawals, transfers_in, transfers_out, operations = row
+    return PeriodTotals(
+        wallet_oid=wallet_oid,
+        period=day,
+        deposits=deposits,
+        withdrawals=withdrawals,
+        transfers_in=transfers_in,
+        transfers_out=transfers_out,
+        operations=operations,
+    )
+
+
+@instrument_repository("daily_totals")
+@dataclass
+class SQLAlchemyWalletDailyTotalsRepository(BaseWalletDailyTotalsRepository):
+    """Daily totals spread over ``shards`` rows per wallet and day; each write adds to one of them at random."""
+
+    shards: int = 1
+
+    async def add(self, totals: list[PeriodTotals], session: AsyncSession):
+        if not totals:
+            return
+
+        # rows are upserted in key order, so concurrent bulks touching several wallets do not deadlock
+        shard = random.randrange(self.shards)  # noqa: S311
+        dialect = postgresql if session.bind.dialect.name == "postgresql" else sqlite
+        stmt = dialect.insert(WalletDailyTotalsModel).values(
+            [to_row(item, shard) for item in sorted(totals, key=lambda item: (item.wallet_oid, item.period))],
+        )
+        await session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["wallet_oid", "day", "shard"],
+                set_={
+                    column: getattr(WalletDailyTotalsModel, column) + getattr(stmt.excluded, column)
+                    for column in TOTAL_COLUMNS
+                },
+            ),
+        )
+
+    async def get_range(
+        self,
+        wallet_oid: str,
+        day_from: date,
+        day_to: date,
+        session: AsyncSession,
+    ) -> list[PeriodTotals]:
+        result = await session.execute(
+            select(
+                WalletDailyTotalsModel.day,
+                *(func.sum(getattr(WalletDailyTotalsModel, column)) for column in TOTAL_COLUMNS),
+            )
+            .where(
+                WalletDailyTotalsModel.wallet_oid == wallet_oid,
+                WalletDailyTotalsModel.day >= day_from,
+                WalletDailyTotalsModel.day <= day_to,
+            )
+            .group_by(WalletDailyTotalsModel.day)
+            .order_by(WalletDailyTotalsModel.day),
+        )
+        return [to_totals(wallet_oid, row) for row in result]
+
+    async def replace_before(self, wallet_oid: str, before: date, totals: list[PeriodTotals], session: AsyncSession):
+        await session.execute(
+            delete(WalletDailyTotalsModel).where(
+                WalletDailyTotalsModel.wallet_oid == wallet_oid,
+                WalletDailyTotalsModel.day < before,
+            ),
+        )
+        if totals:
+            await session.execute(insert(WalletDailyTotalsModel), [to_row(item) for item in totals])
@@ -0,0 +1,45 @@
+from abc import (
+    ABC,
+    abstractmethod,
+)
+from dataclasses import dataclass
+from datetime import datetime
+
+from domain.entities.wallets import WalletEvent as WalletEventEntity
+
+
+@dataclass
+class BaseWalletEventRepository(ABC):
+    @abstractmethod
+    async def add_many(self, events: list[WalletEventEntity]):
+        """Stores the events in order; each gets the next offset."""
+
+    @abstractmethod
+    async def get_last_offset(self) -> int:
+        """Returns the offset of the newest stored event, 0 when there is none."""
+
+    @abstractmethod
+    async def get_after(
+        self,
+        after: int,
+        limit: int = 1000,
+        wallet_oid: str | None = None,
+        up_to: int | None = None,
+    ) -> list[WalletEventEntity]:
+        """Returns committed events with an offset above ``after`` (and at most ``up_to``) in offset order.
+
+        Offsets are taken at insert, so the result can skip offsets of transactions still in flight.
+        """
+
+    @abstractmethod
+    async def get_transaction_horizon(self) -> tuple[int, int] | None:
+        """Returns the oldest database transaction still running and the first one not started yet, or ``None``
+        when the database cannot tell.
+
+        An event is inserted after the other writes of its transaction, so the transaction of an offset missing
+        from ``get_after`` started before the second number read after it, and has finished once the first
+        number reaches that.
+        """
+
+    @abstractmethod
+    async def delete_expired(self, created_before: datetime, limit: int = 1000) -> int: ...
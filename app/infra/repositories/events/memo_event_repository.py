@@ -0,0 +1,71 @@
+from bisect import (
+    bisect_left,
+    bisect_right,
+)
+from dataclasses import (
+    dataclass,
+    field,
+    replace,
+)
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from domain.entities.wallets import WalletEvent as WalletEventEntity
+from infra.database.manager import on_rollback
+from infra.repositories.events.base import BaseWalletEventRepository
+
+
+@dataclass
+class MemoryWalletEventRepository(BaseWalletEventRepository):
+    events: list[WalletEventEntity] = field(default_factory=list)
+
+    _offsets: list[int] = field(default_factory=list, init=False)
+    _last_offset: int = field(default=0, init=False)
+
+    async def add_many(self, events: list[WalletEventEntity], session: AsyncSession | None = None):
+        stored = [replace(event, offset=self._last_offset + index) for index, event in enumerate(events, start=1)]
+        self._last_offset += len(stored)
+        self.events.extend(stored)
+        self._offsets.extend(event.offset for event in stored)
+
+        # like a database sequence, the offsets of rolled back events are not reused
+        def undo():
+            for event in stored:
+                index = bisect_left(self._offsets, event.offset)
+                if index < len(self._offsets) and self._offsets[index] == event.offset:
+                    del self._offsets[index]
+                    del self.events[index]
+
+        on_rollback(session, undo)
+
+    async def get_last_offset(self, *args, **kwargs) -> int:
+        return self._offsets[-1] if self._offsets else 0
+
+    async def get_after(
+        self,
+        after: int,
+        limit: int = 1000,
+        wallet_oid: str | None = None,
+        up_to: int | None = None,
+        *args,
+        **kwargs,
+    ) -> list[WalletEventEntity]:
+        events = []
+        for event in self.events[bisect_right(self._offsets, after) :]:
+            if len(events) == limit or (up_to is not None and event.offset > up_to):
+                break
+            if wallet_oid is None or event.wallet_oid == wallet_oid:
+                events.append(event)
+        return events
+
+    async def get_transaction_horizon(self, *args, **kwargs) -> tuple[int, int] | None:
+        return None
+
+    async def delete_expired(self, created_before: datetime, limit: int = 1000, *args, **kwargs) -> int:
+        expired = 0
+        while expired < min(limit, len(self.events)) and self.events[expired].created_at < created_before:
+            expired += 1
+        del self.events[:expired]
+        del self._offsets[:expired]
+        return expired
@@ -0,0 +1,112 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import (
+    delete,
+    func,
+    insert,
+    Row,
+    select,
+    text,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from domain.entities.wallets import WalletEvent as WalletEventEntity
+from infra.database.models import WalletEventModel
+from infra.repositories.events.base import BaseWalletEventRepository
+from infra.repositories.instrumentation import instrument_repository
+
+
+EVENT_COLUMNS = (
+    WalletEventModel.offset,
+    WalletEventModel.oid,
+    WalletEventModel.created_at,
+    WalletEventModel.wallet_oid,
+    WalletEventModel.transaction_oid,
+    WalletEventModel.operation_type,
+    WalletEventModel.amount,
+)
+
+
+def to_entity(row: Row) -> WalletEventEntity:
+    offset, oid, created_at, wallet_oid, transaction_oid, operation_type, amount = row
+    return WalletEventEntity(
+        offset=offset,
+        oid=oid,
+        created_at=created_at,
+        wallet_oid=wallet_oid,
+        transaction_oid=transaction_oid,
+        operation_type=operation_type,
+        amount=amount,
+    )
+
+
+@instrument_repository("wallet_events")
+@dataclass
+class SQLAlchemyWalletEventRepository(BaseWalletEventRepository):
+    async def add_many(self, events: list[WalletEventEntity], session: AsyncSession):
+        await session.execute(
+            insert(WalletEventModel),
+            [
+                {
+                    "oid": event.oid,
+                    "created_at": event.created_at,
+                    "wallet_oid": event.wallet_oid,
+                    "transaction_oid": event.transaction_oid,
+                    "operation_type": event.operation_type,
+                    "amount": event.amount,
+                }
+                for event in events
+            ],
+        )
+
+    async def get_last_offset(self, session: AsyncSession) -> int:
+        result = await session.execute(select(func.coalesce(func.max(WalletEventModel.offset), 0)))
+        return result.scalar_one()
+
+    async def get_after(
+        self,
+        after: int,
+        session: AsyncSession,
+        limit: int = 1000,
+        wallet_oid: str | None = None,
+        up_to: int | None = None,
+    ) -> list[WalletEventEntity]:
+        stmt = (
+            select(*EVENT_COLUMNS)
+            .where(WalletEventModel.offset > after)
+            .order_by(WalletEventModel.offset)
+            .limit(limit)
+        )
+        if wallet_oid is not None:
+            stmt = stmt.where(WalletEventModel.wallet_oid == wallet_oid)
+        if up_to is not None:
+            stmt = stmt.where(WalletEventModel.offset <= up_to)
+
+        result = await session.execute(stmt)
+        return [to_entity(row) for row in result]
+
+    async def get_transaction_horizon(self, session: AsyncSession) -> tuple[int, int] | None:
+        if session.bind.dialect.name != "postgresql":
+            return None
+
+        # xid8 has no asyncpg codec, and unlike 32-bit xids it never wraps around
+        result = await session.execute(
+            text(
+                "SELECT pg_snapshot_xmin(snapshot)::text::bigint, pg_snapshot_xmax(snapshot)::text::bigint "
+                "FROM pg_current_snapshot() AS snapshot",
+            ),
+        )
+        oldest_running, next_to_start = result.one()
+        return oldest_running, next_to_start
+
+    async def delete_expired(self, created_before: datetime, session: AsyncSession, limit: int = 1000) -> int:
+        expired_offsets = (
+            select(WalletEventModel.offset)
+            .where(WalletEventModel.created_at < created_before)
+            .order_by(WalletEventModel.offset)
+            .limit(limit)
+            .scalar_subquery()
+        )
+        result = await session.execute(delete(WalletEventModel).where(WalletEventModel.offset.in_(expired_offsets)))
+        return result.rowcount
@@ -0,0 +1,21 @@
+from abc import (
+    ABC,
+    abstractmethod,
+)
+from dataclasses import dataclass
+from datetime import datetime
+
+from domain.entities.wallets import IdempotencyKey as IdempotencyKeyEntity
+
+
+@dataclass
+class BaseIdempotencyKeyRepository(ABC):
+    @abstractmethod
+    async def add(self, idempotency_key: IdempotencyKeyEntity) -> IdempotencyKeyEntity:
+        """Raises ``IdempotencyKeyConflictException`` when the wallet already has the key."""
+
+    @abstractmethod
+    async def get(self, wallet_oid: str, key: str) -> IdempotencyKeyEntity | None: ...
+
+    @abstractmethod
+    async def delete_expired(self, created_before: datetime, limit: int = 1000) -> int: ...
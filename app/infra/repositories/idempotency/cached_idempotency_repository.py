@@ -0,0 +1,53 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from domain.entities.wallets import IdempotencyKey as IdempotencyKeyEntity
+from infra.cache.lru import LRUCache
+from infra.database.manager import after_commit
+from infra.repositories.idempotency.base import BaseIdempotencyKeyRepository
+
+
+@dataclass
+class CachedIdempotencyKeyRepository(BaseIdempotencyKeyRepository):
+    """Keeps recently used keys in process, so a retried request is answered without a database round trip.
+
+    Keys are only cached once the transaction that stored them has committed. The cache TTL must not exceed the
+    retention of the stored keys.
+    """
+
+    repository: BaseIdempotencyKeyRepository
+    cache: LRUCache[tuple[str, str], IdempotencyKeyEntity]
+
+    async def add(
+        self,
+        idempotency_key: IdempotencyKeyEntity,
+        session: AsyncSession | None = None,
+    ) -> IdempotencyKeyEntity:
+        idempotency_key = await self.repository.add(idempotency_key=idempotency_key, session=session)
+
+        async def fill():
+            self.cache.set((idempotency_key.wallet_oid, idempotency_key.key), idempotency_key)
+
+        await after_commit(session, fill)
+        return idempotency_key
+
+    async def get(self, wallet_oid: str, key: str, session: AsyncSession | None = None) -> IdempotencyKeyEntity | None:
+        idempotency_key = self.cache.get((wallet_oid, key))
+        if idempotency_key is not None:
+            return idempotency_key
+
+        idempotency_key = await self.repository.get(wallet_oid=wallet_oid, key=key, session=session)
+        if idempotency_key is not None:
+            self.cache.set((wallet_oid, key), idempotency_key)
+
+        return idempotency_key
+
+    async def delete_expired(
+        self,
+        created_before: datetime,
+        limit: int = 1000,
+        session: AsyncSession | None = None,
+    ) -> int:
+        return await self.repository.delete_expired(created_before=created_before, limit=limit, session=session)
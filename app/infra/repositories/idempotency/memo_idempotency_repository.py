@@ -0,0 +1,43 @@
+from dataclasses import (
+    dataclass,
+    field,
+)
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from domain.entities.wallets import IdempotencyKey as IdempotencyKeyEntity
+from domain.exceptions import IdempotencyKeyConflictException
+from infra.database.manager import on_rollback
+from infra.repositories.idempotency.base import BaseIdempotencyKeyRepository
+
+
+@dataclass
+class MemoryIdempotencyKeyRepository(BaseIdempotencyKeyRepository):
+    idempotency_keys: dict[tuple[str, str], IdempotencyKeyEntity] = field(default_factory=dict)
+
+    async def add(
+        self,
+        idempotency_key: IdempotencyKeyEntity,
+        session: AsyncSession | None = None,
+    ) -> IdempotencyKeyEntity:
+        lookup = (idempotency_key.wallet_oid, idempotency_key.key)
+        if lookup in self.idempotency_keys:
+            raise IdempotencyKeyConflictException(key=idempotency_key.key)
+
+        self.idempotency_keys[lookup] = idempotency_key
+        on_rollback(session, lambda: self.idempotency_keys.pop(lookup, None))
+        return idempotency_key
+
+    async def get(self, wallet_oid: str, key: str, *args, **kwargs) -> IdempotencyKeyEntity | None:
+        return self.idempotency_keys.get((wallet_oid, key))
+
+    async def delete_expired(self, created_before: datetime, limit: int = 1000, *args, **kwargs) -> int:
+        expired = [
+            lookup
+            for lookup, idempotency_key in self.idempotency_keys.items()
+            if idempotency_key.created_at < created_before
+        ][:limit]
+        for lookup in expired:
+            del self.idempotency_keys[lookup]
+        return len(expired)
@@ -0,0 +1,88 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import (
+    and_,
+    delete,
+    select,
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from domain.entities.wallets import IdempotencyKey as IdempotencyKeyEntity
+from domain.exceptions import IdempotencyKeyConflictException
+from infra.database.models import (
+    IdempotencyKeyModel,
+    TransactionModel,
+)
+from infra.repositories.idempotency.base import BaseIdempotencyKeyRepository
+from infra.repositories.instrumentation import instrument_repository
+from infra.repositories.transactions.sqlalchemy_transaction_repository import (
+    to_entity as transaction_to_entity,
+    TRANSACTION_COLUMNS,
+)
+
+
+@instrument_repository("idempotency_keys")
+@dataclass
+class SQLAlchemyIdempotencyKeyRepository(BaseIdempotencyKeyRepository):
+    async def add(self, idempotency_key: IdempotencyKeyEntity, session: AsyncSession) -> IdempotencyKeyEntity:
+        session.add(
+            IdempotencyKeyModel(
+                oid=idempotency_key.oid,
+                key=idempotency_key.key,
+                wallet_oid=idempotency_key.wallet_oid,
+                fingerprint=idempotency_key.fingerprint,
+                transaction_oid=idempotency_key.transaction.oid,
+                transaction_created_at=idempotency_key.transaction.created_at,
+                created_at=idempotency_key.created_at,
+            ),
+        )
+        try:
+            # a concurrent request holding the same key blocks this insert until it commits or rolls back
+            await session.flush()
+        except IntegrityError as error:
+            raise IdempotencyKeyConflictException(key=idempotency_key.key) from error
+
+        return idempotency_key
+
+    async def get(self, wallet_oid: str, key: str, session: AsyncSession) -> IdempotencyKeyEntity | None:
+        result = await session.execute(
+            select(
+                IdempotencyKeyModel.oid,
+                IdempotencyKeyModel.created_at,
+                IdempotencyKeyModel.fingerprint,
+                *TRANSACTION_COLUMNS,
+            )
+            .join(
+                TransactionModel,
+                and_(
+                    TransactionModel.oid == IdempotencyKeyModel.transaction_oid,
+                    TransactionModel.created_at == IdempotencyKeyModel.transaction_created_at,
+                ),
+            )
+            .where(IdempotencyKeyModel.wallet_oid == wallet_oid, IdempotencyKeyModel.key == key),
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+
+        oid, created_at, fingerprint, *transaction_row = row
+        return IdempotencyKeyEntity(
+            oid=oid,
+            created_at=created_at,
+            key=key,
+            wallet_oid=wallet_oid,
+            fingerprint=fingerprint,
+            transaction=transaction_to_entity(transaction_row),
+        )
+
+    async def delete_expired(self, created_before: datetime, session: AsyncSession, limit: int = 1000) -> int:
+        expired_oids = (
+            select(IdempotencyKeyModel.oid)
+            .where(IdempotencyKeyModel.created_at < created_before)
+            .limit(limit)
+            .scalar_subquery()
+        )
+        result = await session.execute(delete(IdempotencyKeyModel).where(IdempotencyKeyModel.oid.in_(expired_oids)))
+        return result.rowcount
@@ -0,0 +1,59 @@
+import inspect
+from collections.abc import (
+    Awaitable,
+    Callable,
+)
+from functools import wraps
+from time import perf_counter
+from typing import TypeVar
+
+from infra.metrics.instruments import (
+    REPOSITORY_QUERY_DURATION,
+    REPOSITORY_QUERY_ROWS,
+)
+
+
+T = TypeVar("T", bound=type)
+
+
+def count_rows(result: object) -> int:
+    """Rows behind a repository result: the length of a page, the count returned by a bulk delete, 0 for None."""
+    if result is None:
+        return 0
+    if isinstance(result, list | tuple):
+        return len(result)
+    if isinstance(result, int) and not isinstance(result, bool):
+        return result
+    return 1
+
+
+def observe_query(repository: str, method: Callable[..., Awaitable]) -> Callable[..., Awaitable]:
+    # samples are bound once per method, so a call only pays for two clock reads and two bucket lookups
+    duration = REPOSITORY_QUERY_DURATION.labels(repository, method.__name__)
+    rows = REPOSITORY_QUERY_ROWS.labels(repository, method.__name__)
+
+    @wraps(method)
+    async def wrapper(*args, **kwargs):
+        started = perf_counter()
+        result = await method(*args, **kwargs)
+        duration.observe(perf_counter() - started)
+        rows.observe(count_rows(result))
+        return result
+
+    return wrapper
+
+
+def instrument_repository(repository: str) -> Callable[[T], T]:
+    """Records latency and row counts of every public coroutine method the decorated class defines.
+
+    Failed calls are not recorded. Streaming methods are async generators and are left as they are: their
+    duration depends on the consumer.
+    """
+
+    def decorate(cls: T) -> T:
+        for name, method in list(vars(cls).items()):
+            if not name.startswith("_") and inspect.iscoroutinefunction(method):
+                setattr(cls, name, observe_query(repository, method))
+        return cls
+
+    return decorate
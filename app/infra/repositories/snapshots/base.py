@@ -0,0 +1,16 @@
+from abc import (
+    ABC,
+    abstractmethod,
+)
+from dataclasses import dataclass
+
+from domain.entities.wallets import WalletSnapshot as WalletSnapshotEntity
+
+
+@dataclass
+class BaseWalletSnapshotRepository(ABC):
+    @abstractmethod
+    async def add(self, snapshot: WalletSnapshotEntity) -> WalletSnapshotEntity: ...
+
+    @abstractmethod
+    async def get_latest(self, wallet_oid: str) -> WalletSnapshotEntity | None: ...
@@ -0,0 +1,21 @@
+from dataclasses import (
+    dataclass,
+    field,
+)
+
+from domain.entities.wallets import WalletSnapshot as WalletSnapshotEntity
+from infra.repositories.snapshots.base import BaseWalletSnapshotRepository
+
+
+@dataclass
+class MemoryWalletSnapshotRepository(BaseWalletSnapshotRepository):
+    snapshots: dict[str, list[WalletSnapshotEntity]] = field(default_factory=dict)
+
+    async def add(self, snapshot: WalletSnapshotEntity, *args, **kwargs) -> WalletSnapshotEntity:
+        self.snapshots.setdefault(snapshot.wallet_oid, []).append(snapshot)
+        return snapshot
+
+    async def get_latest(self, wallet_oid: str, *args, **kwargs) -> WalletSnapshotEntity | None:
+        snapshots = self.snapshots.get(wallet_oid)
+        if snapshots:
+            return max(snapshots, key=lambda snapshot: (snapshot.as_of, snapshot.last_transaction_oid))
@@ -0,0 +1,54 @@
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from domain.entities.wallets import WalletSnapshot as WalletSnapshotEntity
+from infra.database.models import WalletSnapshotModel
+from infra.repositories.instrumentation import instrument_repository
+from infra.repositories.snapshots.base import BaseWalletSnapshotRepository
+
+
+@instrument_repository("snapshots")
+@dataclass
+class SQLAlchemyWalletSnapshotRepository(BaseWalletSnapshotRepository):
+    async def add(self, snapshot: WalletSnapshotEntity, session: AsyncSession) -> WalletSnapshotEntity:
+        session.add(
+            WalletSnapshotModel(
+                oid=snapshot.oid,
+                wallet_oid=snapshot.wallet_oid,
+                balance=snapshot.balance,
+                last_transaction_oid=snapshot.last_transaction_oid,
+                as_of=snapshot.as_of,
+                created_at=snapshot.created_at,
+            ),
+        )
+        await session.flush()
+
+        return snapshot
+
+    async def get_latest(self, wallet_oid: str, session: AsyncSession) -> WalletSnapshotEntity | None:
+        result = await session.execute(
+            select(
+                WalletSnapshotModel.oid,
+                WalletSnapshotModel.created_at,
+                WalletSnapshotModel.wallet_oid,
+                WalletSnapshotModel.balance,
+                WalletSnapshotModel.last_transaction_oid,
+                WalletSnapshotModel.as_of,
+            )
+            .where(WalletSnapshotModel.wallet_oid == wallet_oid)
+            .order_by(WalletSnapshotModel.as_of.desc(), WalletSnapshotModel.last_transaction_oid.desc())
+            .limit(1),
+        )
+        row = result.one_or_none()
+        if row:
+            oid, created_at, wallet_oid, balance, last_transaction_oid, as_of = row
+            return WalletSnapshotEntity(
+                oid=oid,
+                created_at=created_at,
+                wallet_oid=wallet_oid,
+                balance=balance,
+                last_transaction_oid=last_transaction_oid,
+                as_of=as_of,
+            )
@@ -2,10 +2,15 @@ from abc import (
     ABC,
     abstractmethod,
 )
-from collections.abc import Iterable
+from collections.abc import (
+    AsyncIterator,
+    Iterable,
+)
 from dataclasses import dataclass
+from datetime import datetime
 
 from domain.entities.wallets import Transaction as TransactionEntity
+from domain.values.cursors import TransactionCursor
 
 
 @dataclass
@@ -14,4 +19,29 @@ class BaseTransactionRepository(ABC):
     async def add(self, transaction: TransactionEntity) -> TransactionEntity: ...
 
     @abstractmethod
-    async def get_all(self, wallet_oid: str, limit: int = 20, offset: int = 0) -> Iterable[TransactionEntity]: ...
+    async def add_many(self, transactions: list[TransactionEntity]) -> list[TransactionEntity]: ...
+
+    @abstractmethod
+    async def get_all(
+        self,
+        wallet_oid: str,
+        limit: int = 20,
+        offset: int = 0,
+        cursor: TransactionCursor | None = None,
+    ) -> Iterable[TransactionEntity]:
+        """Returns wallet transactions ordered by ``(created_at, oid)``.
+
+        With a ``cursor`` the page starts right after it and ``offset`` is ignored.
+        """
+
+    @abstractmethod
+    def stream(
+        self,
+        wallet_oid: str,
+        after: TransactionCursor | None = None,
+        batch_size: int = 1000,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+    ) -> AsyncIterator[list[TransactionEntity]]:
+        """Yields wallet transactions in ``(created_at, oid)`` order, ``batch_size`` at a time, without loading
+        the whole history into memory. ``created_from`` is inclusive, ``created_to`` exclusive."""
@@ -1,29 +1,90 @@
+from bisect import (
+    bisect_left,
+    bisect_right,
+)
+from collections import defaultdict
+from collections.abc import AsyncIterator
 from dataclasses import (
     dataclass,
     field,
 )
 from datetime import datetime
 
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from domain.entities.wallets import Transaction as TransactionEntity
+from domain.values.cursors import TransactionCursor
+from infra.database.manager import on_rollback
 from infra.repositories.transactions.base import BaseTransactionRepository
 
 
 @dataclass
 class MemoryTransactionRepository(BaseTransactionRepository):
-    transactions: list[TransactionEntity] = field(default_factory=list)
+    """Transactions kept per wallet in ``(created_at, oid)`` order, so a page costs a binary search plus its size.
+
+    New transactions are created just before they are added, so they almost always land at the end of their
+    list. Writes are undone if the session rolls back.
+    """
+
+    transactions: defaultdict[str, list[TransactionEntity]] = field(default_factory=lambda: defaultdict(list))
 
-    async def add(self, transaction: TransactionEntity, *args, **kwargs) -> TransactionEntity:
-        transaction.created_at = datetime.now()
-        self.transactions.append(transaction)
+    _keys: defaultdict[str, list[tuple[datetime, str]]] = field(default_factory=lambda: defaultdict(list), init=False)
+
+    async def add(self, transaction: TransactionEntity, session: AsyncSession | None = None) -> TransactionEntity:
+        key = (transaction.created_at, transaction.oid)
+        transactions, keys = self.transactions[transaction.wallet_oid], self._keys[transaction.wallet_oid]
+        index = bisect_right(keys, key)
+        keys.insert(index, key)
+        transactions.insert(index, transaction)
+
+        def undo():
+            index = bisect_left(keys, key)
+            del keys[index]
+            del transactions[index]
+
+        on_rollback(session, undo)
         return transaction
 
+    async def add_many(
+        self,
+        transactions: list[TransactionEntity],
+        session: AsyncSession | None = None,
+    ) -> list[TransactionEntity]:
+        return [await self.add(transaction=transaction, session=session) for transaction in transactions]
+
     async def get_all(
         self,
         wallet_oid: str,
         limit: int = 20,
         offset: int = 0,
+        cursor: TransactionCursor | None = None,
         *args,
         **kwargs,
     ) -> list[TransactionEntity]:
-        result = [t for t in self.transactions if t.wallet_oid == wallet_oid]
-        return result[offset : offset + limit]
+        if cursor is not None:
+            offset = bisect_right(self._keys.get(wallet_oid, ()), (cursor.created_at, cursor.oid))
+        return self.transactions.get(wallet_oid, [])[offset : offset + limit]
+
+    async def stream(
+        self,
+        wallet_oid: str,
+        after: TransactionCursor | None = None,
+        batch_size: int = 1000,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+        *args,
+        **kwargs,
+    ) -> AsyncIterator[list[TransactionEntity]]:
+        transactions, keys = self.transactions.get(wallet_oid, []), self._keys.get(wallet_oid, [])
+        while True:
+            # positions are looked up again for every batch, as the list may grow between them
+            start = bisect_left(keys, (created_from,)) if created_from is not None else 0
+            if after is not None:
+                start = max(start, bisect_right(keys, (after.created_at, after.oid)))
+            end = bisect_left(keys, (created_to,)) if created_to is not None else len(keys)
+
+            batch = transactions[start : min(start + batch_size, end)]
+            if not batch:
+                return
+            yield batch
+            after = TransactionCursor.from_transaction(batch[-1])
@@ -1,21 +1,88 @@
+from collections.abc import AsyncIterator
 from dataclasses import dataclass
+from datetime import (
+    datetime,
+    timedelta,
+)
 
+from sqlalchemy import (
+    ColumnElement,
+    insert,
+    Row,
+    tuple_,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from domain.entities.wallets import Transaction as TransactionEntity
-from infra.database.models import TransactionModel
+from domain.values.cursors import TransactionCursor
+from infra.database.models import (
+    TransactionModel,
+    WalletModel,
+)
+from infra.database.partitions import prunes_partitions
+from infra.repositories.instrumentation import instrument_repository
 from infra.repositories.transactions.base import BaseTransactionRepository
 
 
+# reads select plain columns: rows skip the ORM identity map and become entities directly
+TRANSACTION_COLUMNS = (
+    TransactionModel.oid,
+    TransactionModel.created_at,
+    TransactionModel.amount,
+    TransactionModel.operation_type,
+    TransactionModel.wallet_oid,
+    TransactionModel.counterparty_wallet_oid,
+    TransactionModel.transfer_oid,
+)
+
+
+# a transaction is never older than its wallet, give or take the clock skew between application servers
+WALLET_CLOCK_SKEW = timedelta(hours=1)
+
+
+def to_entity(row: Row) -> TransactionEntity:
+    oid, created_at, amount, operation_type, wallet_oid, counterparty_wallet_oid, transfer_oid = row
+    return TransactionEntity(
+        oid=oid,
+        created_at=created_at,
+        amount=amount,
+        operation_type=operation_type,
+        wallet_oid=wallet_oid,
+        counterparty_wallet_oid=counterparty_wallet_oid,
+        transfer_oid=transfer_oid,
+    )
+
+
+def created_since(wallet_oid: str, created_from: datetime | None, session: AsyncSession) -> ColumnElement | None:
+    """Lower bound on ``created_at`` that lets Postgres skip partitions older than the rows a read can return.
+
+    Only an explicit bound, a cursor or an export range, confines a read to recent partitions. Without one the
+    wallet's creation time is used, which the executor prunes by once the subquery is evaluated. That only skips
+    partitions older than the wallet: the first page of an old wallet's listing still probes every partition
+    since it was created, once per partition through its ``(wallet_oid, created_at, oid)`` index.
+    """
+    if created_from is not None:
+        return TransactionModel.created_at >= created_from
+    if not prunes_partitions(session):
+        return None
+
+    wallet_created_at = select(WalletModel.created_at).where(WalletModel.oid == wallet_oid).scalar_subquery()
+    return TransactionModel.created_at >= wallet_created_at - WALLET_CLOCK_SKEW
+
+
+@instrument_repository("transactions")
 @dataclass
 class SQLAlchemyTransactionRepository(BaseTransactionRepository):
     async def add(self, transaction: TransactionEntity, session: AsyncSession) -> TransactionEntity:
         transaction_model = TransactionModel(
             oid=transaction.oid,
+            created_at=transaction.created_at,
             amount=transaction.amount,
             operation_type=transaction.operation_type,
             wallet_oid=transaction.wallet_oid,
+            counterparty_wallet_oid=transaction.counterparty_wallet_oid,
+            transfer_oid=transaction.transfer_oid,
         )
         session.add(transaction_model)
         await session.flush()
@@ -26,28 +93,100 @@ class SQLAlchemyTransactionRepository(BaseTransactionRepository):
             amount=transaction_model.amount,
             operation_type=transaction_model.operation_type,
             wallet_oid=transaction_model.wallet_oid,
+            counterparty_wallet_oid=transaction_model.counterparty_wallet_oid,
+            transfer_oid=transaction_model.transfer_oid,
         )
 
+    async def add_many(self, transactions: list[TransactionEntity], session: AsyncSession) -> list[TransactionEntity]:
+        created_at = datetime.now()
+        saved_transactions = [
+            TransactionEntity(
+                oid=transaction.oid,
+                created_at=created_at,
+                amount=transaction.amount,
+                operation_type=transaction.operation_type,
+                wallet_oid=transaction.wallet_oid,
+                counterparty_wallet_oid=transaction.counterparty_wallet_oid,
+                transfer_oid=transaction.transfer_oid,
+            )
+            for transaction in transactions
+        ]
+        await session.execute(
+            insert(TransactionModel),
+            [
+                {
+                    "oid": transaction.oid,
+                    "created_at": transaction.created_at,
+                    "amount": transaction.amount,
+                    "operation_type": transaction.operation_type,
+                    "wallet_oid": transaction.wallet_oid,
+                    "counterparty_wallet_oid": transaction.counterparty_wallet_oid,
+                    "transfer_oid": transaction.transfer_oid,
+                }
+                for transaction in saved_transactions
+            ],
+        )
+
+        return saved_transactions
+
     async def get_all(
         self,
         wallet_oid: str,
         session: AsyncSession,
         limit: int = 20,
         offset: int = 0,
+        cursor: TransactionCursor | None = None,
     ) -> list[TransactionEntity]:
-        result = await session.execute(
-            select(TransactionModel).where(TransactionModel.wallet_oid == wallet_oid).offset(offset).limit(limit),
+        stmt = (
+            select(*TRANSACTION_COLUMNS)
+            .where(TransactionModel.wallet_oid == wallet_oid)
+            .order_by(TransactionModel.created_at, TransactionModel.oid)
+            .limit(limit)
         )
+        if cursor is None:
+            stmt = stmt.offset(offset)
+        else:
+            # row comparison lets the (wallet_oid, created_at, oid) index seek straight to the cursor
+            stmt = stmt.where(
+                tuple_(TransactionModel.created_at, TransactionModel.oid) > tuple_(cursor.created_at, cursor.oid),
+            )
 
-        transactions_models = result.scalars().all()
+        lower_bound = created_since(wallet_oid, cursor.created_at if cursor else None, session)
+        if lower_bound is not None:
+            stmt = stmt.where(lower_bound)
 
-        return [
-            TransactionEntity(
-                oid=transaction_model.oid,
-                created_at=transaction_model.created_at,
-                amount=transaction_model.amount,
-                operation_type=transaction_model.operation_type,
-                wallet_oid=transaction_model.wallet_oid,
+        result = await session.execute(stmt)
+
+        return [to_entity(row) for row in result]
+
+    async def stream(
+        self,
+        wallet_oid: str,
+        session: AsyncSession,
+        after: TransactionCursor | None = None,
+        batch_size: int = 1000,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+    ) -> AsyncIterator[list[TransactionEntity]]:
+        stmt = (
+            select(*TRANSACTION_COLUMNS)
+            .where(TransactionModel.wallet_oid == wallet_oid)
+            .order_by(TransactionModel.created_at, TransactionModel.oid)
+            .execution_options(yield_per=batch_size)
+        )
+        if after is not None:
+            stmt = stmt.where(
+                tuple_(TransactionModel.created_at, TransactionModel.oid) > tuple_(after.created_at, after.oid),
             )
-            for transaction_model in transactions_models
-        ]
+            created_from = max(created_from, after.created_at) if created_from is not None else after.created_at
+
+        lower_bound = created_since(wallet_oid, created_from, session)
+        if lower_bound is not None:
+            stmt = stmt.where(lower_bound)
+        if created_to is not None:
+            stmt = stmt.where(TransactionModel.created_at < created_to)
+
+        # server-side cursor: rows are fetched batch_size at a time instead of result.scalars().all()
+        result = await session.stream(stmt)
+        async for rows in result.partitions():
+            yield [to_entity(row) for row in rows]
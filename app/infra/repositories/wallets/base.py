@@ -11,13 +11,49 @@ from domain.entities.wallets import Wallet as WalletEntity
 @dataclass
 class BaseWalletRepository(ABC):
     @abstractmethod
-    async def update_balance(self, wallet_oid: str, amount: Decimal): ...
+    async def update_balance(self, wallet_oid: str, amount: Decimal) -> Decimal | None: ...
+
+    @abstractmethod
+    async def withdraw(self, wallet_oid: str, amount: Decimal) -> Decimal | None:
+        """Debits the wallet only if it holds at least ``amount``; returns the new balance or ``None``."""
+
+    @abstractmethod
+    async def update_balance_at_version(self, wallet_oid: str, amount: Decimal, version: int) -> Decimal | None:
+        """Adds ``amount`` only if the wallet row is still at ``version`` and stays non-negative; returns the new
+        balance of the row, or ``None`` when the wallet changed since it was read.
+
+        A debit on a wallet with shard rows is applied like ``withdraw`` instead, since the wallet row alone may
+        not cover it."""
 
     @abstractmethod
     async def get_by_oid(self, wallet_oid: str) -> WalletEntity: ...
 
+    @abstractmethod
+    async def get_current(self, wallet_oid: str) -> WalletEntity | None:
+        """Reads the wallet from the database itself, never from a cache in front of it."""
+
+    @abstractmethod
+    async def get_many(self, wallet_oids: list[str]) -> list[WalletEntity | None]:
+        """Returns the wallet of every oid in ``wallet_oids``, in the same order, with ``None`` for unknown oids."""
+
     @abstractmethod
     async def get_wallet_with_lock(self, wallet_oid: str) -> WalletEntity: ...
 
+    @abstractmethod
+    async def get_wallets_with_lock(self, wallet_oids: list[str]) -> list[WalletEntity]:
+        """Locks the existing wallets among ``wallet_oids`` in oid order and returns them in that order."""
+
+    @abstractmethod
+    async def update_balances(self, amounts: dict[str, Decimal]):
+        """Adds ``amounts[oid]`` to the balance of every listed wallet with a single statement."""
+
     @abstractmethod
     async def add(self, wallet: WalletEntity) -> WalletEntity: ...
+
+    @abstractmethod
+    async def add_many(self, wallets: list[WalletEntity]) -> list[WalletEntity]:
+        """Stores new wallets with a single insert."""
+
+    @abstractmethod
+    async def get_batch(self, after_oid: str | None = None, limit: int = 1000) -> list[WalletEntity]:
+        """Returns up to ``limit`` wallets ordered by oid, starting right after ``after_oid``."""
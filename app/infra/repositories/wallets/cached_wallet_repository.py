@@ -0,0 +1,158 @@
+from dataclasses import dataclass
+from decimal import Decimal
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from domain.entities.wallets import Wallet as WalletEntity
+from infra.cache.wallets import BaseWalletCache
+from infra.database.manager import after_commit
+from infra.database.replicas import is_replica_session
+from infra.repositories.wallets.base import BaseWalletRepository
+
+
+DIRTY_WALLETS_KEY = "wallet_cache_dirty"
+
+
+@dataclass
+class CachedWalletRepository(BaseWalletRepository):
+    """Read-through cache in front of another wallet repository.
+
+    Writes invalidate the cached wallet only after their transaction commits, and a session that has written
+    to a wallet never fills the cache for it, so uncommitted or rolled-back balances are never cached. Nor
+    do replica sessions fill it: a lagging replica could cache a balance older than an invalidation.
+
+    The cache is kept in each process and only the process that wrote invalidates it, so other workers keep
+    serving the balance they cached before the write until it expires after the cache's TTL.
+    """
+
+    repository: BaseWalletRepository
+    cache: BaseWalletCache
+
+    async def get_by_oid(self, wallet_oid: str, session: AsyncSession | None = None) -> WalletEntity | None:
+        wallet = await self.cache.get(wallet_oid)
+        if wallet is not None:
+            return wallet
+
+        version = await self.cache.current_version()
+        wallet = await self.repository.get_by_oid(wallet_oid=wallet_oid, session=session)
+        if wallet is not None and self._may_fill(wallet_oid, session):
+            await self.cache.set(wallet_oid, wallet, version)
+
+        return wallet
+
+    async def get_current(self, wallet_oid: str, session: AsyncSession | None = None) -> WalletEntity | None:
+        return await self.repository.get_current(wallet_oid=wallet_oid, session=session)
+
+    async def get_many(self, wallet_oids: list[str], session: AsyncSession | None = None) -> list[WalletEntity | None]:
+        wallets = {}
+        for wallet_oid in wallet_oids:
+            wallet = await self.cache.get(wallet_oid)
+            if wallet is not None:
+                wallets[wallet_oid] = wallet
+
+        missing_oids = [wallet_oid for wallet_oid in dict.fromkeys(wallet_oids) if wallet_oid not in wallets]
+        if missing_oids:
+            version = await self.cache.current_version()
+            for wallet in await self.repository.get_many(wallet_oids=missing_oids, session=session):
+                if wallet is None:
+                    continue
+                wallets[wallet.oid] = wallet
+                if self._may_fill(wallet.oid, session):
+                    await self.cache.set(wallet.oid, wallet, version)
+
+        return [wallets.get(wallet_oid) for wallet_oid in wallet_oids]
+
+    async def get_wallet_with_lock(self, wallet_oid: str, session: AsyncSession | None = None) -> WalletEntity | None:
+        return await self.repository.get_wallet_with_lock(wallet_oid=wallet_oid, session=session)
+
+    async def get_wallets_with_lock(
+        self,
+        wallet_oids: list[str],
+        session: AsyncSession | None = None,
+    ) -> list[WalletEntity]:
+        return await self.repository.get_wallets_with_lock(wallet_oids=wallet_oids, session=session)
+
+    async def get_batch(
+        self,
+        after_oid: str | None = None,
+        limit: int = 1000,
+        session: AsyncSession | None = None,
+    ) -> list[WalletEntity]:
+        return await self.repository.get_batch(after_oid=after_oid, limit=limit, session=session)
+
+    async def update_balances(self, amounts: dict[str, Decimal], session: AsyncSession | None = None):
+        await self.repository.update_balances(amounts=amounts, session=session)
+        for wallet_oid in amounts:
+            await self._invalidate_after_commit(wallet_oid, session)
+
+    async def update_balance(
+        self,
+        wallet_oid: str,
+        amount: Decimal,
+        session: AsyncSession | None = None,
+    ) -> Decimal | None:
+        balance = await self.repository.update_balance(wallet_oid=wallet_oid, amount=amount, session=session)
+        await self._invalidate_after_commit(wallet_oid, session)
+        return balance
+
+    async def update_balance_at_version(
+        self,
+        wallet_oid: str,
+        amount: Decimal,
+        version: int,
+        session: AsyncSession | None = None,
+    ) -> Decimal | None:
+        balance = await self.repository.update_balance_at_version(
+            wallet_oid=wallet_oid,
+            amount=amount,
+            version=version,
+            session=session,
+        )
+        if balance is not None:
+            await self._invalidate_after_commit(wallet_oid, session)
+        return balance
+
+    async def reshard_balance(self, wallet_oid: str, shards: int, session: AsyncSession | None = None) -> bool:
+        resharded = await self.repository.reshard_balance(wallet_oid=wallet_oid, shards=shards, session=session)
+        if resharded:
+            await self._invalidate_after_commit(wallet_oid, session)
+        return resharded
+
+    async def withdraw(self, wallet_oid: str, amount: Decimal, session: AsyncSession | None = None) -> Decimal | None:
+        balance = await self.repository.withdraw(wallet_oid=wallet_oid, amount=amount, session=session)
+        if balance is not None:
+            await self._invalidate_after_commit(wallet_oid, session)
+        return balance
+
+    async def add(self, wallet: WalletEntity, session: AsyncSession | None = None) -> WalletEntity:
+        wallet = await self.repository.add(wallet=wallet, session=session)
+
+        async def fill():
+            await self.cache.set(wallet.oid, wallet, await self.cache.current_version())
+
+        await after_commit(session, fill)
+        return wallet
+
+    async def add_many(self, wallets: list[WalletEntity], session: AsyncSession | None = None) -> list[WalletEntity]:
+        wallets = await self.repository.add_many(wallets=wallets, session=session)
+
+        async def fill():
+            version = await self.cache.current_version()
+            for wallet in wallets:
+                await self.cache.set(wallet.oid, wallet, version)
+
+        await after_commit(session, fill)
+        return wallets
+
+    async def _invalidate_after_commit(self, wallet_oid: str, session: AsyncSession | None):
+        if session is not None:
+            session.info.setdefault(DIRTY_WALLETS_KEY, set()).add(wallet_oid)
+
+        await after_commit(session, lambda: self.cache.invalidate(wallet_oid))
+
+    @staticmethod
+    def _is_dirty(wallet_oid: str, session: AsyncSession | None) -> bool:
+        return session is not None and wallet_oid in session.info.get(DIRTY_WALLETS_KEY, ())
+
+    def _may_fill(self, wallet_oid: str, session: AsyncSession | None) -> bool:
+        return not self._is_dirty(wallet_oid, session) and not is_replica_session(session)
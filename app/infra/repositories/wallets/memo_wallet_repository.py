@@ -1,31 +1,147 @@
+import asyncio
+from bisect import (
+    bisect_right,
+    insort,
+)
+from collections import defaultdict
 from dataclasses import (
     dataclass,
     field,
+    replace,
 )
 from datetime import datetime
 from decimal import Decimal
 
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from domain.entities.wallets import Wallet as WalletEntity
+from infra.database.manager import (
+    on_close,
+    on_rollback,
+)
+from infra.metrics.instruments import WALLET_LOCK_WAIT
 from infra.repositories.wallets.base import BaseWalletRepository
 
 
+LOCKED_WALLETS_KEY = "memory_locked_wallets"
+
+LOCK_WAIT = WALLET_LOCK_WAIT.labels("memory")
+
+
 @dataclass
 class MemoryWalletRepository(BaseWalletRepository):
-    wallets: list[WalletEntity] = field(default_factory=list)
-
-    async def update_balance(self, wallet_oid: str, amount: Decimal, *args, **kwargs):
-        for wallet in self.wallets:
-            if wallet.oid == wallet_oid:
-                wallet.balance += amount
-                break
-
-    async def get_by_oid(self, wallet_oid, *args, **kwargs) -> WalletEntity | None:
-        for wallet in self.wallets:
-            if wallet.oid == wallet_oid:
-                return wallet
-
-    async def add(self, wallet: WalletEntity, *args, **kwargs) -> WalletEntity:
-        wallet.created_at = datetime.now()
-        wallet.updated_at = datetime.now()
-        self.wallets.append(wallet)
+    """Wallets indexed by oid, with a lock per wallet that stands in for a row lock.
+
+    Every write locks its wallet until the session closes, and is undone if the session rolls back. Without a
+    session writes apply immediately and nothing is locked.
+    """
+
+    wallets: dict[str, WalletEntity] = field(default_factory=dict)
+
+    _oids: list[str] = field(default_factory=list, init=False)
+    _locks: defaultdict[str, asyncio.Lock] = field(default_factory=lambda: defaultdict(asyncio.Lock), init=False)
+
+    def __post_init__(self):
+        self._oids = sorted(self.wallets)
+
+    async def update_balance(
+        self,
+        wallet_oid: str,
+        amount: Decimal,
+        session: AsyncSession | None = None,
+    ) -> Decimal | None:
+        wallet = await self.get_wallet_with_lock(wallet_oid=wallet_oid, session=session)
+        if wallet is not None:
+            return self._set_balance(wallet, wallet.balance + amount, session)
+
+    async def withdraw(self, wallet_oid: str, amount: Decimal, session: AsyncSession | None = None) -> Decimal | None:
+        wallet = await self.get_wallet_with_lock(wallet_oid=wallet_oid, session=session)
+        if wallet is not None and wallet.balance >= amount:
+            return self._set_balance(wallet, wallet.balance - amount, session)
+
+    async def update_balance_at_version(
+        self,
+        wallet_oid: str,
+        amount: Decimal,
+        version: int,
+        session: AsyncSession | None = None,
+    ) -> Decimal | None:
+        # like the UPDATE it stands in for, the write waits for the lock of a writer still in its transaction
+        wallet = await self.get_wallet_with_lock(wallet_oid=wallet_oid, session=session)
+        if wallet is not None and wallet.version == version and wallet.balance + amount >= 0:
+            return self._set_balance(wallet, wallet.balance + amount, session)
+
+    async def get_by_oid(self, wallet_oid: str, *args, **kwargs) -> WalletEntity | None:
+        return self.wallets.get(wallet_oid)
+
+    async def get_current(self, wallet_oid: str, *args, **kwargs) -> WalletEntity | None:
+        return self.wallets.get(wallet_oid)
+
+    async def get_many(self, wallet_oids: list[str], *args, **kwargs) -> list[WalletEntity | None]:
+        return [self.wallets.get(wallet_oid) for wallet_oid in wallet_oids]
+
+    async def get_wallet_with_lock(self, wallet_oid: str, session: AsyncSession | None = None) -> WalletEntity | None:
+        if wallet_oid not in self.wallets:
+            return None
+
+        with LOCK_WAIT.time():
+            await self._lock(wallet_oid, session)
+        return self.wallets[wallet_oid]
+
+    async def get_wallets_with_lock(
+        self,
+        wallet_oids: list[str],
+        session: AsyncSession | None = None,
+    ) -> list[WalletEntity]:
+        wallets = []
+        for wallet_oid in sorted(set(wallet_oids)):
+            wallet = await self.get_wallet_with_lock(wallet_oid=wallet_oid, session=session)
+            if wallet is not None:
+                wallets.append(wallet)
+        return wallets
+
+    async def update_balances(self, amounts: dict[str, Decimal], session: AsyncSession | None = None):
+        for wallet_oid in sorted(amounts):
+            await self.update_balance(wallet_oid=wallet_oid, amount=amounts[wallet_oid], session=session)
+
+    async def add(self, wallet: WalletEntity, session: AsyncSession | None = None) -> WalletEntity:
+        wallet = replace(wallet, updated_at=wallet.updated_at or wallet.created_at)
+        self.wallets[wallet.oid] = wallet
+        insort(self._oids, wallet.oid)
+
+        def undo():
+            del self.wallets[wallet.oid]
+            self._oids.remove(wallet.oid)
+
+        on_rollback(session, undo)
         return wallet
+
+    async def add_many(self, wallets: list[WalletEntity], session: AsyncSession | None = None) -> list[WalletEntity]:
+        return [await self.add(wallet=wallet, session=session) for wallet in wallets]
+
+    async def get_batch(self, after_oid: str | None = None, limit: int = 1000, *args, **kwargs) -> list[WalletEntity]:
+        start = bisect_right(self._oids, after_oid) if after_oid is not None else 0
+        return [self.wallets[wallet_oid] for wallet_oid in self._oids[start : start + limit]]
+
+    async def _lock(self, wallet_oid: str, session: AsyncSession | None):
+        if session is None:
+            return
+
+        locked = session.info.setdefault(LOCKED_WALLETS_KEY, set())
+        if wallet_oid in locked:
+            return
+
+        lock = self._locks[wallet_oid]
+        await lock.acquire()
+        locked.add(wallet_oid)
+        on_close(session, lock.release)
+
+    def _set_balance(self, wallet: WalletEntity, balance: Decimal, session: AsyncSession | None) -> Decimal:
+        self.wallets[wallet.oid] = replace(
+            wallet,
+            balance=balance,
+            updated_at=datetime.now(),
+            version=wallet.version + 1,
+        )
+        on_rollback(session, lambda: self.wallets.__setitem__(wallet.oid, wallet))
+        return balance
@@ -1,53 +1,201 @@
+import random
 from dataclasses import dataclass
+from datetime import datetime
 from decimal import Decimal
 
 from sqlalchemy import (
+    any_,
+    bindparam,
+    case,
+    delete,
+    func,
+    insert,
+    Row,
     select,
+    String,
     update,
 )
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from domain.entities.wallets import Wallet as WalletEntity
-from infra.database.models import WalletModel
+from infra.database.models import (
+    WalletBalanceShardModel,
+    WalletModel,
+)
+from infra.metrics.instruments import WALLET_LOCK_WAIT
+from infra.repositories.instrumentation import instrument_repository
 from infra.repositories.wallets.base import BaseWalletRepository
 
 
+LOCK_WAIT = WALLET_LOCK_WAIT.labels("sqlalchemy")
+
+# the shard rows are only summed for wallets that have them
+TOTAL_BALANCE = case(
+    (
+        WalletModel.balance_shards > 1,
+        WalletModel.balance
+        + select(func.coalesce(func.sum(WalletBalanceShardModel.balance), 0))
+        .where(WalletBalanceShardModel.wallet_oid == WalletModel.oid)
+        .scalar_subquery(),
+    ),
+    else_=WalletModel.balance,
+)
+
+# reads select plain columns: rows skip the ORM identity map and become entities directly
+WALLET_COLUMNS = (WalletModel.oid, WalletModel.created_at, WalletModel.updated_at, TOTAL_BALANCE, WalletModel.version)
+
+
+def to_entity(row: Row) -> WalletEntity:
+    oid, created_at, updated_at, balance, version = row
+    return WalletEntity(oid=oid, created_at=created_at, updated_at=updated_at, balance=balance, version=version)
+
+
+@instrument_repository("wallets")
 @dataclass
 class SQLAlchemyWalletRepository(BaseWalletRepository):
-    async def update_balance(self, wallet_oid: str, amount: Decimal, session: AsyncSession):
-        stmt = (
-            update(WalletModel)
-            .where(WalletModel.oid == wallet_oid)
-            .values(
-                balance=WalletModel.balance + amount,
+    """Wallet balances, optionally split over several rows so that deposits to one wallet do not queue up.
+
+    New wallets get ``balance_shards`` rows. A deposit adds to one of its wallet's rows picked at random and
+    only locks that row. Every debit goes to the wallet row itself under its lock, so a balance read under that
+    lock can only be short of deposits still in flight, never above the real total. A withdrawal the wallet row
+    cannot cover first moves the other shards into it.
+
+    Every change to the wallet row bumps its ``version``, which ``update_balance_at_version`` compares instead
+    of locking the row before the balance is checked.
+
+    The wallet row is locked ``FOR NO KEY UPDATE``: a deposit holding a shard row lock still has to insert its
+    transaction, whose foreign key check takes ``FOR KEY SHARE`` on the wallet row. A plain ``FOR UPDATE`` would
+    make that insert wait for a debit that is itself waiting for the deposit's shard row.
+    """
+
+    balance_shards: int = 1
+
+    async def update_balance(self, wallet_oid: str, amount: Decimal, session: AsyncSession) -> Decimal | None:
+        """Adds ``amount`` to the wallet; returns the new balance of the row that changed, or ``None``."""
+        if amount < 0:
+            return await self._add_to_wallet_row(wallet_oid, amount, session)
+
+        # the same pick selects the wallet row or one of the shard rows, whatever the wallet's shard count
+        pick = random.randrange(1 << 30)  # noqa: S311
+        balance = await self._add_to_wallet_row(
+            wallet_oid,
+            amount,
+            session,
+            (WalletModel.balance_shards == 1) | (pick % WalletModel.balance_shards == 0),
+        )
+        if balance is not None:
+            return balance
+
+        shard = select(pick % WalletModel.balance_shards).where(WalletModel.oid == wallet_oid).scalar_subquery()
+        with LOCK_WAIT.time():
+            result = await session.execute(
+                update(WalletBalanceShardModel)
+                .where(WalletBalanceShardModel.wallet_oid == wallet_oid, WalletBalanceShardModel.shard == shard)
+                .values(balance=WalletBalanceShardModel.balance + amount)
+                .returning(WalletBalanceShardModel.balance),
             )
+        return result.scalar_one_or_none()
+
+    async def withdraw(self, wallet_oid: str, amount: Decimal, session: AsyncSession) -> Decimal | None:
+        balance = await self._withdraw_from_wallet_row(wallet_oid, amount, session)
+        if balance is not None:
+            return balance
+
+        shards = await self._collect_shards(wallet_oid, session)
+        if shards is not None and shards > 1:
+            return await self._withdraw_from_wallet_row(wallet_oid, amount, session)
+        return None
+
+    async def update_balance_at_version(
+        self,
+        wallet_oid: str,
+        amount: Decimal,
+        version: int,
+        session: AsyncSession,
+    ) -> Decimal | None:
+        balance = await self._add_to_wallet_row(
+            wallet_oid,
+            amount,
+            session,
+            WalletModel.version == version,
+            WalletModel.balance + amount >= 0,
         )
-        await session.execute(stmt)
+        if balance is not None or amount >= 0:
+            return balance
+
+        # the funds were checked against the total, which the shard rows may hold part of
+        result = await session.execute(select(WalletModel.balance_shards).where(WalletModel.oid == wallet_oid))
+        if (result.scalar_one_or_none() or 1) > 1:
+            return await self.withdraw(wallet_oid, -amount, session)
+        return None
 
     async def get_by_oid(self, wallet_oid, session: AsyncSession) -> WalletEntity | None:
-        result = await session.execute(select(WalletModel).where(WalletModel.oid == wallet_oid))
-        wallet_model = result.scalars().one_or_none()
-        if wallet_model:
-            return WalletEntity(
-                created_at=wallet_model.created_at,
-                updated_at=wallet_model.updated_at,
-                balance=wallet_model.balance,
-                oid=wallet_model.oid,
-            )
+        result = await session.execute(select(*WALLET_COLUMNS).where(WalletModel.oid == wallet_oid))
+        row = result.one_or_none()
+        if row:
+            return to_entity(row)
+
+    async def get_current(self, wallet_oid: str, session: AsyncSession) -> WalletEntity | None:
+        return await self.get_by_oid(wallet_oid=wallet_oid, session=session)
+
+    async def get_many(self, wallet_oids: list[str], session: AsyncSession) -> list[WalletEntity | None]:
+        unique_oids = list(dict.fromkeys(wallet_oids))
+        if session.bind.dialect.name == "postgresql":
+            # one array parameter instead of one per oid, so every lookup size shares a prepared statement
+            criterion = WalletModel.oid == any_(bindparam("wallet_oids", unique_oids, type_=ARRAY(String)))
+        else:
+            criterion = WalletModel.oid.in_(unique_oids)
+
+        result = await session.execute(select(*WALLET_COLUMNS).where(criterion))
+        wallets = {wallet.oid: wallet for wallet in map(to_entity, result)}
+        return [wallets.get(wallet_oid) for wallet_oid in wallet_oids]
 
     async def get_wallet_with_lock(self, wallet_oid: str, session: AsyncSession) -> WalletEntity | None:
-        result = await session.execute(
-                select(WalletModel).where(WalletModel.oid == wallet_oid).with_for_update(),
+        # the statement returns once the row lock is granted, so its duration is the wait plus one round trip
+        with LOCK_WAIT.time():
+            result = await session.execute(
+                select(*WALLET_COLUMNS).where(WalletModel.oid == wallet_oid).with_for_update(key_share=True),
+            )
+        row = result.one_or_none()
+        if row:
+            return to_entity(row)
+
+    async def get_wallets_with_lock(self, wallet_oids: list[str], session: AsyncSession) -> list[WalletEntity]:
+        with LOCK_WAIT.time():
+            result = await session.execute(
+                select(*WALLET_COLUMNS)
+                .where(WalletModel.oid.in_(wallet_oids))
+                .order_by(WalletModel.oid)
+                .with_for_update(key_share=True),
+            )
+        return [to_entity(row) for row in result]
+
+    async def update_balances(self, amounts: dict[str, Decimal], session: AsyncSession):
+        stmt = (
+            update(WalletModel)
+            .where(WalletModel.oid.in_(amounts))
+            .values(
+                balance=WalletModel.balance + case(amounts, value=WalletModel.oid, else_=0),
+                version=WalletModel.version + 1,
+            )
         )
-        return result.scalar_one_or_none()
+        with LOCK_WAIT.time():
+            await session.execute(stmt)
 
     async def add(self, wallet: WalletEntity, session: AsyncSession) -> WalletEntity:
         wallet_model = WalletModel(
             oid=wallet.oid,
+            balance_shards=self.balance_shards,
         )
 
         session.add(wallet_model)
         await session.flush()
+        if self.balance_shards > 1:
+            await session.execute(
+                insert(WalletBalanceShardModel),
+                [{"wallet_oid": wallet.oid, "shard": shard} for shard in range(1, self.balance_shards)],
+            )
 
         return WalletEntity(
             oid=wallet_model.oid,
@@ -55,3 +203,120 @@ class SQLAlchemyWalletRepository(BaseWalletRepository):
             created_at=wallet_model.created_at,
             updated_at=wallet_model.updated_at,
         )
+
+    async def add_many(self, wallets: list[WalletEntity], session: AsyncSession) -> list[WalletEntity]:
+        created_at = datetime.now()
+        saved_wallets = [
+            WalletEntity(oid=wallet.oid, balance=Decimal(0), created_at=created_at, updated_at=created_at)
+            for wallet in wallets
+        ]
+        await session.execute(
+            insert(WalletModel),
+            [
+                {
+                    "oid": wallet.oid,
+                    "balance": wallet.balance,
+                    "balance_shards": self.balance_shards,
+                    "created_at": wallet.created_at,
+                    "updated_at": wallet.updated_at,
+                }
+                for wallet in saved_wallets
+            ],
+        )
+        if self.balance_shards > 1:
+            await session.execute(
+                insert(WalletBalanceShardModel),
+                [
+                    {"wallet_oid": wallet.oid, "shard": shard}
+                    for wallet in saved_wallets
+                    for shard in range(1, self.balance_shards)
+                ],
+            )
+
+        return saved_wallets
+
+    async def get_batch(
+        self,
+        session: AsyncSession,
+        after_oid: str | None = None,
+        limit: int = 1000,
+    ) -> list[WalletEntity]:
+        stmt = select(*WALLET_COLUMNS).order_by(WalletModel.oid).limit(limit)
+        if after_oid is not None:
+            stmt = stmt.where(WalletModel.oid > after_oid)
+
+        result = await session.execute(stmt)
+        return [to_entity(row) for row in result]
+
+    async def reshard_balance(self, wallet_oid: str, shards: int, session: AsyncSession) -> bool:
+        """Changes the number of rows the wallet's balance is spread over; returns ``False`` if it does not exist.
+
+        The whole balance is moved into the wallet row first, so the total does not change.
+        """
+        if await self._collect_shards(wallet_oid, session) is None:
+            return False
+
+        await session.execute(delete(WalletBalanceShardModel).where(WalletBalanceShardModel.wallet_oid == wallet_oid))
+        if shards > 1:
+            await session.execute(
+                insert(WalletBalanceShardModel),
+                [{"wallet_oid": wallet_oid, "shard": shard} for shard in range(1, shards)],
+            )
+        await session.execute(
+            update(WalletModel)
+            .where(WalletModel.oid == wallet_oid)
+            .values(balance_shards=shards, version=WalletModel.version + 1),
+        )
+        return True
+
+    async def _add_to_wallet_row(
+        self,
+        wallet_oid: str,
+        amount: Decimal,
+        session: AsyncSession,
+        *criteria,
+    ) -> Decimal | None:
+        # the update waits for the row lock of any other writer of the wallet row
+        with LOCK_WAIT.time():
+            result = await session.execute(
+                update(WalletModel)
+                .where(WalletModel.oid == wallet_oid, *criteria)
+                .values(balance=WalletModel.balance + amount, version=WalletModel.version + 1)
+                .returning(WalletModel.balance),
+            )
+        return result.scalar_one_or_none()
+
+    async def _withdraw_from_wallet_row(self, wallet_oid: str, amount: Decimal, session: AsyncSession) -> Decimal | None:
+        return await self._add_to_wallet_row(wallet_oid, -amount, session, WalletModel.balance >= amount)
+
+    async def _collect_shards(self, wallet_oid: str, session: AsyncSession) -> int | None:
+        """Moves the balance of the wallet's shard rows into the wallet row.
+
+        Returns the wallet's shard count, or ``None`` if it does not exist. The wallet row is locked before the
+        shard rows, in the same order as every other debit, and without blocking the foreign key checks of
+        deposits that already hold a shard row.
+        """
+        with LOCK_WAIT.time():
+            result = await session.execute(
+                select(WalletModel.balance_shards).where(WalletModel.oid == wallet_oid).with_for_update(key_share=True),
+            )
+        shards = result.scalar_one_or_none()
+        if shards is None or shards == 1:
+            return shards
+
+        with LOCK_WAIT.time():
+            result = await session.execute(
+                select(WalletBalanceShardModel.balance)
+                .where(WalletBalanceShardModel.wallet_oid == wallet_oid)
+                .order_by(WalletBalanceShardModel.shard)
+                .with_for_update(),
+            )
+        collected = sum(result.scalars(), Decimal(0))
+        if collected:
+            await session.execute(
+                update(WalletBalanceShardModel)
+                .where(WalletBalanceShardModel.wallet_oid == wallet_oid)
+                .values(balance=0),
+            )
+            await self._add_to_wallet_row(wallet_oid, collected, session)
+        return shards
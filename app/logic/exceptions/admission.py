@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+
+from logic.exceptions.base import LogicException
+
+
+@dataclass
+class OverloadedException(LogicException):
+    retry_after: float
+
+    @property
+    def message(self):
+        return "Service is overloaded, retry later"
+
+
+@dataclass
+class RateLimitExceededException(OverloadedException):
+    @property
+    def message(self):
+        return "Too many requests, retry later"
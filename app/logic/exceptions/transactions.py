@@ -8,3 +8,26 @@ class TransactionNotFoundException(LogicException):
     @property
     def message(self):
         return "Transaction not found"
+
+
+@dataclass
+class BulkOperationRolledBackException(LogicException):
+    @property
+    def message(self):
+        return "Operation rolled back because another operation in the bulk failed"
+
+
+@dataclass
+class IdempotencyKeyMismatchException(LogicException):
+    key: str
+
+    @property
+    def message(self):
+        return f"Idempotency key was already used for a different operation: {self.key}"
+
+
+@dataclass
+class SameWalletTransferException(LogicException):
+    @property
+    def message(self):
+        return "Cannot transfer to the same wallet"
@@ -15,3 +15,31 @@ class NotEnoughFundsException(LogicException):
     @property
     def message(self):
         return "Not enough funds in wallet"
+
+
+@dataclass
+class WalletEventsDisabledException(LogicException):
+    @property
+    def message(self):
+        return "Wallet events are disabled"
+
+
+@dataclass
+class WalletStatementsDisabledException(LogicException):
+    @property
+    def message(self):
+        return "Wallet statements are disabled"
+
+
+@dataclass
+class InvalidStatementRangeException(LogicException):
+    @property
+    def message(self):
+        return "Statement range must not end before it starts"
+
+
+@dataclass
+class WalletVersionConflictException(LogicException):
+    @property
+    def message(self):
+        return "Wallet was changed by another operation, retry"
@@ -5,16 +5,61 @@ from punq import (
     Scope,
 )
 
+from infra.cache.lru import LRUCache
+from infra.cache.wallets import (
+    BaseWalletCache,
+    MemoryWalletCache,
+)
 from infra.database.manager import (
     DatabaseManager,
     SessionManager,
 )
+from infra.database.replicas import ReadYourWrites
+from infra.events.broker import WalletEventBroker
+from infra.rate_limits.store import (
+    BaseRateLimitStore,
+    MemoryRateLimitStore,
+)
+from infra.repositories.daily_totals.base import BaseWalletDailyTotalsRepository
+from infra.repositories.daily_totals.memo_daily_totals_repository import MemoryWalletDailyTotalsRepository
+from infra.repositories.daily_totals.sqlalchemy_daily_totals_repository import SQLAlchemyWalletDailyTotalsRepository
+from infra.repositories.events.base import BaseWalletEventRepository
+from infra.repositories.events.memo_event_repository import MemoryWalletEventRepository
+from infra.repositories.events.sqlalchemy_event_repository import SQLAlchemyWalletEventRepository
+from infra.repositories.idempotency.base import BaseIdempotencyKeyRepository
+from infra.repositories.idempotency.cached_idempotency_repository import CachedIdempotencyKeyRepository
+from infra.repositories.idempotency.memo_idempotency_repository import MemoryIdempotencyKeyRepository
+from infra.repositories.idempotency.sqlalchemy_idempotency_repository import SQLAlchemyIdempotencyKeyRepository
+from infra.repositories.snapshots.base import BaseWalletSnapshotRepository
+from infra.repositories.snapshots.memo_snapshot_repository import MemoryWalletSnapshotRepository
+from infra.repositories.snapshots.sqlalchemy_snapshot_repository import SQLAlchemyWalletSnapshotRepository
 from infra.repositories.transactions.base import BaseTransactionRepository
+from infra.repositories.transactions.memo_transaction_repository import MemoryTransactionRepository
 from infra.repositories.transactions.sqlalchemy_transaction_repository import SQLAlchemyTransactionRepository
 from infra.repositories.wallets.base import BaseWalletRepository
+from infra.repositories.wallets.cached_wallet_repository import CachedWalletRepository
+from infra.repositories.wallets.memo_wallet_repository import MemoryWalletRepository
 from infra.repositories.wallets.sqlalchemy_wallet_repository import SQLAlchemyWalletRepository
+from logic.services.admission import (
+    AdmissionController,
+    AdmissionService,
+)
+from logic.services.events import (
+    BaseWalletEventService,
+    WalletEventService,
+)
+from logic.services.ledger import (
+    BaseLedgerService,
+    LedgerService,
+)
+from logic.services.rate_limits import RateLimiter
+from logic.services.statements import (
+    BaseWalletStatementService,
+    WalletStatementService,
+)
 from logic.services.transactions import (
     BaseTransactionService,
+    BatchedTransactionService,
     TransactionService,
 )
 from logic.services.wallets import (
@@ -23,10 +68,21 @@ from logic.services.wallets import (
     WalletManagementService,
     WalletService,
 )
+from logic.use_cases.transactions.bulk import CreateTransactionsBulkUseCase
 from logic.use_cases.transactions.create import CreateTransactionUseCase
+from logic.use_cases.transactions.export import ExportTransactionsUseCase
 from logic.use_cases.transactions.get import GetTransactionsUseCase
-from logic.use_cases.wallets.create import CreateWalletUseCase
-from logic.use_cases.wallets.get import GetWalletUseCase
+from logic.use_cases.transactions.transfer import CreateTransferUseCase
+from logic.use_cases.wallets.create import (
+    CreateWalletsBatchUseCase,
+    CreateWalletUseCase,
+)
+from logic.use_cases.wallets.events import StreamWalletEventsUseCase
+from logic.use_cases.wallets.get import (
+    GetWalletUseCase,
+    LookupWalletsUseCase,
+)
+from logic.use_cases.wallets.statement import GetWalletStatementUseCase
 from logic.validators.transactions import (
     BaseTransactionValidatorService,
     ComposedTaskValidatorService,
@@ -36,32 +92,116 @@ from logic.validators.transactions import (
 from settings.config import Settings
 
 
+USE_CASES = (
+    CreateWalletUseCase,
+    GetWalletUseCase,
+    CreateWalletsBatchUseCase,
+    LookupWalletsUseCase,
+    CreateTransactionUseCase,
+    CreateTransactionsBulkUseCase,
+    CreateTransferUseCase,
+    GetTransactionsUseCase,
+    ExportTransactionsUseCase,
+    StreamWalletEventsUseCase,
+    GetWalletStatementUseCase,
+)
+
+
 @lru_cache(1)
 def init_container() -> Container:
     return _init_container()
 
 
-def _init_container() -> Container:
+def _init_container(scope: Scope = Scope.singleton) -> Container:
+    """Builds the application container.
+
+    Repositories, validators, services and use cases keep no per-request state, so by default they are built once
+    and shared. ``Scope.transient`` rebuilds the graph on every ``resolve`` call.
+    """
     container = Container()
     container.register(Settings, instance=Settings(), scope=Scope.singleton)
     settings: Settings = container.resolve(Settings)
 
-    database_manager = DatabaseManager(settings.db_url)
+    database_manager = DatabaseManager.from_settings(settings)
     container.register(
         DatabaseManager,
         instance=database_manager,
         scope=Scope.singleton,
     )
 
-    session_manager = SessionManager(session_factory=database_manager.SessionLocal)
+    session_manager = SessionManager(
+        session_factory=database_manager.SessionLocal,
+        read_session_factory=database_manager.ReplicaSessionLocal,
+        read_your_writes=(
+            ReadYourWrites(window=settings.DB_READ_YOUR_WRITES_SECONDS) if database_manager.replica_engines else None
+        ),
+    )
     container.register(SessionManager, instance=session_manager)
+
+    # the slots and queues are per worker, so every request shares one instance
+    container.register(
+        AdmissionService,
+        instance=AdmissionService(
+            read=AdmissionController(
+                kind="read",
+                limit=settings.ADMISSION_READ_LIMIT,
+                queue_size=settings.ADMISSION_READ_QUEUE_SIZE,
+                timeout=settings.ADMISSION_READ_TIMEOUT_SECONDS,
+                retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS,
+                enabled=settings.ADMISSION_CONTROL_ENABLED,
+            ),
+            write=AdmissionController(
+                kind="write",
+                limit=settings.ADMISSION_WRITE_LIMIT,
+                queue_size=settings.ADMISSION_WRITE_QUEUE_SIZE,
+                timeout=settings.ADMISSION_WRITE_TIMEOUT_SECONDS,
+                retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS,
+                enabled=settings.ADMISSION_CONTROL_ENABLED,
+            ),
+        ),
+    )
+
+    # the counters live in the store, so every request shares one
+    container.register(BaseRateLimitStore, instance=MemoryRateLimitStore(max_keys=settings.RATE_LIMIT_MAX_KEYS))
+    container.register(
+        RateLimiter,
+        instance=RateLimiter(
+            store=container.resolve(BaseRateLimitStore),
+            wallet_limit=settings.RATE_LIMIT_WALLET_REQUESTS,
+            client_limit=settings.RATE_LIMIT_CLIENT_REQUESTS,
+            window=settings.RATE_LIMIT_WINDOW_SECONDS,
+            enabled=settings.RATE_LIMIT_ENABLED,
+        ),
+    )
+
+    # in-memory repositories hold the data themselves, so each of them is shared whatever the scope
+    in_memory = settings.REPOSITORY_BACKEND == "memory"
+
     ### Wallets
 
     # wallet repository
-    def build_wallet_repository() -> SQLAlchemyWalletRepository:
-        return SQLAlchemyWalletRepository()
+    if settings.WALLET_CACHE_ENABLED:
+        container.register(
+            BaseWalletCache,
+            instance=MemoryWalletCache(
+                max_size=settings.WALLET_CACHE_MAX_SIZE,
+                ttl=settings.WALLET_CACHE_TTL_SECONDS,
+            ),
+        )
+
+    wallet_repository = (
+        MemoryWalletRepository()
+        if in_memory
+        else SQLAlchemyWalletRepository(balance_shards=settings.WALLET_BALANCE_SHARDS)
+    )
 
-    container.register(BaseWalletRepository, factory=build_wallet_repository)
+    def build_wallet_repository() -> BaseWalletRepository:
+        repository = wallet_repository
+        if settings.WALLET_CACHE_ENABLED:
+            return CachedWalletRepository(repository=repository, cache=container.resolve(BaseWalletCache))
+        return repository
+
+    container.register(BaseWalletRepository, factory=build_wallet_repository, scope=scope)
 
     # wallet services
 
@@ -76,8 +216,8 @@ def _init_container() -> Container:
             wallet_repository=container.resolve(BaseWalletRepository),
         )
 
-    container.register(BaseWalletManagementService, factory=init_wallet_managment_service)
-    container.register(BaseWalletService, factory=init_wallet_query_service)
+    container.register(BaseWalletManagementService, factory=init_wallet_managment_service, scope=scope)
+    container.register(BaseWalletService, factory=init_wallet_query_service, scope=scope)
 
     # wallet use cases
     def build_create_wallet_use_case() -> CreateWalletUseCase:
@@ -88,14 +228,25 @@ def _init_container() -> Container:
         return GetWalletUseCase(
             wallet_service=container.resolve(BaseWalletService),
         )
-    container.register(CreateWalletUseCase, factory=build_create_wallet_use_case)
-    container.register(GetWalletUseCase, factory=build_get_wallet_use_case)
+    container.register(CreateWalletUseCase, factory=build_create_wallet_use_case, scope=scope)
+    container.register(GetWalletUseCase, factory=build_get_wallet_use_case, scope=scope)
+
+    def build_create_wallets_batch_use_case() -> CreateWalletsBatchUseCase:
+        return CreateWalletsBatchUseCase(
+            wallet_service=container.resolve(BaseWalletService),
+        )
+    def build_lookup_wallets_use_case() -> LookupWalletsUseCase:
+        return LookupWalletsUseCase(
+            wallet_service=container.resolve(BaseWalletService),
+        )
+    container.register(CreateWalletsBatchUseCase, factory=build_create_wallets_batch_use_case, scope=scope)
+    container.register(LookupWalletsUseCase, factory=build_lookup_wallets_use_case, scope=scope)
 
     ### Transactions
 
     # validators
-    container.register(TransactionAmountValidatorService)
-    container.register(TransactionOperationTypeValidatorService)
+    container.register(TransactionAmountValidatorService, scope=scope)
+    container.register(TransactionOperationTypeValidatorService, scope=scope)
 
     def build_transaction_validators() -> BaseTransactionValidatorService:
         return ComposedTaskValidatorService(
@@ -105,13 +256,52 @@ def _init_container() -> Container:
             ],
         )
 
-    container.register(BaseTransactionValidatorService, factory=build_transaction_validators)
+    container.register(BaseTransactionValidatorService, factory=build_transaction_validators, scope=scope)
 
     # transaction repository
     def build_transaction_repository() -> SQLAlchemyTransactionRepository:
         return SQLAlchemyTransactionRepository()
 
-    container.register(BaseTransactionRepository, factory=build_transaction_repository)
+    if in_memory:
+        container.register(BaseTransactionRepository, instance=MemoryTransactionRepository())
+    else:
+        container.register(BaseTransactionRepository, factory=build_transaction_repository, scope=scope)
+
+    # idempotency keys, cached in process and shared by every request
+    idempotency_key_repository = CachedIdempotencyKeyRepository(
+        repository=MemoryIdempotencyKeyRepository() if in_memory else SQLAlchemyIdempotencyKeyRepository(),
+        cache=LRUCache(
+            max_size=settings.IDEMPOTENCY_CACHE_MAX_SIZE,
+            ttl=settings.IDEMPOTENCY_KEY_TTL_SECONDS,
+        ),
+    )
+    container.register(BaseIdempotencyKeyRepository, instance=idempotency_key_repository)
+
+    # outbox of balance changes, left unwritten when events are disabled
+    container.register(
+        BaseWalletEventRepository,
+        instance=MemoryWalletEventRepository() if in_memory else SQLAlchemyWalletEventRepository(),
+    )
+
+    def build_transaction_event_repository() -> BaseWalletEventRepository | None:
+        if settings.WALLET_EVENTS_ENABLED:
+            return container.resolve(BaseWalletEventRepository)
+        return None
+
+    # per-day totals, spread over as many rows per day as balances are
+    container.register(
+        BaseWalletDailyTotalsRepository,
+        instance=(
+            MemoryWalletDailyTotalsRepository()
+            if in_memory
+            else SQLAlchemyWalletDailyTotalsRepository(shards=settings.WALLET_BALANCE_SHARDS)
+        ),
+    )
+
+    def build_transaction_daily_totals_repository() -> BaseWalletDailyTotalsRepository | None:
+        if settings.WALLET_DAILY_TOTALS_ENABLED:
+            return container.resolve(BaseWalletDailyTotalsRepository)
+        return None
 
     # transaction services
 
@@ -120,9 +310,31 @@ def _init_container() -> Container:
             session_manager=container.resolve(SessionManager),
             transaction_repository=container.resolve(BaseTransactionRepository),
             wallet_manager_service=container.resolve(BaseWalletManagementService),
+            idempotency_key_repository=container.resolve(BaseIdempotencyKeyRepository),
+            event_repository=build_transaction_event_repository(),
+            daily_totals_repository=build_transaction_daily_totals_repository(),
+            concurrency_mode=settings.WALLET_CONCURRENCY_MODE,
+            max_retries=settings.WALLET_OPTIMISTIC_MAX_RETRIES,
+            retry_backoff=settings.WALLET_OPTIMISTIC_BACKOFF_SECONDS,
+        )
+
+    def init_batched_transaction_service() -> BatchedTransactionService:
+        return BatchedTransactionService(
+            session_manager=container.resolve(SessionManager),
+            transaction_repository=container.resolve(BaseTransactionRepository),
+            wallet_manager_service=container.resolve(BaseWalletManagementService),
+            idempotency_key_repository=container.resolve(BaseIdempotencyKeyRepository),
+            event_repository=build_transaction_event_repository(),
+            daily_totals_repository=build_transaction_daily_totals_repository(),
+            batch_window=settings.TRANSACTION_BATCH_WINDOW_MS / 1000,
+            batch_max_size=settings.TRANSACTION_BATCH_MAX_SIZE,
         )
 
-    container.register(BaseTransactionService, factory=init_transaction_service)
+    if settings.TRANSACTION_BATCHING_ENABLED:
+        # the batcher keeps per-wallet queues, so every request has to share one service instance
+        container.register(BaseTransactionService, instance=init_batched_transaction_service())
+    else:
+        container.register(BaseTransactionService, factory=init_transaction_service, scope=scope)
 
     # transactions use cases
     def build_create_transaction_use_case() -> CreateTransactionUseCase:
@@ -131,12 +343,102 @@ def _init_container() -> Container:
             validator_service=container.resolve(BaseTransactionValidatorService),
         )
 
+    def build_create_transactions_bulk_use_case() -> CreateTransactionsBulkUseCase:
+        return CreateTransactionsBulkUseCase(
+            transaction_service=container.resolve(BaseTransactionService),
+            validator_service=container.resolve(BaseTransactionValidatorService),
+        )
+
+    def build_create_transfer_use_case() -> CreateTransferUseCase:
+        return CreateTransferUseCase(
+            transaction_service=container.resolve(BaseTransactionService),
+        )
+
     def build_get_transaction_use_case() -> GetTransactionsUseCase:
         return GetTransactionsUseCase(
             transaction_service=container.resolve(BaseTransactionService),
         )
 
-    container.register(CreateTransactionUseCase, factory=build_create_transaction_use_case)
-    container.register(GetTransactionsUseCase, factory=build_get_transaction_use_case)
+    container.register(CreateTransactionUseCase, factory=build_create_transaction_use_case, scope=scope)
+    container.register(CreateTransactionsBulkUseCase, factory=build_create_transactions_bulk_use_case, scope=scope)
+    container.register(CreateTransferUseCase, factory=build_create_transfer_use_case, scope=scope)
+    container.register(GetTransactionsUseCase, factory=build_get_transaction_use_case, scope=scope)
+
+    def build_export_transactions_use_case() -> ExportTransactionsUseCase:
+        return ExportTransactionsUseCase(
+            transaction_service=container.resolve(BaseTransactionService),
+            wallet_service=container.resolve(BaseWalletService),
+        )
+
+    container.register(ExportTransactionsUseCase, factory=build_export_transactions_use_case, scope=scope)
+
+    ### Wallet events
+
+    # the dispatcher position and the subscriptions live in the service, so every request shares one instance
+    container.register(
+        BaseWalletEventService,
+        instance=WalletEventService(
+            session_manager=session_manager,
+            event_repository=container.resolve(BaseWalletEventRepository),
+            broker=WalletEventBroker(queue_size=settings.WALLET_EVENTS_QUEUE_SIZE),
+            enabled=settings.WALLET_EVENTS_ENABLED,
+            batch_size=settings.WALLET_EVENTS_BATCH_SIZE,
+            gap_timeout=settings.WALLET_EVENTS_GAP_TIMEOUT_SECONDS,
+            poll_interval=settings.WALLET_EVENTS_POLL_INTERVAL_SECONDS,
+        ),
+    )
+
+    def build_stream_wallet_events_use_case() -> StreamWalletEventsUseCase:
+        return StreamWalletEventsUseCase(
+            wallet_service=container.resolve(BaseWalletService),
+            event_service=container.resolve(BaseWalletEventService),
+            heartbeat=settings.WALLET_EVENTS_HEARTBEAT_SECONDS,
+        )
+
+    container.register(StreamWalletEventsUseCase, factory=build_stream_wallet_events_use_case, scope=scope)
+
+    ### Statements
+
+    def init_statement_service() -> WalletStatementService:
+        return WalletStatementService(
+            session_manager=container.resolve(SessionManager),
+            daily_totals_repository=container.resolve(BaseWalletDailyTotalsRepository),
+            wallet_repository=container.resolve(BaseWalletRepository),
+            transaction_repository=container.resolve(BaseTransactionRepository),
+            enabled=settings.WALLET_DAILY_TOTALS_ENABLED,
+        )
+
+    def build_get_wallet_statement_use_case() -> GetWalletStatementUseCase:
+        return GetWalletStatementUseCase(
+            wallet_service=container.resolve(BaseWalletService),
+            statement_service=container.resolve(BaseWalletStatementService),
+        )
+
+    container.register(BaseWalletStatementService, factory=init_statement_service, scope=scope)
+    container.register(GetWalletStatementUseCase, factory=build_get_wallet_statement_use_case, scope=scope)
+
+    ### Ledger
+
+    if in_memory:
+        container.register(BaseWalletSnapshotRepository, instance=MemoryWalletSnapshotRepository())
+    else:
+        container.register(BaseWalletSnapshotRepository, factory=SQLAlchemyWalletSnapshotRepository, scope=scope)
+
+    def init_ledger_service() -> LedgerService:
+        return LedgerService(
+            session_manager=container.resolve(SessionManager),
+            wallet_repository=container.resolve(BaseWalletRepository),
+            transaction_repository=container.resolve(BaseTransactionRepository),
+            snapshot_repository=container.resolve(BaseWalletSnapshotRepository),
+            snapshot_every=settings.LEDGER_SNAPSHOT_EVERY,
+            stream_batch_size=settings.LEDGER_STREAM_BATCH_SIZE,
+        )
+
+    container.register(BaseLedgerService, factory=init_ledger_service, scope=scope)
+
+    if scope is Scope.singleton:
+        # build the whole graph at startup, so requests only look up ready instances
+        for use_case in USE_CASES:
+            container.resolve(use_case)
 
     return container
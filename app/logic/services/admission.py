@@ -0,0 +1,120 @@
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import (
+    dataclass,
+    field,
+)
+from time import perf_counter
+
+from infra.metrics.instruments import (
+    ADMISSION_IN_FLIGHT,
+    ADMISSION_QUEUE_DEPTH,
+    ADMISSION_REJECTED,
+    ADMISSION_WAIT,
+)
+from logic.exceptions.admission import OverloadedException
+
+
+@dataclass
+class AdmissionController:
+    """Caps the requests of one kind that run at once in this worker.
+
+    Up to ``limit`` requests hold a slot; the next ``queue_size`` wait for one in arrival order, each for at
+    most ``timeout`` seconds. Anything beyond that is rejected right away with ``OverloadedException``, so an
+    overloaded database makes clients back off instead of piling requests up until the pool times out. A
+    finished request hands its slot straight to the oldest waiter.
+    """
+
+    kind: str
+    limit: int
+    queue_size: int
+    timeout: float
+    retry_after: float = 1.0
+    enabled: bool = True
+
+    in_flight: int = field(default=0, init=False)
+    _waiters: deque[asyncio.Future] = field(default_factory=deque, init=False)
+
+    def __post_init__(self):
+        self._in_flight_gauge = ADMISSION_IN_FLIGHT.labels(self.kind)
+        self._queue_depth_gauge = ADMISSION_QUEUE_DEPTH.labels(self.kind)
+        self._wait_histogram = ADMISSION_WAIT.labels(self.kind)
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        if not self.enabled:
+            yield
+            return
+
+        await self._acquire()
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self):
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            self._in_flight_gauge.inc()
+            self._wait_histogram.observe(0)
+            return
+
+        if len(self._waiters) >= self.queue_size:
+            raise self._reject("queue_full")
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self._queue_depth_gauge.inc()
+        started = perf_counter()
+        try:
+            async with asyncio.timeout(self.timeout):
+                await future
+        except TimeoutError:
+            if not self._leave_queue(future):
+                raise self._reject("timeout") from None
+        except asyncio.CancelledError:
+            # a slot handed over as the caller went away goes on to the next waiter
+            if self._leave_queue(future):
+                self._release()
+            raise
+
+        self._wait_histogram.observe(perf_counter() - started)
+
+    def _leave_queue(self, future: asyncio.Future) -> bool:
+        """Takes a waiter that stopped waiting out of the queue; returns whether it was handed a slot anyway."""
+        if future.done() and not future.cancelled():
+            return True
+
+        if future in self._waiters:
+            self._waiters.remove(future)
+            self._queue_depth_gauge.dec()
+        return False
+
+    def _release(self):
+        while self._waiters:
+            future = self._waiters.popleft()
+            self._queue_depth_gauge.dec()
+            if not future.done():
+                future.set_result(None)
+                return
+
+        self.in_flight -= 1
+        self._in_flight_gauge.dec()
+
+    def _reject(self, reason: str) -> OverloadedException:
+        ADMISSION_REJECTED.labels(self.kind, reason).inc()
+        return OverloadedException(retry_after=self.retry_after)
+
+
+@dataclass
+class AdmissionService:
+    """Separate admission limits for reads and writes, so slow writes cannot starve cheap reads."""
+
+    read: AdmissionController
+    write: AdmissionController
@@ -0,0 +1,84 @@
+import asyncio
+from collections.abc import (
+    Awaitable,
+    Callable,
+    Hashable,
+)
+from dataclasses import (
+    dataclass,
+    field,
+)
+from typing import (
+    Any,
+    Generic,
+    TypeVar,
+)
+
+
+K = TypeVar("K", bound=Hashable)
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass
+class OperationBatcher(Generic[K, T, R]):
+    """Coalesces concurrently submitted items into one ``flush`` call per key.
+
+    The first item submitted for a key opens a batch that is flushed after ``window`` seconds or as soon as it
+    holds ``max_size`` items, whichever comes first. ``flush`` receives the items in submission order and must
+    return one result per item; a result that is an exception is raised to the caller of that item only.
+    """
+
+    flush: Callable[[K, list[T]], Awaitable[list[R | BaseException]]]
+    window: float = 0.002
+    max_size: int = 100
+
+    _pending: dict[K, list[tuple[T, asyncio.Future]]] = field(default_factory=dict, init=False)
+    _timers: dict[K, asyncio.TimerHandle] = field(default_factory=dict, init=False)
+    _tasks: set[asyncio.Task] = field(default_factory=set, init=False)
+
+    async def submit(self, key: K, item: T) -> R:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        batch = self._pending.setdefault(key, [])
+        batch.append((item, future))
+
+        if len(batch) >= self.max_size:
+            self._dispatch(key)
+        elif len(batch) == 1:
+            self._timers[key] = loop.call_later(self.window, self._dispatch, key)
+
+        return await future
+
+    def _dispatch(self, key: K):
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+
+        batch = self._pending.pop(key, None)
+        if not batch:
+            return
+
+        task = asyncio.get_running_loop().create_task(self._flush(key, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, key: K, batch: list[tuple[T, asyncio.Future]]):
+        results: list[Any]
+        try:
+            results = await self.flush(key, [item for item, _ in batch])
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as exception:
+            results = [exception] * len(batch)
+
+        for (_, future), result in zip(batch, results, strict=True):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,233 @@
+import asyncio
+import logging
+from abc import (
+    ABC,
+    abstractmethod,
+)
+from collections.abc import AsyncIterator
+from dataclasses import (
+    dataclass,
+    field,
+)
+from datetime import (
+    datetime,
+    timedelta,
+)
+from time import monotonic
+
+from domain.entities.wallets import WalletEvent as WalletEventEntity
+from infra.database.manager import SessionManager
+from infra.events.broker import WalletEventBroker
+from infra.repositories.events.base import BaseWalletEventRepository
+from logic.exceptions.wallets import WalletEventsDisabledException
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BaseWalletEventService(ABC):
+    @abstractmethod
+    async def dispatch(self) -> int: ...
+
+    @abstractmethod
+    async def run_dispatcher(self): ...
+
+    @abstractmethod
+    def subscribe(
+        self,
+        wallet_oid: str,
+        after: int | None = None,
+        heartbeat: float = 15.0,
+    ) -> AsyncIterator[WalletEventEntity | None]: ...
+
+    @abstractmethod
+    async def purge_events(self, older_than: timedelta) -> int: ...
+
+
+@dataclass
+class MissingOffset:
+    # when the dispatcher first found the offset missing, on this process's clock
+    since: float
+    # every transaction that can hold the offset started before this one; None when the database cannot tell
+    started_before: int | None
+
+
+@dataclass
+class WalletEventService(BaseWalletEventService):
+    """Delivers the outbox of balance changes to subscribers in this process.
+
+    The dispatcher tails the outbox by offset and publishes every new event to the broker; ``position`` is the
+    offset of the last event it published. Offsets are taken at insert, before commit, so an event with a lower
+    offset can become visible after a higher one. The dispatcher therefore publishes in offset order only: it
+    stops at a missing offset and polls for it again, until its event commits or its transaction is known to
+    have rolled back. That is once every transaction running when the offset went missing has finished, as far
+    as the database can tell, and otherwise after ``gap_timeout`` seconds. Subscribers replay what they missed
+    from the outbox and then follow the broker, so a stream resumed with the last seen offset has no gaps and no
+    duplicates.
+    """
+
+    session_manager: SessionManager
+    event_repository: BaseWalletEventRepository
+    broker: WalletEventBroker
+    enabled: bool = True
+    batch_size: int = 1000
+    gap_timeout: float = 10.0
+    poll_interval: float = 0.2
+    purge_batch_size: int = 1000
+
+    position: int | None = field(default=None, init=False)
+    _missing: dict[int, MissingOffset] = field(default_factory=dict, init=False)
+    # the oldest running transaction as of the previous batch, read before the events of the next one
+    _oldest_running: int | None = field(default=None, init=False)
+
+    async def _start(self) -> int:
+        if self.position is None:
+            # new subscribers only need events from now on, so the dispatcher starts at the end of the outbox
+            async with self.session_manager as session:
+                last_offset = await self.event_repository.get_last_offset(session=session)
+            if self.position is None:
+                self.position = last_offset
+        return self.position
+
+    async def dispatch(self) -> int:
+        """Publishes the new events up to the first missing offset, in batches, and returns how many were
+        published."""
+        await self._start()
+        dispatched = 0
+        while True:
+            horizon = None
+            async with self.session_manager as session:
+                events = await self.event_repository.get_after(
+                    after=self.position,
+                    limit=self.batch_size,
+                    session=session,
+                )
+                # read after the events, so it covers every transaction that held a missing offset
+                if events and events[-1].offset - self.position > len(events):
+                    horizon = await self.event_repository.get_transaction_horizon(session=session)
+            # publishing and moving the position happen without a suspension point, so a subscriber sees
+            # every event either in its replay up to the position or from the broker
+            now = monotonic()
+            oldest_running, self._oldest_running = self._oldest_running, horizon and horizon[0]
+            for event in events:
+                if not self._skip_gap(
+                    up_to=event.offset,
+                    now=now,
+                    started_before=horizon and horizon[1],
+                    oldest_running=oldest_running,
+                ):
+                    return dispatched
+                self.broker.publish(event)
+                self.position = event.offset
+                dispatched += 1
+
+            if len(events) < self.batch_size:
+                return dispatched
+
+    def _skip_gap(self, up_to: int, now: float, started_before: int | None, oldest_running: int | None) -> bool:
+        """Moves the position over the missing offsets below ``up_to`` whose transactions have finished or that
+        have expired; returns whether it reached ``up_to - 1``.
+
+        ``oldest_running`` must have been read before the events, so that a transaction it shows finished has
+        either left its event among them or rolled back.
+        """
+        for offset in range(self.position + 1, up_to):
+            self._missing.setdefault(offset, MissingOffset(since=now, started_before=started_before))
+        while self.position + 1 < up_to:
+            missing = self._missing[self.position + 1]
+            rolled_back = (
+                missing.started_before is not None
+                and oldest_running is not None
+                and oldest_running >= missing.started_before
+            )
+            if not rolled_back and now - missing.since < self.gap_timeout:
+                return False
+            self.position += 1
+            del self._missing[self.position]
+            if not rolled_back:
+                logger.warning("Wallet event %s was not committed within %ss, skipped", self.position, self.gap_timeout)
+        self._missing.pop(up_to, None)
+        return True
+
+    async def run_dispatcher(self):
+        while True:
+            try:
+                await self.dispatch()
+            except Exception:
+                logger.exception("Wallet event dispatch failed")
+            await asyncio.sleep(self.poll_interval)
+
+    def subscribe(
+        self,
+        wallet_oid: str,
+        after: int | None = None,
+        heartbeat: float = 15.0,
+    ) -> AsyncIterator[WalletEventEntity | None]:
+        """Yields the events of the wallet with an offset above ``after``, or from now on when it is None.
+
+        ``None`` is yielded after ``heartbeat`` seconds without events, so the caller can keep the connection
+        alive. A subscriber dropped by the broker for falling behind catches up from the outbox again.
+        """
+        # raised here rather than in the generator, before a response starts streaming
+        if not self.enabled:
+            raise WalletEventsDisabledException()
+
+        return self._follow(wallet_oid=wallet_oid, after=after, heartbeat=heartbeat)
+
+    async def _follow(
+        self,
+        wallet_oid: str,
+        after: int | None,
+        heartbeat: float,
+    ) -> AsyncIterator[WalletEventEntity | None]:
+        current = await self._start()
+        position = current if after is None else after
+        while True:
+            subscription = self.broker.subscribe(wallet_oid)
+            try:
+                replayed_up_to = self.position
+                while position < replayed_up_to:
+                    async with self.session_manager as session:
+                        events = await self.event_repository.get_after(
+                            after=position,
+                            limit=self.batch_size,
+                            wallet_oid=wallet_oid,
+                            up_to=replayed_up_to,
+                            session=session,
+                        )
+                    for event in events:
+                        yield event
+                    if len(events) < self.batch_size:
+                        break
+                    position = events[-1].offset
+                position = max(position, replayed_up_to)
+
+                while True:
+                    try:
+                        event = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat)
+                    except TimeoutError:
+                        yield None
+                        continue
+                    if event is None:
+                        break
+                    if event.offset > position:
+                        position = event.offset
+                        yield event
+            finally:
+                self.broker.unsubscribe(subscription)
+
+    async def purge_events(self, older_than: timedelta) -> int:
+        """Deletes events stored more than ``older_than`` ago, one short transaction per batch."""
+        created_before = datetime.now() - older_than
+        purged = 0
+        while True:
+            async with self.session_manager as session:
+                deleted = await self.event_repository.delete_expired(
+                    created_before=created_before,
+                    limit=self.purge_batch_size,
+                    session=session,
+                )
+            purged += deleted
+            if deleted < self.purge_batch_size:
+                return purged
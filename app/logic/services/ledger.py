@@ -0,0 +1,134 @@
+from abc import (
+    ABC,
+    abstractmethod,
+)
+from dataclasses import (
+    dataclass,
+    field,
+)
+from datetime import (
+    datetime,
+    timedelta,
+)
+from decimal import Decimal
+
+from domain.entities.wallets import (
+    Transaction as TransactionEntity,
+    Wallet as WalletEntity,
+    WalletSnapshot as WalletSnapshotEntity,
+)
+from domain.values.cursors import TransactionCursor
+from infra.database.manager import (
+    SessionManager,
+    use_consistent_snapshot,
+)
+from infra.repositories.snapshots.base import BaseWalletSnapshotRepository
+from infra.repositories.transactions.base import BaseTransactionRepository
+from infra.repositories.wallets.base import BaseWalletRepository
+
+
+@dataclass
+class BalanceDrift:
+    wallet_oid: str
+    expected_balance: Decimal
+    actual_balance: Decimal
+
+
+@dataclass
+class ReconciliationReport:
+    wallets_checked: int = 0
+    transactions_scanned: int = 0
+    snapshots_written: int = 0
+    drifts: list[BalanceDrift] = field(default_factory=list)
+
+
+@dataclass
+class BaseLedgerService(ABC):
+    @abstractmethod
+    async def reconcile(self) -> ReconciliationReport: ...
+
+
+@dataclass
+class LedgerService(BaseLedgerService):
+    """Recomputes wallet balances from the transaction log and compares them with ``wallets.balance``.
+
+    Each wallet is replayed from its latest snapshot, streaming ``stream_batch_size`` transactions at a time,
+    and a new snapshot is stored after every ``snapshot_every`` replayed transactions, so memory use and the
+    cost of the next run do not depend on the length of the history. Snapshots are only taken at transactions
+    older than ``snapshot_lag``: ``created_at`` is assigned before commit, so a younger transaction could still
+    be followed by an earlier one that has not committed yet.
+    """
+
+    session_manager: SessionManager
+    wallet_repository: BaseWalletRepository
+    transaction_repository: BaseTransactionRepository
+    snapshot_repository: BaseWalletSnapshotRepository
+    snapshot_every: int = 10_000
+    stream_batch_size: int = 5_000
+    wallet_batch_size: int = 1_000
+    snapshot_lag: timedelta = timedelta(minutes=5)
+
+    async def reconcile(self) -> ReconciliationReport:
+        report = ReconciliationReport()
+        after_oid = None
+        while True:
+            async with self.session_manager as session:
+                wallets = await self.wallet_repository.get_batch(
+                    after_oid=after_oid,
+                    limit=self.wallet_batch_size,
+                    session=session,
+                )
+            if not wallets:
+                return report
+
+            for wallet in wallets:
+                await self.reconcile_wallet(wallet_oid=wallet.oid, report=report)
+            after_oid = wallets[-1].oid
+
+    async def reconcile_wallet(self, wallet_oid: str, report: ReconciliationReport) -> BalanceDrift | None:
+        async with self.session_manager as session:
+            await use_consistent_snapshot(session)
+
+            wallet: WalletEntity | None = await self.wallet_repository.get_by_oid(wallet_oid=wallet_oid, session=session)
+            if wallet is None:
+                return None
+            snapshot = await self.snapshot_repository.get_latest(wallet_oid=wallet_oid, session=session)
+
+            balance = snapshot.balance if snapshot else Decimal(0)
+            after = TransactionCursor(created_at=snapshot.as_of, oid=snapshot.last_transaction_oid) if snapshot else None
+            snapshot_before = datetime.now() - self.snapshot_lag
+            replayed = 0
+            async for transactions in self.transaction_repository.stream(
+                wallet_oid=wallet_oid,
+                after=after,
+                batch_size=self.stream_batch_size,
+                session=session,
+            ):
+                for transaction in transactions:
+                    balance += transaction.balance_delta
+                    replayed += 1
+                    if replayed % self.snapshot_every == 0 and transaction.created_at < snapshot_before:
+                        await self._save_snapshot(wallet_oid=wallet_oid, balance=balance, last_transaction=transaction)
+                        report.snapshots_written += 1
+
+        report.wallets_checked += 1
+        report.transactions_scanned += replayed
+        if balance == wallet.balance:
+            return None
+
+        drift = BalanceDrift(wallet_oid=wallet_oid, expected_balance=balance, actual_balance=wallet.balance)
+        report.drifts.append(drift)
+        return drift
+
+    async def _save_snapshot(self, wallet_oid: str, balance: Decimal, last_transaction: TransactionEntity):
+        # written from a separate session: the streaming one keeps its cursor open until the replay ends
+        async with self.session_manager as session:
+            await self.snapshot_repository.add(
+                snapshot=WalletSnapshotEntity(
+                    wallet_oid=wallet_oid,
+                    balance=balance,
+                    last_transaction_oid=last_transaction.oid,
+                    as_of=last_transaction.created_at,
+                ),
+                session=session,
+            )
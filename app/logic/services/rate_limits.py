@@ -0,0 +1,32 @@
+from dataclasses import dataclass
+
+from infra.metrics.instruments import RATE_LIMIT_REJECTED
+from infra.rate_limits.store import BaseRateLimitStore
+from logic.exceptions.admission import RateLimitExceededException
+
+
+@dataclass
+class RateLimiter:
+    """Limits the requests of each client and on each wallet per sliding ``window`` seconds.
+
+    Checked before a request queues for a wallet's row lock, so a client hammering one wallet is turned away
+    with its retry delay instead of holding up everyone else's operations on it. A limit of 0 is not enforced.
+    """
+
+    store: BaseRateLimitStore
+    wallet_limit: int
+    client_limit: int
+    window: float = 1.0
+    enabled: bool = True
+
+    async def check(self, wallet_oid: str | None = None, client: str | None = None):
+        if not self.enabled:
+            return
+
+        for scope, key, limit in (("client", client, self.client_limit), ("wallet", wallet_oid, self.wallet_limit)):
+            if key is None or not limit:
+                continue
+            retry_after = await self.store.hit(key=f"{scope}:{key}", limit=limit, window=self.window)
+            if retry_after:
+                RATE_LIMIT_REJECTED.labels(scope).inc()
+                raise RateLimitExceededException(retry_after=retry_after)
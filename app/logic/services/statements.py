@@ -0,0 +1,112 @@
+from abc import (
+    ABC,
+    abstractmethod,
+)
+from dataclasses import dataclass
+from datetime import (
+    date,
+    datetime,
+    time,
+)
+
+from domain.values.statements import (
+    Granularity,
+    PeriodTotals,
+    roll_up,
+)
+from infra.database.manager import SessionManager
+from infra.repositories.daily_totals.base import BaseWalletDailyTotalsRepository
+from infra.repositories.transactions.base import BaseTransactionRepository
+from infra.repositories.wallets.base import BaseWalletRepository
+from logic.exceptions.wallets import WalletStatementsDisabledException
+
+
+@dataclass
+class BaseWalletStatementService(ABC):
+    @abstractmethod
+    async def get_statement(
+        self,
+        wallet_oid: str,
+        day_from: date,
+        day_to: date,
+        granularity: Granularity = Granularity.DAY,
+    ) -> list[PeriodTotals]: ...
+
+    @abstractmethod
+    async def rebuild_daily_totals(self, before: date) -> int: ...
+
+
+@dataclass
+class WalletStatementService(BaseWalletStatementService):
+    """Statements read from the daily totals, so their cost depends on the number of days, not of operations.
+
+    The totals are written by ``TransactionService`` as operations commit. ``rebuild_daily_totals`` recomputes
+    the days before a given date from the transaction log, for history older than the rollups or after a fix.
+    Only closed days are rebuilt: operations of later days may still be committing and adding to the totals.
+    """
+
+    session_manager: SessionManager
+    daily_totals_repository: BaseWalletDailyTotalsRepository
+    wallet_repository: BaseWalletRepository
+    transaction_repository: BaseTransactionRepository
+    enabled: bool = True
+    wallet_batch_size: int = 1_000
+    stream_batch_size: int = 5_000
+
+    async def get_statement(
+        self,
+        wallet_oid: str,
+        day_from: date,
+        day_to: date,
+        granularity: Granularity = Granularity.DAY,
+    ) -> list[PeriodTotals]:
+        # without the totals every period would read as empty
+        if not self.enabled:
+            raise WalletStatementsDisabledException()
+
+        async with self.session_manager.reader as session:
+            daily_totals = await self.daily_totals_repository.get_range(
+                wallet_oid=wallet_oid,
+                day_from=day_from,
+                day_to=day_to,
+                session=session,
+            )
+
+        return roll_up(daily_totals, granularity)
+
+    async def rebuild_daily_totals(self, before: date) -> int:
+        """Rebuilds the totals of every wallet for the days before ``before``; returns the number of wallets."""
+        rebuilt = 0
+        after_oid = None
+        while True:
+            async with self.session_manager as session:
+                wallets = await self.wallet_repository.get_batch(
+                    after_oid=after_oid,
+                    limit=self.wallet_batch_size,
+                    session=session,
+                )
+            if not wallets:
+                return rebuilt
+
+            for wallet in wallets:
+                await self.rebuild_wallet_daily_totals(wallet_oid=wallet.oid, before=before)
+            rebuilt += len(wallets)
+            after_oid = wallets[-1].oid
+
+    async def rebuild_wallet_daily_totals(self, wallet_oid: str, before: date):
+        async with self.session_manager as session:
+            totals: list[PeriodTotals] = []
+            async for transactions in self.transaction_repository.stream(
+                wallet_oid=wallet_oid,
+                batch_size=self.stream_batch_size,
+                created_to=datetime.combine(before, time()),
+                session=session,
+            ):
+                totals = roll_up([*totals, *map(PeriodTotals.from_transaction, transactions)])
+
+            await self.daily_totals_repository.replace_before(
+                wallet_oid=wallet_oid,
+                before=before,
+                totals=totals,
+                session=session,
+            )
@@ -1,21 +1,79 @@
+import asyncio
+import random
 from abc import (
     ABC,
     abstractmethod,
 )
-from collections.abc import Iterable
-from dataclasses import dataclass
+from collections import defaultdict
+from collections.abc import (
+    AsyncIterator,
+    Iterable,
+)
+from dataclasses import (
+    dataclass,
+    replace,
+)
+from datetime import (
+    datetime,
+    timedelta,
+)
+from decimal import Decimal
+from typing import Literal
+
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from application.api.filters import PaginationIn
-from domain.entities.wallets import Transaction as TransactionEntity
+from domain.entities.wallets import (
+    IdempotencyKey as IdempotencyKeyEntity,
+    Transaction as TransactionEntity,
+    Transfer as TransferEntity,
+    WalletEvent as WalletEventEntity,
+)
+from domain.exceptions import IdempotencyKeyConflictException
+from domain.values.cursors import TransactionCursor
+from domain.values.statements import (
+    PeriodTotals,
+    roll_up,
+)
 from infra.database.manager import SessionManager
+from infra.metrics.instruments import WALLET_VERSION_CONFLICTS
+from infra.repositories.daily_totals.base import BaseWalletDailyTotalsRepository
+from infra.repositories.events.base import BaseWalletEventRepository
+from infra.repositories.idempotency.base import BaseIdempotencyKeyRepository
 from infra.repositories.transactions.base import BaseTransactionRepository
+from logic.exceptions.base import LogicException
+from logic.exceptions.transactions import (
+    BulkOperationRolledBackException,
+    IdempotencyKeyMismatchException,
+    SameWalletTransferException,
+)
+from logic.exceptions.wallets import (
+    NotEnoughFundsException,
+    WalletNotFoundException,
+    WalletVersionConflictException,
+)
+from logic.services.batching import OperationBatcher
 from logic.services.wallets import BaseWalletManagementService
 
 
 @dataclass
 class BaseTransactionService(ABC):
     @abstractmethod
-    async def create_transaction(self, transaction: TransactionEntity) -> TransactionEntity: ...
+    async def create_transaction(
+        self,
+        transaction: TransactionEntity,
+        idempotency_key: str | None = None,
+    ) -> TransactionEntity: ...
+
+    @abstractmethod
+    async def create_transactions_bulk(
+        self,
+        transactions: list[TransactionEntity],
+        atomic: bool = False,
+    ) -> list[TransactionEntity | LogicException]: ...
+
+    @abstractmethod
+    async def create_transfer(self, transfer: TransferEntity) -> TransferEntity: ...
 
     @abstractmethod
     async def get_transactions_list(
@@ -23,31 +81,334 @@ class BaseTransactionService(ABC):
         pagination: PaginationIn,
     ) -> Iterable[TransactionEntity]: ...
 
+    @abstractmethod
+    def stream_transactions(
+        self,
+        wallet_oid: str,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+    ) -> AsyncIterator[list[TransactionEntity]]: ...
+
+    @abstractmethod
+    async def purge_idempotency_keys(self, older_than: timedelta) -> int: ...
+
 
 @dataclass
 class TransactionService(BaseTransactionService):
     session_manager: SessionManager
     transaction_repository: BaseTransactionRepository
     wallet_manager_service: BaseWalletManagementService
+    idempotency_key_repository: BaseIdempotencyKeyRepository
+    # the outbox and the daily totals are written in the transaction of each change; None skips them
+    event_repository: BaseWalletEventRepository | None = None
+    daily_totals_repository: BaseWalletDailyTotalsRepository | None = None
+    insert_chunk_size: int = 1000
+    stream_batch_size: int = 1000
+    purge_batch_size: int = 1000
+    # "optimistic" applies single operations with version-checked updates instead of waiting on the row lock
+    concurrency_mode: Literal["pessimistic", "optimistic"] = "pessimistic"
+    max_retries: int = 5
+    retry_backoff: float = 0.005
+
+    async def create_transaction(
+        self,
+        transaction: TransactionEntity,
+        idempotency_key: str | None = None,
+    ) -> TransactionEntity:
+        if idempotency_key is not None:
+            return await self._create_idempotent_transaction(transaction=transaction, key=idempotency_key)
+
+        if self.concurrency_mode == "optimistic":
+            for attempt in range(self.max_retries):
+                try:
+                    return await self._save_transaction(transaction=transaction, optimistic=True)
+                except WalletVersionConflictException:
+                    WALLET_VERSION_CONFLICTS.inc()
+                    # full jitter, so the operations that collided do not collide again on the next attempt
+                    await asyncio.sleep(random.uniform(0, self.retry_backoff * 2**attempt))  # noqa: S311
+            # a wallet this contended falls back to the row lock, which lets every operation through in turn
 
+        return await self._save_transaction(transaction=transaction)
 
-    async def create_transaction(self, transaction: TransactionEntity) -> TransactionEntity:
+    async def _save_transaction(self, transaction: TransactionEntity, optimistic: bool = False) -> TransactionEntity:
         async with self.session_manager as session:
-            await self.wallet_manager_service._has_sufficient_funds(transaction=transaction, session=session)
+            if optimistic:
+                await self.wallet_manager_service._apply_transaction_at_version(
+                    transaction=transaction,
+                    session=session,
+                )
+            else:
+                await self.wallet_manager_service._apply_transaction(transaction=transaction, session=session)
 
             saved_transaction = await self.transaction_repository.add(transaction=transaction, session=session)
-
-            await self.wallet_manager_service._update_wallet_amount(transaction=transaction, session=session)
+            await self._record_changes(transactions=[saved_transaction], session=session)
 
         return saved_transaction
 
-    async def get_transactions_list(self, wallet_oid: str, pagination: PaginationIn) -> list[TransactionEntity]:
+    async def _record_changes(self, transactions: list[TransactionEntity], session: AsyncSession):
+        """Writes the outbox events and daily totals of saved transactions, in their database transaction."""
+        if not transactions:
+            return
+        if self.event_repository is not None:
+            await self.event_repository.add_many(
+                events=[WalletEventEntity.for_transaction(transaction) for transaction in transactions],
+                session=session,
+            )
+        if self.daily_totals_repository is not None:
+            await self.daily_totals_repository.add(
+                totals=roll_up(PeriodTotals.from_transaction(transaction) for transaction in transactions),
+                session=session,
+            )
+
+    async def _create_idempotent_transaction(self, transaction: TransactionEntity, key: str) -> TransactionEntity:
+        """Creates the transaction once per wallet and ``key``; repeated requests get the original transaction.
+
+        The key is stored before the wallet is touched, so a concurrent request with the same key waits on the
+        unique constraint instead of the wallet lock and then replays the winner. Keys of rejected operations
+        are rolled back with them, and the request can be retried.
+        """
+        try:
+            async with self.session_manager as session:
+                existing = await self.idempotency_key_repository.get(
+                    wallet_oid=transaction.wallet_oid,
+                    key=key,
+                    session=session,
+                )
+                if existing is None:
+                    await self.idempotency_key_repository.add(
+                        idempotency_key=IdempotencyKeyEntity.for_transaction(key=key, transaction=transaction),
+                        session=session,
+                    )
+                    await self.wallet_manager_service._apply_transaction(transaction=transaction, session=session)
+                    saved_transaction = await self.transaction_repository.add(
+                        transaction=transaction,
+                        session=session,
+                    )
+                    await self._record_changes(transactions=[saved_transaction], session=session)
+        except IdempotencyKeyConflictException:
+            async with self.session_manager as session:
+                existing = await self.idempotency_key_repository.get(
+                    wallet_oid=transaction.wallet_oid,
+                    key=key,
+                    session=session,
+                )
+            if existing is None:
+                raise
+
+        if existing is None:
+            return saved_transaction
+
+        if not existing.matches(transaction):
+            raise IdempotencyKeyMismatchException(key=key)
+        return existing.transaction
+
+    async def purge_idempotency_keys(self, older_than: timedelta) -> int:
+        """Deletes keys stored more than ``older_than`` ago, one short transaction per batch."""
+        created_before = datetime.now() - older_than
+        purged = 0
+        while True:
+            async with self.session_manager as session:
+                deleted = await self.idempotency_key_repository.delete_expired(
+                    created_before=created_before,
+                    limit=self.purge_batch_size,
+                    session=session,
+                )
+            purged += deleted
+            if deleted < self.purge_batch_size:
+                return purged
+
+    async def create_transactions_batch(
+        self,
+        wallet_oid: str,
+        transactions: list[TransactionEntity],
+    ) -> list[TransactionEntity | LogicException]:
+        async with self.session_manager as session:
+            results = await self._apply_transactions(transactions=transactions, session=session)
+
+        return results
+
+    async def create_transactions_bulk(
+        self,
+        transactions: list[TransactionEntity],
+        atomic: bool = False,
+    ) -> list[TransactionEntity | LogicException]:
+        """Applies operations on any number of wallets in one database transaction.
+
+        In atomic mode a single rejected operation rolls the whole bulk back, and the operations that would
+        have been accepted are reported as ``BulkOperationRolledBackException``. Nothing is written before the
+        bulk is known to be accepted, so a rejected one takes no outbox offsets.
+        """
+        try:
+            async with self.session_manager as session:
+                results = await self._apply_transactions(transactions=transactions, session=session, atomic=atomic)
+                if atomic and any(isinstance(result, LogicException) for result in results):
+                    raise BulkOperationRolledBackException()
+        except BulkOperationRolledBackException:
+            return [
+                result if isinstance(result, LogicException) else BulkOperationRolledBackException()
+                for result in results
+            ]
+
+        return results
+
+    async def create_transfer(self, transfer: TransferEntity) -> TransferEntity:
+        """Moves money between two wallets in one database transaction.
+
+        Both wallets are locked in oid order, the same order bulks use, so opposite transfers between the same
+        wallets wait for each other instead of deadlocking. Both legs are inserted with one statement and both
+        balances change with another.
+        """
+        if transfer.source_wallet_oid == transfer.destination_wallet_oid:
+            raise SameWalletTransferException()
+
         async with self.session_manager as session:
+            wallets = {
+                wallet.oid: wallet
+                for wallet in await self.wallet_manager_service._lock_wallets(
+                    wallet_oids=sorted((transfer.source_wallet_oid, transfer.destination_wallet_oid)),
+                    session=session,
+                )
+            }
+            if len(wallets) < 2:
+                raise WalletNotFoundException()
+            if wallets[transfer.source_wallet_oid].balance < transfer.amount:
+                raise NotEnoughFundsException()
+
+            saved_transactions = await self.transaction_repository.add_many(
+                transactions=list(transfer.to_transactions()),
+                session=session,
+            )
+            await self.wallet_manager_service._change_wallet_balances(
+                amounts={
+                    transfer.source_wallet_oid: -transfer.amount,
+                    transfer.destination_wallet_oid: transfer.amount,
+                },
+                session=session,
+            )
+            await self._record_changes(transactions=saved_transactions, session=session)
+
+        return replace(transfer, created_at=saved_transactions[0].created_at)
+
+    async def _apply_transactions(
+        self,
+        transactions: list[TransactionEntity],
+        session: AsyncSession,
+        atomic: bool = False,
+    ) -> list[TransactionEntity | LogicException]:
+        """Applies operations in order, holding one row lock per affected wallet.
+
+        Wallets are locked in oid order so that concurrent bulks cannot deadlock. Every operation is checked
+        against the running balance of its wallet, so a rejected withdrawal does not affect the operations
+        queued after it. Accepted operations are written with one insert per chunk and one balance update;
+        when ``atomic`` is set and any operation is rejected, nothing is written.
+        """
+        indices_by_wallet: dict[str, list[int]] = defaultdict(list)
+        for index, transaction in enumerate(transactions):
+            indices_by_wallet[transaction.wallet_oid].append(index)
+
+        wallets = {
+            wallet.oid: wallet
+            for wallet in await self.wallet_manager_service._lock_wallets(
+                wallet_oids=sorted(indices_by_wallet),
+                session=session,
+            )
+        }
+
+        results: list[TransactionEntity | LogicException | None] = [None] * len(transactions)
+        balance_changes: dict[str, Decimal] = {}
+        for wallet_oid, indices in indices_by_wallet.items():
+            wallet = wallets.get(wallet_oid)
+            if wallet is None:
+                for index in indices:
+                    results[index] = WalletNotFoundException()
+                continue
+
+            balance = wallet.balance
+            for index in indices:
+                transaction = transactions[index]
+                if balance + transaction.balance_delta < 0:
+                    results[index] = NotEnoughFundsException()
+                    continue
+                balance += transaction.balance_delta
+                results[index] = transaction
+
+            if balance != wallet.balance:
+                balance_changes[wallet_oid] = balance - wallet.balance
+
+        accepted = [result for result in results if isinstance(result, TransactionEntity)]
+        if atomic and len(accepted) < len(results):
+            return results
+
+        saved_transactions: dict[str, TransactionEntity] = {}
+        for start in range(0, len(accepted), self.insert_chunk_size):
+            for saved_transaction in await self.transaction_repository.add_many(
+                transactions=accepted[start : start + self.insert_chunk_size],
+                session=session,
+            ):
+                saved_transactions[saved_transaction.oid] = saved_transaction
+        await self._record_changes(transactions=list(saved_transactions.values()), session=session)
+
+        if balance_changes:
+            await self.wallet_manager_service._change_wallet_balances(amounts=balance_changes, session=session)
+
+        return [
+            saved_transactions[result.oid] if isinstance(result, TransactionEntity) else result
+            for result in results
+        ]
+
+    async def get_transactions_list(self, wallet_oid: str, pagination: PaginationIn) -> list[TransactionEntity]:
+        cursor = TransactionCursor.decode(pagination.cursor) if pagination.cursor else None
+
+        async with self.session_manager.reader as session:
             transactions = await self.transaction_repository.get_all(
                 session=session,
                 limit=pagination.limit,
                 offset=pagination.offset,
+                cursor=cursor,
                 wallet_oid=wallet_oid,
             )
 
         return transactions
+
+    async def stream_transactions(
+        self,
+        wallet_oid: str,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+    ) -> AsyncIterator[list[TransactionEntity]]:
+        async with self.session_manager.reader as session:
+            async for transactions in self.transaction_repository.stream(
+                wallet_oid=wallet_oid,
+                batch_size=self.stream_batch_size,
+                created_from=created_from,
+                created_to=created_to,
+                session=session,
+            ):
+                yield transactions
+
+
+@dataclass
+class BatchedTransactionService(TransactionService):
+    """Group-commit mode: operations on the same wallet that arrive within ``batch_window`` seconds are
+    applied together in one database transaction, and each caller still gets its own result."""
+
+    batch_window: float = 0.002
+    batch_max_size: int = 100
+
+    def __post_init__(self):
+        self._batcher: OperationBatcher[str, TransactionEntity, TransactionEntity] = OperationBatcher(
+            flush=self.create_transactions_batch,
+            window=self.batch_window,
+            max_size=self.batch_max_size,
+        )
+
+    async def create_transaction(
+        self,
+        transaction: TransactionEntity,
+        idempotency_key: str | None = None,
+    ) -> TransactionEntity:
+        if idempotency_key is not None:
+            # a keyed operation is applied on its own, so its key is stored in the same transaction
+            return await super().create_transaction(transaction=transaction, idempotency_key=idempotency_key)
+
+        return await self._batcher.submit(transaction.wallet_oid, transaction)
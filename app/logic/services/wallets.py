@@ -17,6 +17,7 @@ from infra.repositories.wallets.base import BaseWalletRepository
 from logic.exceptions.wallets import (
     NotEnoughFundsException,
     WalletNotFoundException,
+    WalletVersionConflictException,
 )
 
 
@@ -26,10 +27,16 @@ class BaseWalletManagementService(ABC):
     async def _get_wallet_by_oid(self, wallet_oid: str) -> WalletEntity: ...
 
     @abstractmethod
-    async def _has_sufficient_funds(self, transaction: TransactionEntity): ...
+    async def _apply_transaction(self, transaction: TransactionEntity) -> Decimal: ...
 
     @abstractmethod
-    async def _update_wallet_amount(self, transaction: TransactionEntity): ...
+    async def _apply_transaction_at_version(self, transaction: TransactionEntity) -> Decimal: ...
+
+    @abstractmethod
+    async def _lock_wallets(self, wallet_oids: list[str]) -> list[WalletEntity]: ...
+
+    @abstractmethod
+    async def _change_wallet_balances(self, amounts: dict[str, Decimal]): ...
 
 
 @dataclass
@@ -37,21 +44,20 @@ class BaseWalletService(ABC):
     @abstractmethod
     async def get_wallet(self, wallet_oid: str) -> Decimal: ...
 
+    @abstractmethod
+    async def get_wallets(self, wallet_oids: list[str]) -> list[WalletEntity | None]: ...
+
     @abstractmethod
     async def create_wallet(self, wallet: WalletEntity) -> WalletEntity: ...
 
+    @abstractmethod
+    async def create_wallets(self, count: int) -> list[WalletEntity]: ...
+
 
 @dataclass
 class WalletManagementService(BaseWalletManagementService):
     wallet_repository: BaseWalletRepository
 
-    async def _has_sufficient_funds(self, transaction: TransactionEntity, session: AsyncSession):
-        wallet = await self.wallet_repository.get_wallet_with_lock(wallet_oid=transaction.wallet_oid, session=session)
-        if wallet is None:
-            raise WalletNotFoundException()
-        if transaction.operation_type == OperationType.WITHDRAW and wallet.balance < transaction.amount:
-            raise NotEnoughFundsException()
-
     async def _get_wallet_by_oid(self, wallet_oid: str, session: AsyncSession) -> WalletEntity:
         wallet = await self.wallet_repository.get_by_oid(wallet_oid=wallet_oid, session=session)
 
@@ -60,13 +66,59 @@ class WalletManagementService(BaseWalletManagementService):
 
         return wallet
 
-    async def _update_wallet_amount(self, transaction: TransactionEntity, session: AsyncSession):
-        amount = transaction.amount if transaction.operation_type == OperationType.DEPOSIT else -transaction.amount
-        await self.wallet_repository.update_balance(
+    async def _apply_transaction(self, transaction: TransactionEntity, session: AsyncSession) -> Decimal:
+        """Checks funds and changes the balance with a single conditional update instead of a row lock."""
+        if transaction.operation_type == OperationType.WITHDRAW:
+            balance = await self.wallet_repository.withdraw(
+                wallet_oid=transaction.wallet_oid,
+                amount=transaction.amount,
+                session=session,
+            )
+        else:
+            balance = await self.wallet_repository.update_balance(
+                wallet_oid=transaction.wallet_oid,
+                amount=transaction.balance_delta,
+                session=session,
+            )
+
+        if balance is None:
+            await self._get_wallet_by_oid(wallet_oid=transaction.wallet_oid, session=session)
+            raise NotEnoughFundsException()
+
+        return balance
+
+    async def _apply_transaction_at_version(self, transaction: TransactionEntity, session: AsyncSession) -> Decimal:
+        """Checks funds on an unlocked read and changes the balance only if the wallet is still at the version
+        that was read; raises ``WalletVersionConflictException`` otherwise.
+
+        Deposits need no funds check, so they are applied without comparing versions. The wallet is read past any
+        cache, which could hold an older balance and version.
+        """
+        if transaction.operation_type != OperationType.WITHDRAW:
+            return await self._apply_transaction(transaction=transaction, session=session)
+
+        wallet = await self.wallet_repository.get_current(wallet_oid=transaction.wallet_oid, session=session)
+        if wallet is None:
+            raise WalletNotFoundException()
+        if wallet.balance < transaction.amount:
+            raise NotEnoughFundsException()
+
+        balance = await self.wallet_repository.update_balance_at_version(
             wallet_oid=transaction.wallet_oid,
+            amount=transaction.balance_delta,
+            version=wallet.version,
             session=session,
-            amount=amount,
         )
+        if balance is None:
+            raise WalletVersionConflictException()
+
+        return balance
+
+    async def _lock_wallets(self, wallet_oids: list[str], session: AsyncSession) -> list[WalletEntity]:
+        return await self.wallet_repository.get_wallets_with_lock(wallet_oids=wallet_oids, session=session)
+
+    async def _change_wallet_balances(self, amounts: dict[str, Decimal], session: AsyncSession):
+        await self.wallet_repository.update_balances(amounts=amounts, session=session)
 
 
 @dataclass
@@ -75,15 +127,31 @@ class WalletService(BaseWalletService):
     wallet_repository: BaseWalletRepository
 
     async def get_wallet(self, wallet_oid: str) -> WalletEntity:
-        async with self.session_manager as session:
+        async with self.session_manager.reader as session:
             wallet = await self.wallet_repository.get_by_oid(wallet_oid=wallet_oid, session=session)
             if wallet is None:
                 raise WalletNotFoundException()
 
         return wallet
 
+    async def get_wallets(self, wallet_oids: list[str]) -> list[WalletEntity | None]:
+        """Returns the wallets in the order of ``wallet_oids``, with ``None`` for unknown oids."""
+        async with self.session_manager.reader as session:
+            wallets = await self.wallet_repository.get_many(wallet_oids=wallet_oids, session=session)
+
+        return wallets
+
     async def create_wallet(self, wallet: WalletEntity) -> WalletEntity:
         async with self.session_manager as session:
             wallet = await self.wallet_repository.add(wallet=wallet, session=session)
 
         return wallet
+
+    async def create_wallets(self, count: int) -> list[WalletEntity]:
+        async with self.session_manager as session:
+            wallets = await self.wallet_repository.add_many(
+                wallets=[WalletEntity() for _ in range(count)],
+                session=session,
+            )
+
+        return wallets
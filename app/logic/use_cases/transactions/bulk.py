@@ -0,0 +1,54 @@
+from dataclasses import dataclass
+from typing import Protocol
+
+from domain.entities.wallets import Transaction as TransactionEntity
+from domain.exceptions import ApplicationException
+from logic.exceptions.transactions import BulkOperationRolledBackException
+from logic.use_cases.base import BaseUseCase
+
+
+class BaseTransactionService(Protocol):
+    async def create_transactions_bulk(
+        self,
+        transactions: list[TransactionEntity],
+        atomic: bool = False,
+    ) -> list[TransactionEntity | ApplicationException]:
+        pass
+
+
+class BaseTransactionValidatorService(Protocol):
+    def validate(self, transaction: TransactionEntity):
+        pass
+
+
+@dataclass
+class CreateTransactionsBulkUseCase(BaseUseCase):
+    transaction_service: BaseTransactionService
+    validator_service: BaseTransactionValidatorService
+
+    async def execute(
+        self,
+        transactions: list[TransactionEntity],
+        atomic: bool = False,
+    ) -> list[TransactionEntity | ApplicationException]:
+        results: list[TransactionEntity | ApplicationException | None] = [None] * len(transactions)
+        valid_indices = []
+        for index, transaction in enumerate(transactions):
+            try:
+                self.validator_service.validate(transaction=transaction)
+            except ApplicationException as exception:
+                results[index] = exception
+            else:
+                valid_indices.append(index)
+
+        if atomic and len(valid_indices) < len(transactions):
+            return [BulkOperationRolledBackException() if result is None else result for result in results]
+
+        completed_transactions = await self.transaction_service.create_transactions_bulk(
+            transactions=[transactions[index] for index in valid_indices],
+            atomic=atomic,
+        )
+        for index, result in zip(valid_indices, completed_transactions, strict=True):
+            results[index] = result
+
+        return results
@@ -11,7 +11,11 @@ from logic.use_cases.base import BaseUseCase
 
 
 class BaseTransactionService(Protocol):
-    async def create_transaction(self, transaction: TransactionEntity) -> TransactionEntity:
+    async def create_transaction(
+        self,
+        transaction: TransactionEntity,
+        idempotency_key: str | None = None,
+    ) -> TransactionEntity:
         pass
 
 
@@ -25,9 +29,12 @@ class CreateTransactionUseCase(BaseUseCase):
     transaction_service: BaseTransactionService
     validator_service: BaseTransactionValidatorService
 
-    async def execute(self, transaction: TransactionEntity) -> TransactionEntity:
+    async def execute(self, transaction: TransactionEntity, idempotency_key: str | None = None) -> TransactionEntity:
         self.validator_service.validate(transaction=transaction)
 
-        complited_transaction = await self.transaction_service.create_transaction(transaction=transaction)
+        complited_transaction = await self.transaction_service.create_transaction(
+            transaction=transaction,
+            idempotency_key=idempotency_key,
+        )
 
         return complited_transaction
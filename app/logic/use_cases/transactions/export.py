@@ -0,0 +1,46 @@
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Protocol
+
+from domain.entities.wallets import (
+    Transaction as TransactionEntity,
+    Wallet as WalletEntity,
+)
+from logic.use_cases.base import BaseUseCase
+
+
+class BaseTransactionService(Protocol):
+    def stream_transactions(
+        self,
+        wallet_oid: str,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+    ) -> AsyncIterator[list[TransactionEntity]]:
+        pass
+
+
+class BaseWalletService(Protocol):
+    async def get_wallet(self, wallet_oid: str) -> WalletEntity:
+        pass
+
+
+@dataclass
+class ExportTransactionsUseCase(BaseUseCase):
+    transaction_service: BaseTransactionService
+    wallet_service: BaseWalletService
+
+    async def execute(
+        self,
+        wallet_oid: str,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+    ) -> AsyncIterator[list[TransactionEntity]]:
+        # fail before the response starts streaming, while an error status can still be sent
+        await self.wallet_service.get_wallet(wallet_oid=wallet_oid)
+
+        return self.transaction_service.stream_transactions(
+            wallet_oid=wallet_oid,
+            created_from=created_from,
+            created_to=created_to,
+        )
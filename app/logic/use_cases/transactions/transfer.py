@@ -0,0 +1,22 @@
+from dataclasses import dataclass
+from typing import Protocol
+
+from domain.entities.wallets import Transfer as TransferEntity
+from domain.exceptions import TransactionAmountNegativeValueException
+from logic.use_cases.base import BaseUseCase
+
+
+class BaseTransactionService(Protocol):
+    async def create_transfer(self, transfer: TransferEntity) -> TransferEntity:
+        pass
+
+
+@dataclass
+class CreateTransferUseCase(BaseUseCase):
+    transaction_service: BaseTransactionService
+
+    async def execute(self, transfer: TransferEntity) -> TransferEntity:
+        if transfer.amount <= 0:
+            raise TransactionAmountNegativeValueException()
+
+        return await self.transaction_service.create_transfer(transfer=transfer)
@@ -19,3 +19,17 @@ class CreateWalletUseCase(BaseUseCase):
         created_wallet = await self.wallet_service.create_wallet(wallet=wallet)
 
         return created_wallet
+
+
+class BaseWalletsBatchService(Protocol):
+    async def create_wallets(self, count: int) -> list[WalletEntity]:
+        pass
+
+@dataclass
+class CreateWalletsBatchUseCase(BaseUseCase):
+    wallet_service: BaseWalletsBatchService
+
+    async def execute(self, count: int) -> list[WalletEntity]:
+        created_wallets = await self.wallet_service.create_wallets(count=count)
+
+        return created_wallets
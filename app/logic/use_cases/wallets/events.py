@@ -0,0 +1,37 @@
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from typing import Protocol
+
+from domain.entities.wallets import (
+    Wallet as WalletEntity,
+    WalletEvent as WalletEventEntity,
+)
+from logic.use_cases.base import BaseUseCase
+
+
+class BaseWalletService(Protocol):
+    async def get_wallet(self, wallet_oid: str) -> WalletEntity:
+        pass
+
+
+class BaseWalletEventService(Protocol):
+    def subscribe(
+        self,
+        wallet_oid: str,
+        after: int | None = None,
+        heartbeat: float = 15.0,
+    ) -> AsyncIterator[WalletEventEntity | None]:
+        pass
+
+
+@dataclass
+class StreamWalletEventsUseCase(BaseUseCase):
+    wallet_service: BaseWalletService
+    event_service: BaseWalletEventService
+    heartbeat: float = 15.0
+
+    async def execute(self, wallet_oid: str, after: int | None = None) -> AsyncIterator[WalletEventEntity | None]:
+        # fail before the response starts streaming, while an error status can still be sent
+        await self.wallet_service.get_wallet(wallet_oid=wallet_oid)
+
+        return self.event_service.subscribe(wallet_oid=wallet_oid, after=after, heartbeat=self.heartbeat)
@@ -19,3 +19,17 @@ class GetWalletUseCase(BaseUseCase):
         wallet = await self.wallet_service.get_wallet(wallet_oid=wallet_oid)
 
         return wallet
+
+
+class BaseWalletsLookupService(Protocol):
+    async def get_wallets(self, wallet_oids: list[str]) -> list[WalletEntity | None]:
+        pass
+
+@dataclass
+class LookupWalletsUseCase(BaseUseCase):
+    wallet_service: BaseWalletsLookupService
+
+    async def execute(self, wallet_oids: list[str]) -> list[WalletEntity | None]:
+        wallets = await self.wallet_service.get_wallets(wallet_oids=wallet_oids)
+
+        return wallets
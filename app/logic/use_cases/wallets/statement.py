@@ -0,0 +1,51 @@
+from dataclasses import dataclass
+from datetime import date
+from typing import Protocol
+
+from domain.entities.wallets import Wallet as WalletEntity
+from domain.values.statements import (
+    Granularity,
+    PeriodTotals,
+)
+from logic.exceptions.wallets import InvalidStatementRangeException
+from logic.use_cases.base import BaseUseCase
+
+
+class BaseWalletService(Protocol):
+    async def get_wallet(self, wallet_oid: str) -> WalletEntity:
+        pass
+
+
+class BaseWalletStatementService(Protocol):
+    async def get_statement(
+        self,
+        wallet_oid: str,
+        day_from: date,
+        day_to: date,
+        granularity: Granularity = Granularity.DAY,
+    ) -> list[PeriodTotals]:
+        pass
+
+
+@dataclass
+class GetWalletStatementUseCase(BaseUseCase):
+    wallet_service: BaseWalletService
+    statement_service: BaseWalletStatementService
+
+    async def execute(
+        self,
+        wallet_oid: str,
+        day_from: date,
+        day_to: date,
+        granularity: Granularity = Granularity.DAY,
+    ) -> list[PeriodTotals]:
+        if day_to < day_from:
+            raise InvalidStatementRangeException()
+        await self.wallet_service.get_wallet(wallet_oid=wallet_oid)
+
+        return await self.statement_service.get_statement(
+            wallet_oid=wallet_oid,
+            day_from=day_from,
+            day_to=day_to,
+            granularity=granularity,
+        )
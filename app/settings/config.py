@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import (
     BaseSettings,
     SettingsConfigDict,
@@ -10,9 +12,93 @@ class Settings(BaseSettings):
     POSTGRES_HOST: str
     POSTGRES_PORT: str
     POSTGRES_DB: str
+    # overrides the Postgres URL, e.g. sqlite+aiosqlite:///wallets.db for local runs
+    DATABASE_URL: str | None = None
+    REPOSITORY_BACKEND: Literal["sqlalchemy", "memory"] = "sqlalchemy"
+
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = False
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_SERVER_SETTINGS: dict[str, str] = {}
+    # read-only replicas for the query endpoints; without any every read goes to the primary
+    DB_REPLICA_URLS: list[str] = []
+    DB_REPLICA_SELECTION: Literal["round_robin", "least_connections"] = "round_robin"
+    # a client that committed a write reads from the primary for this long, so replication lag hides nothing;
+    # on every worker if it sends back the X-Last-Write response header, otherwise only on the worker it wrote on
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0
+
+    # per-worker caps on requests running at once; requests beyond the queue, or waiting past the timeout,
+    # get 429 with Retry-After. Keep the write limit within the pool size plus overflow
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_WRITE_LIMIT: int = 10
+    ADMISSION_WRITE_QUEUE_SIZE: int = 100
+    ADMISSION_WRITE_TIMEOUT_SECONDS: float = 2.0
+    ADMISSION_READ_LIMIT: int = 50
+    ADMISSION_READ_QUEUE_SIZE: int = 500
+    ADMISSION_READ_TIMEOUT_SECONDS: float = 1.0
+    ADMISSION_RETRY_AFTER_SECONDS: float = 1.0
+
+    # sliding-window limits on writes per client and per wallet, kept in each worker; 0 disables a limit. Clients
+    # are told apart by address: behind a proxy, list it in uvicorn's --forwarded-allow-ips
+    RATE_LIMIT_ENABLED: bool = False
+    RATE_LIMIT_WINDOW_SECONDS: float = 1.0
+    RATE_LIMIT_CLIENT_REQUESTS: int = 1000
+    RATE_LIMIT_WALLET_REQUESTS: int = 100
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+
+    # how single withdrawals change a balance: "pessimistic" waits on the wallet's row lock, "optimistic" checks
+    # the wallet version and retries with jittered backoff, falling back to the lock after the last retry
+    WALLET_CONCURRENCY_MODE: Literal["pessimistic", "optimistic"] = "pessimistic"
+    WALLET_OPTIMISTIC_MAX_RETRIES: int = 5
+    WALLET_OPTIMISTIC_BACKOFF_SECONDS: float = 0.005
+
+    TRANSACTION_BATCHING_ENABLED: bool = False
+    TRANSACTION_BATCH_WINDOW_MS: float = 2.0
+    TRANSACTION_BATCH_MAX_SIZE: int = 100
+
+    # balance rows of new wallets; deposits to a wallet with several rows are spread over them
+    WALLET_BALANCE_SHARDS: int = 1
+
+    # read-through cache of wallets in each worker; a write only invalidates the cache of the worker that made it,
+    # so other workers may serve the previous balance for up to the TTL
+    WALLET_CACHE_ENABLED: bool = False
+    WALLET_CACHE_MAX_SIZE: int = 10_000
+    WALLET_CACHE_TTL_SECONDS: float = 5.0
+
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = 86_400
+    IDEMPOTENCY_CACHE_MAX_SIZE: int = 10_000
+
+    LEDGER_SNAPSHOT_EVERY: int = 10_000
+    LEDGER_STREAM_BATCH_SIZE: int = 5_000
+
+    # outbox of balance changes, streamed at /v1/wallets/{uuid}/events; adds an insert to every operation and a
+    # dispatcher polling the outbox in every worker
+    WALLET_EVENTS_ENABLED: bool = False
+    WALLET_EVENTS_BATCH_SIZE: int = 1000
+    WALLET_EVENTS_POLL_INTERVAL_SECONDS: float = 0.2
+    # the dispatcher skips a missing offset once Postgres shows its transaction finished without committing it,
+    # and otherwise after this long, e.g. while an unrelated long transaction keeps the check from concluding
+    WALLET_EVENTS_GAP_TIMEOUT_SECONDS: float = 10.0
+    WALLET_EVENTS_HEARTBEAT_SECONDS: float = 15.0
+    WALLET_EVENTS_QUEUE_SIZE: int = 1000
+    WALLET_EVENTS_RETENTION_SECONDS: int = 7 * 86_400
+
+    # per-day totals behind /v1/wallets/{uuid}/statement; adds an upsert to every operation
+    WALLET_DAILY_TOTALS_ENABLED: bool = False
+
+    # monthly partitions of the transactions table on Postgres
+    TRANSACTION_PARTITIONS_AHEAD: int = 3
+    # partitions older than this many months are detached by the maintenance job; None keeps all of them
+    TRANSACTION_PARTITION_RETENTION_MONTHS: int | None = None
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
     @property
     def db_url(self) -> str:
+        if self.DATABASE_URL:
+            return self.DATABASE_URL
         return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
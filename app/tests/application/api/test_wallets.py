@@ -1,3 +1,7 @@
+import json
+from datetime import date
+from decimal import Decimal
+
 from fastapi import (
     FastAPI,
     status,
@@ -7,6 +11,12 @@ from fastapi.testclient import TestClient
 import pytest
 from httpx import Response
 
+from application.api.wallets.v1.schemas import GetTransactionsQueryResponseSchema
+from logic.initial_container import init_container
+from logic.services.admission import AdmissionService
+from logic.services.rate_limits import RateLimiter
+from tests.fixtures import init_dummy_container
+
 
 @pytest.fixture(scope="session")
 def wallet(app: FastAPI, client: TestClient) -> dict:
@@ -37,3 +47,183 @@ class TestWalletAndTransaction:
         data = response.json()
         assert isinstance(data.get("items"), list)
         assert len(data["items"]) == 1
+
+    def test_get_wallet_transactions_by_cursor(self, app: FastAPI, client: TestClient, wallet: dict):
+        url = app.url_path_for("get_transactions_handler", wallet_uuid=wallet["uuid"])
+        first_page = client.get(url=url, params={"limit": 1}).json()
+        assert first_page["next_cursor"] is not None
+
+        response: Response = client.get(url=url, params={"limit": 1, "cursor": first_page["next_cursor"]})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["items"] == []
+
+    def test_create_transactions_bulk(self, app: FastAPI, client: TestClient, wallet: dict):
+        url = app.url_path_for("create_transactions_bulk_handler")
+        operations = [
+            {"wallet_uuid": wallet["uuid"], "operationType": "DEPOSIT", "amount": 10},
+            {"wallet_uuid": wallet["uuid"], "operationType": "WITHDRAW", "amount": 10**6},
+        ]
+        response: Response = client.post(url=url, json={"operations": operations})
+        assert response.status_code == status.HTTP_200_OK
+        assert [item["status"] for item in response.json()["items"]] == ["accepted", "rejected"]
+
+    @pytest.mark.parametrize(("export_format", "header_lines"), [("ndjson", 0), ("csv", 1)])
+    def test_export_wallet_transactions(
+        self,
+        app: FastAPI,
+        client: TestClient,
+        wallet: dict,
+        export_format: str,
+        header_lines: int,
+    ):
+        url = app.url_path_for("export_transactions_handler", wallet_uuid=wallet["uuid"])
+        listed = client.get(url=app.url_path_for("get_transactions_handler", wallet_uuid=wallet["uuid"])).json()
+
+        response: Response = client.get(url=url, params={"format": export_format})
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.text.splitlines()) == listed["count"] + header_lines
+
+    def test_create_transaction_idempotency_key(self, app: FastAPI, client: TestClient, wallet: dict):
+        url = app.url_path_for("create_transaction_handler", wallet_uuid=wallet["uuid"])
+        headers = {"Idempotency-Key": "retried-deposit"}
+
+        first: Response = client.post(url=url, json={"operationType": "DEPOSIT", "amount": 5}, headers=headers)
+        retry: Response = client.post(url=url, json={"operationType": "DEPOSIT", "amount": 5}, headers=headers)
+        reused: Response = client.post(url=url, json={"operationType": "WITHDRAW", "amount": 5}, headers=headers)
+
+        assert first.status_code == retry.status_code == status.HTTP_201_CREATED
+        assert retry.json()["created_at"] == first.json()["created_at"]
+        assert Decimal(retry.json()["amount"]) == Decimal(first.json()["amount"])
+        assert reused.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_create_transfer(self, app: FastAPI, client: TestClient, wallet: dict):
+        recipient = client.post(url=app.url_path_for("create_wallet_handler"), json={}).json()
+        url = app.url_path_for("create_transfer_handler")
+        transfer = {"from_wallet_uuid": wallet["uuid"], "to_wallet_uuid": recipient["uuid"], "amount": 5}
+
+        response: Response = client.post(url=url, json=transfer)
+        rejected: Response = client.post(url=url, json={**transfer, "amount": 10**6})
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert rejected.status_code == status.HTTP_400_BAD_REQUEST
+        recipient = client.get(url=app.url_path_for("get_wallet_handler", wallet_uuid=recipient["uuid"])).json()
+        assert Decimal(recipient["balance"]) == Decimal(5)
+        url = app.url_path_for("get_transactions_handler", wallet_uuid=recipient["uuid"])
+        items = client.get(url=url).json()["items"]
+        assert [(item["operationType"], Decimal(item["amount"])) for item in items] == [("TRANSFER", Decimal(5))]
+
+    def test_create_and_lookup_wallets(self, app: FastAPI, client: TestClient, wallet: dict):
+        response: Response = client.post(url=app.url_path_for("create_wallets_batch_handler"), params={"count": 3})
+        too_many: Response = client.post(url=app.url_path_for("create_wallets_batch_handler"), params={"count": 10**4})
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert too_many.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        uuids = [item["uuid"] for item in response.json()["items"]] + ["unknown", wallet["uuid"]]
+        lookup: Response = client.post(url=app.url_path_for("lookup_wallets_handler"), json={"uuids": uuids})
+        assert lookup.status_code == status.HTTP_200_OK
+        items = lookup.json()["items"]
+        assert [item and item["uuid"] for item in items] == [*uuids[:3], None, wallet["uuid"]]
+
+    def test_get_wallet_statement(
+        self,
+        app: FastAPI,
+        client: TestClient,
+        wallet: dict,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        url = app.url_path_for("get_wallet_statement_handler", wallet_uuid=wallet["uuid"])
+        today = date.today().isoformat()
+        disabled: Response = client.get(url=url, params={"from": today, "to": today})
+        monkeypatch.setenv("WALLET_DAILY_TOTALS_ENABLED", "true")
+        container = init_dummy_container()
+
+        app.dependency_overrides[init_container] = lambda: container
+        try:
+            client.post(
+                url=app.url_path_for("create_transaction_handler", wallet_uuid=wallet["uuid"]),
+                json={"operationType": "DEPOSIT", "amount": 100},
+            )
+            response: Response = client.get(url=url, params={"from": today, "to": today, "granularity": "month"})
+            reversed_range: Response = client.get(url=url, params={"from": today, "to": "2000-01-01"})
+        finally:
+            app.dependency_overrides[init_container] = init_dummy_container
+
+        assert disabled.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.status_code == status.HTTP_200_OK
+        (month,) = response.json()["items"]
+        assert month["period"] == date.today().replace(day=1).isoformat()
+        assert Decimal(month["deposits"]) >= Decimal(100)
+        assert reversed_range.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_overloaded_writes_are_rejected(self, app: FastAPI, client: TestClient, wallet: dict):
+        container = init_dummy_container()
+        admission: AdmissionService = container.resolve(AdmissionService)
+        admission.write.limit = admission.write.queue_size = 0
+        url = app.url_path_for("create_transaction_handler", wallet_uuid=wallet["uuid"])
+
+        app.dependency_overrides[init_container] = lambda: container
+        try:
+            rejected: Response = client.post(url=url, json={"operationType": "DEPOSIT", "amount": 1})
+            read: Response = client.get(url=app.url_path_for("get_wallet_handler", wallet_uuid=wallet["uuid"]))
+        finally:
+            app.dependency_overrides[init_container] = init_dummy_container
+
+        assert rejected.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert rejected.headers["Retry-After"] == "1"
+        assert read.status_code == status.HTTP_200_OK
+
+    def test_wallet_rate_limit(self, app: FastAPI, client: TestClient, wallet: dict):
+        container = init_dummy_container()
+        rate_limiter: RateLimiter = container.resolve(RateLimiter)
+        rate_limiter.enabled, rate_limiter.wallet_limit = True, 1
+        url = app.url_path_for("create_transaction_handler", wallet_uuid=wallet["uuid"])
+
+        app.dependency_overrides[init_container] = lambda: container
+        try:
+            responses = [client.post(url=url, json={"operationType": "DEPOSIT", "amount": 1}) for _ in range(2)]
+        finally:
+            app.dependency_overrides[init_container] = init_dummy_container
+
+        assert [response.status_code for response in responses] == [
+            status.HTTP_201_CREATED,
+            status.HTTP_429_TOO_MANY_REQUESTS,
+        ]
+        assert int(responses[-1].headers["Retry-After"]) >= 1
+
+    def test_client_rate_limit_ignores_client_id_header(self, app: FastAPI, client: TestClient, wallet: dict):
+        container = init_dummy_container()
+        rate_limiter: RateLimiter = container.resolve(RateLimiter)
+        rate_limiter.enabled, rate_limiter.wallet_limit, rate_limiter.client_limit = True, 0, 1
+        url = app.url_path_for("create_transaction_handler", wallet_uuid=wallet["uuid"])
+
+        app.dependency_overrides[init_container] = lambda: container
+        try:
+            responses = [
+                client.post(url=url, json={"operationType": "DEPOSIT", "amount": 1}, headers={"X-Client-Id": client_id})
+                for client_id in ("first", "second")
+            ]
+        finally:
+            app.dependency_overrides[init_container] = init_dummy_container
+
+        assert [response.status_code for response in responses] == [
+            status.HTTP_201_CREATED,
+            status.HTTP_429_TOO_MANY_REQUESTS,
+        ]
+
+    def test_listing_matches_response_schema(self, app: FastAPI, client: TestClient, wallet: dict):
+        url = app.url_path_for("get_transactions_handler", wallet_uuid=wallet["uuid"])
+        response: Response = client.get(url=url, params={"limit": 5})
+
+        assert response.headers["content-type"] == "application/json"
+        schema = GetTransactionsQueryResponseSchema.model_validate_json(response.content)
+        assert json.loads(schema.model_dump_json()) == response.json()
+
+    def test_metrics(self, app: FastAPI, client: TestClient, wallet: dict):
+        client.get(url=app.url_path_for("get_wallet_handler", wallet_uuid="missing"))
+
+        response: Response = client.get(url=app.url_path_for("get_metrics_handler"))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert 'handler="get_wallet_handler",status="400"' in response.text
+        assert 'application_exceptions_total{exception="WalletNotFoundException"}' in response.text
@@ -0,0 +1,118 @@
+import asyncio
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.ext.asyncio import (
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from domain.entities.wallets import (
+    OperationType,
+    Transaction as TransactionEntity,
+    Wallet as WalletEntity,
+    WalletEvent as WalletEventEntity,
+)
+from domain.values.cursors import TransactionCursor
+from infra.database.manager import SessionManager
+from infra.repositories.events.memo_event_repository import MemoryWalletEventRepository
+from infra.repositories.transactions.memo_transaction_repository import MemoryTransactionRepository
+from infra.repositories.wallets.memo_wallet_repository import MemoryWalletRepository
+
+
+@pytest.fixture
+def session_manager() -> SessionManager:
+    # sessions are only used for their hooks, so the engine never connects
+    return SessionManager(async_sessionmaker(create_async_engine("sqlite+aiosqlite:///:memory:")))
+
+
+@pytest.mark.asyncio
+async def test_transactions_page_by_cursor():
+    repository = MemoryTransactionRepository()
+    for amount in range(5):
+        await repository.add(
+            TransactionEntity(operation_type=OperationType.DEPOSIT, amount=Decimal(amount), wallet_oid="wallet"),
+        )
+
+    first_page = await repository.get_all(wallet_oid="wallet", limit=2)
+    next_page = await repository.get_all(
+        wallet_oid="wallet",
+        limit=2,
+        cursor=TransactionCursor.from_transaction(first_page[-1]),
+    )
+    streamed = [batch async for batch in repository.stream(wallet_oid="wallet", batch_size=2)]
+
+    assert [transaction.amount for transaction in first_page + next_page] == [0, 1, 2, 3]
+    assert [len(batch) for batch in streamed] == [2, 2, 1]
+    assert await repository.get_all(wallet_oid="unknown") == []
+
+
+@pytest.mark.asyncio
+async def test_wallet_lock_is_held_until_session_closes(session_manager: SessionManager):
+    repository = MemoryWalletRepository()
+    wallet = await repository.add(WalletEntity())
+    order = []
+
+    async def write(name: str, delay: float):
+        async with session_manager as session:
+            await repository.update_balance(wallet_oid=wallet.oid, amount=Decimal(1), session=session)
+            order.append(f"{name} locked")
+            await asyncio.sleep(delay)
+            order.append(f"{name} done")
+
+    await asyncio.gather(write("first", 0.01), write("second", 0))
+
+    assert order == ["first locked", "first done", "second locked", "second done"]
+    assert (await repository.get_by_oid(wallet.oid)).balance == Decimal(2)
+
+
+@pytest.mark.asyncio
+async def test_writes_are_undone_on_rollback(session_manager: SessionManager):
+    wallets = MemoryWalletRepository()
+    transactions = MemoryTransactionRepository()
+    wallet = await wallets.add(WalletEntity(balance=Decimal(10)))
+
+    async def withdraw_and_fail():
+        async with session_manager as session:
+            await wallets.withdraw(wallet_oid=wallet.oid, amount=Decimal(10), session=session)
+            await transactions.add(
+                TransactionEntity(operation_type=OperationType.WITHDRAW, amount=Decimal(10), wallet_oid=wallet.oid),
+                session=session,
+            )
+            raise RuntimeError()
+
+    with pytest.raises(RuntimeError):
+        await withdraw_and_fail()
+
+    assert (await wallets.get_by_oid(wallet.oid)).balance == Decimal(10)
+    assert await transactions.get_all(wallet_oid=wallet.oid) == []
+    assert await wallets.get_wallets_with_lock([wallet.oid]) == [wallet]
+
+
+@pytest.mark.asyncio
+async def test_wallet_events_skip_rolled_back_offsets(session_manager: SessionManager):
+    repository = MemoryWalletEventRepository()
+
+    def event(wallet_oid: str) -> WalletEventEntity:
+        return WalletEventEntity(
+            wallet_oid=wallet_oid,
+            transaction_oid="transaction",
+            operation_type=OperationType.DEPOSIT,
+            amount=Decimal(1),
+        )
+
+    async def add_rolled_back(wallet_oid: str):
+        async with session_manager as session:
+            await repository.add_many([event(wallet_oid)], session=session)
+            raise RuntimeError()
+
+    await repository.add_many([event("a"), event("b")])
+    with pytest.raises(RuntimeError):
+        await add_rolled_back("a")
+    await repository.add_many([event("a"), event("a")])
+
+    dispatched = await repository.get_after(after=0)
+    replayed = await repository.get_after(after=0, wallet_oid="a", up_to=4)
+    assert [e.offset for e in dispatched] == [1, 2, 4, 5]
+    assert [e.offset for e in replayed] == [1, 4]
+    assert await repository.get_last_offset() == 5
@@ -0,0 +1,54 @@
+import pytest
+
+from infra.metrics.registry import MetricsRegistry
+from infra.repositories.instrumentation import count_rows
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("query_seconds", "Query latency", ("method",), buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 2):
+        histogram.labels("get").observe(value)
+
+    assert registry.render().splitlines() == [
+        "# HELP query_seconds Query latency",
+        "# TYPE query_seconds histogram",
+        'query_seconds_bucket{method="get",le="0.1"} 2',
+        'query_seconds_bucket{method="get",le="1"} 3',
+        'query_seconds_bucket{method="get",le="+Inf"} 4',
+        'query_seconds_sum{method="get"} 2.65',
+        'query_seconds_count{method="get"} 4',
+    ]
+
+
+def test_counter_escapes_label_values():
+    registry = MetricsRegistry()
+    counter = registry.counter("errors", "Errors", ("exception",))
+    counter.labels('Bad "quoted"\nname').inc()
+    counter.labels('Bad "quoted"\nname').inc(2)
+
+    assert registry.render().splitlines()[-1] == 'errors_total{exception="Bad \\"quoted\\"\\nname"} 3'
+
+
+def test_gauge_renders_current_value():
+    registry = MetricsRegistry()
+    gauge = registry.gauge("queue_depth", "Queue depth", ("kind",))
+    gauge.labels("write").inc(3)
+    gauge.labels("write").dec()
+
+    assert registry.render().splitlines()[-1] == 'queue_depth{kind="write"} 2'
+
+
+def test_registry_rejects_duplicates_and_wrong_labels():
+    registry = MetricsRegistry()
+    counter = registry.counter("errors", "Errors", ("exception",))
+
+    with pytest.raises(ValueError, match="already registered"):
+        registry.counter("errors", "Errors")
+    with pytest.raises(ValueError, match="expects labels"):
+        counter.labels("a", "b")
+
+
+@pytest.mark.parametrize(("result", "rows"), [(None, 0), ([1, 2], 2), (7, 7), (True, 1), ("wallet", 1)])
+def test_count_rows(result: object, rows: int):
+    assert count_rows(result) == rows
@@ -0,0 +1,36 @@
+import pytest
+
+from infra.rate_limits.store import (
+    MemoryRateLimitStore,
+    SlidingWindow,
+)
+
+
+def test_sliding_window_weights_the_previous_window():
+    window = SlidingWindow(window=1.0, started=0.0)
+    window.count = 4
+
+    assert window.retry_after(0.5, limit=4) == pytest.approx(0.75)
+
+    window.advance(1.5)
+    assert (window.started, window.count, window.previous) == (1.0, 0, 4)
+    # half of the previous window still overlaps, so 2 of its 4 requests count
+    assert window.retry_after(1.5, limit=3) == 0
+    assert window.retry_after(1.5, limit=2) == pytest.approx(0.25)
+
+    window.advance(3.5)
+    assert (window.count, window.previous) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_memory_store_counts_only_accepted_hits_and_evicts_keys():
+    store = MemoryRateLimitStore(max_keys=2)
+
+    assert [await store.hit("wallet:a", limit=2, window=60) for _ in range(3)][:2] == [0, 0]
+    assert await store.hit("wallet:a", limit=2, window=60) > 0
+    assert await store.hit("wallet:b", limit=2, window=60) == 0
+
+    await store.hit("wallet:c", limit=2, window=60)
+    assert len(store) == 2
+    # the least recently used key was forgotten, so its count starts over
+    assert await store.hit("wallet:a", limit=1, window=60) == 0
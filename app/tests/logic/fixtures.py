@@ -1,16 +1,20 @@
 import pytest_asyncio
 from sqlalchemy.ext.asyncio import (
-    async_sessionmaker,
     AsyncSession,
     create_async_engine,
 )
 from sqlalchemy.orm import sessionmaker
 
 from domain.entities.wallets import Wallet as WalletEntity
+from infra.database.manager import SessionManager
 from infra.database.models import Base
+from infra.repositories.idempotency.sqlalchemy_idempotency_repository import SQLAlchemyIdempotencyKeyRepository
 from infra.repositories.transactions.sqlalchemy_transaction_repository import SQLAlchemyTransactionRepository
 from infra.repositories.wallets.sqlalchemy_wallet_repository import SQLAlchemyWalletRepository
-from logic.services.transactions import TransactionService
+from logic.services.transactions import (
+    BatchedTransactionService,
+    TransactionService,
+)
 from logic.services.wallets import (
     WalletManagementService,
     WalletService,
@@ -27,23 +31,6 @@ class DatabaseManager:
             await conn.run_sync(Base.metadata.create_all)
 
 
-class SessionManager:
-    def __init__(self, session_factory: async_sessionmaker):
-        self.session_factory = session_factory
-
-    async def __aenter__(self):
-        self.session: AsyncSession = self.session_factory()
-        return self.session
-
-    async def __aexit__(self, exc_type, exc_value, traceback):
-        if exc_type:
-            await self.session.rollback()
-            raise
-        else:
-            await self.session.commit()
-        await self.session.close()
-
-
 @pytest_asyncio.fixture(scope="session")
 async def database_manager():
     database_url = "sqlite+aiosqlite:///:memory:"
@@ -71,6 +58,21 @@ async def transaction_service(
         session_manager=SessionManager(database_manager.SessionLocal),
         transaction_repository=SQLAlchemyTransactionRepository(),
         wallet_manager_service=wallet_manager_service,
+        idempotency_key_repository=SQLAlchemyIdempotencyKeyRepository(),
+    )
+
+
+@pytest_asyncio.fixture(scope="session")
+async def batched_transaction_service(
+    database_manager: DatabaseManager,
+    wallet_manager_service: WalletManagementService,
+) -> BatchedTransactionService:
+    return BatchedTransactionService(
+        session_manager=SessionManager(database_manager.SessionLocal),
+        transaction_repository=SQLAlchemyTransactionRepository(),
+        wallet_manager_service=wallet_manager_service,
+        idempotency_key_repository=SQLAlchemyIdempotencyKeyRepository(),
+        batch_window=0.01,
     )
 
 
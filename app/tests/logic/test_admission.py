@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from logic.exceptions.admission import OverloadedException
+from logic.services.admission import AdmissionController
+
+
+@pytest.mark.asyncio
+async def test_admission_queues_up_to_its_size_and_rejects_the_rest():
+    controller = AdmissionController(kind="test", limit=1, queue_size=1, timeout=5.0)
+    released = asyncio.Event()
+
+    async def hold():
+        async with controller.admit():
+            await released.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    assert (controller.in_flight, controller.queued) == (1, 1)
+
+    with pytest.raises(OverloadedException):
+        async with controller.admit():
+            pass
+
+    # the finished request hands its slot to the waiter
+    released.set()
+    await asyncio.gather(holder, waiter)
+    assert (controller.in_flight, controller.queued) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_admission_wait_times_out():
+    controller = AdmissionController(kind="test", limit=1, queue_size=10, timeout=0.01)
+
+    async with controller.admit():
+        with pytest.raises(OverloadedException) as exception:
+            async with controller.admit():
+                pass
+        assert controller.queued == 0
+
+    assert exception.value.retry_after == controller.retry_after
+    assert controller.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_queue():
+    controller = AdmissionController(kind="test", limit=1, queue_size=10, timeout=5.0)
+
+    async def wait_for_slot():
+        async with controller.admit():
+            pass
+
+    async with controller.admit():
+        waiter = asyncio.create_task(wait_for_slot())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert controller.queued == 0
+
+    assert controller.in_flight == 0
@@ -0,0 +1,188 @@
+from dataclasses import dataclass
+from decimal import Decimal
+
+import pytest
+
+from domain.entities.wallets import (
+    OperationType,
+    Transaction as TransactionEntity,
+    Wallet as WalletEntity,
+    WalletEvent as WalletEventEntity,
+)
+from infra.database.manager import SessionManager
+from infra.events.broker import WalletEventBroker
+from infra.repositories.events.memo_event_repository import MemoryWalletEventRepository
+from infra.repositories.events.sqlalchemy_event_repository import SQLAlchemyWalletEventRepository
+from infra.repositories.idempotency.sqlalchemy_idempotency_repository import SQLAlchemyIdempotencyKeyRepository
+from infra.repositories.transactions.sqlalchemy_transaction_repository import SQLAlchemyTransactionRepository
+from logic.exceptions.wallets import NotEnoughFundsException
+from logic.services.events import WalletEventService
+from logic.services.transactions import TransactionService
+from logic.services.wallets import (
+    WalletManagementService,
+    WalletService,
+)
+
+
+@dataclass
+class HorizonWalletEventRepository(MemoryWalletEventRepository):
+    horizon: tuple[int, int] | None = None
+
+    async def get_transaction_horizon(self, *args, **kwargs) -> tuple[int, int] | None:
+        return self.horizon
+
+
+def deposit_event(amount: int) -> WalletEventEntity:
+    return WalletEventEntity(
+        wallet_oid="wallet",
+        transaction_oid="transaction",
+        operation_type=OperationType.DEPOSIT,
+        amount=Decimal(amount),
+    )
+
+
+async def add_rolled_back(session_manager: SessionManager, event_repository: MemoryWalletEventRepository):
+    async with session_manager as session:
+        await event_repository.add_many([deposit_event(0)], session=session)
+        raise RuntimeError()
+
+
+@pytest.mark.asyncio
+async def test_balance_changes_are_streamed_from_the_outbox(
+    database_manager,
+    wallet_manager_service: WalletManagementService,
+    wallet_service: WalletService,
+):
+    session_manager = SessionManager(database_manager.SessionLocal)
+    event_repository = SQLAlchemyWalletEventRepository()
+    transaction_service = TransactionService(
+        session_manager=session_manager,
+        transaction_repository=SQLAlchemyTransactionRepository(),
+        wallet_manager_service=wallet_manager_service,
+        idempotency_key_repository=SQLAlchemyIdempotencyKeyRepository(),
+        event_repository=event_repository,
+    )
+    event_service = WalletEventService(
+        session_manager=session_manager,
+        event_repository=event_repository,
+        broker=WalletEventBroker(),
+        batch_size=1,
+    )
+    wallet = await wallet_service.create_wallet(wallet=WalletEntity())
+    await event_service.dispatch()
+    start = event_service.position
+
+    deposit = await transaction_service.create_transaction(
+        TransactionEntity(operation_type=OperationType.DEPOSIT, amount=Decimal(10), wallet_oid=wallet.oid),
+    )
+    with pytest.raises(NotEnoughFundsException):
+        await transaction_service.create_transaction(
+            TransactionEntity(operation_type=OperationType.WITHDRAW, amount=Decimal(50), wallet_oid=wallet.oid),
+        )
+    await transaction_service.create_transactions_bulk(
+        [TransactionEntity(operation_type=OperationType.WITHDRAW, amount=Decimal(4), wallet_oid=wallet.oid)],
+    )
+    assert await event_service.dispatch() == 2
+
+    # a subscriber resuming from before the changes replays them from the outbox, then follows the broker
+    stream = event_service.subscribe(wallet_oid=wallet.oid, after=start, heartbeat=5.0)
+    replayed = [await stream.__anext__(), await stream.__anext__()]
+    assert replayed[0].transaction_oid == deposit.oid
+    assert [(event.operation_type, event.amount) for event in replayed] == [
+        (OperationType.DEPOSIT, Decimal(10)),
+        (OperationType.WITHDRAW, Decimal(4)),
+    ]
+
+    await transaction_service.create_transaction(
+        TransactionEntity(operation_type=OperationType.DEPOSIT, amount=Decimal(1), wallet_oid=wallet.oid),
+    )
+    await event_service.dispatch()
+    event = await stream.__anext__()
+    assert (event.offset, event.amount) == (replayed[-1].offset + 1, Decimal(1))
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_waits_for_missing_offsets(database_manager):
+    session_manager = SessionManager(database_manager.SessionLocal)
+    event_repository = MemoryWalletEventRepository()
+    event_service = WalletEventService(
+        session_manager=session_manager,
+        event_repository=event_repository,
+        broker=WalletEventBroker(),
+        gap_timeout=60,
+    )
+    await event_service.dispatch()
+
+    await event_repository.add_many([deposit_event(1)])
+    with pytest.raises(RuntimeError):
+        await add_rolled_back(session_manager, event_repository)
+    await event_repository.add_many([deposit_event(3)])
+
+    # the rolled back offset might still commit, so the dispatcher stops there until it times out
+    assert await event_service.dispatch() == 1
+    assert event_service.position == 1
+    assert await event_service.dispatch() == 0
+
+    event_service.gap_timeout = 0
+    assert await event_service.dispatch() == 1
+    assert event_service.position == 3
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_skips_offsets_of_finished_transactions(database_manager):
+    session_manager = SessionManager(database_manager.SessionLocal)
+    event_repository = HorizonWalletEventRepository(horizon=(5, 8))
+    event_service = WalletEventService(
+        session_manager=session_manager,
+        event_repository=event_repository,
+        broker=WalletEventBroker(),
+        gap_timeout=60,
+    )
+    await event_service.dispatch()
+
+    await event_repository.add_many([deposit_event(1)])
+    with pytest.raises(RuntimeError):
+        await add_rolled_back(session_manager, event_repository)
+    await event_repository.add_many([deposit_event(3)])
+
+    # transaction 5 may hold the missing offset
+    assert await event_service.dispatch() == 1
+    assert await event_service.dispatch() == 0
+
+    # every transaction started before 8 has finished, but possibly after the events were read
+    event_repository.horizon = (8, 9)
+    assert await event_service.dispatch() == 0
+    assert await event_service.dispatch() == 1
+    assert event_service.position == 3
+
+
+@pytest.mark.asyncio
+async def test_rejected_atomic_bulk_takes_no_offsets(
+    database_manager,
+    wallet_manager_service: WalletManagementService,
+    wallet_service: WalletService,
+):
+    event_repository = MemoryWalletEventRepository()
+    transaction_service = TransactionService(
+        session_manager=SessionManager(database_manager.SessionLocal),
+        transaction_repository=SQLAlchemyTransactionRepository(),
+        wallet_manager_service=wallet_manager_service,
+        idempotency_key_repository=SQLAlchemyIdempotencyKeyRepository(),
+        event_repository=event_repository,
+    )
+    wallet = await wallet_service.create_wallet(wallet=WalletEntity())
+
+    await transaction_service.create_transactions_bulk(
+        [
+            TransactionEntity(operation_type=OperationType.DEPOSIT, amount=Decimal(10), wallet_oid=wallet.oid),
+            TransactionEntity(operation_type=OperationType.WITHDRAW, amount=Decimal(50), wallet_oid=wallet.oid),
+        ],
+        atomic=True,
+    )
+    await transaction_service.create_transaction(
+        TransactionEntity(operation_type=OperationType.DEPOSIT, amount=Decimal(1), wallet_oid=wallet.oid),
+    )
+
+    # the dispatcher finds no gap to wait for
+    assert [event.offset for event in event_repository.events] == [1]
@@ -0,0 +1,74 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import update
+
+from domain.entities.wallets import (
+    OperationType,
+    Transaction as TransactionEntity,
+    Wallet as WalletEntity,
+)
+from infra.database.manager import SessionManager
+from infra.database.models import WalletModel
+from infra.repositories.snapshots.sqlalchemy_snapshot_repository import SQLAlchemyWalletSnapshotRepository
+from infra.repositories.transactions.sqlalchemy_transaction_repository import SQLAlchemyTransactionRepository
+from infra.repositories.wallets.sqlalchemy_wallet_repository import SQLAlchemyWalletRepository
+from logic.services.ledger import (
+    LedgerService,
+    ReconciliationReport,
+)
+from logic.services.transactions import TransactionService
+from logic.services.wallets import WalletService
+
+
+@pytest.fixture
+def ledger_service(database_manager) -> LedgerService:
+    return LedgerService(
+        session_manager=SessionManager(database_manager.SessionLocal),
+        wallet_repository=SQLAlchemyWalletRepository(),
+        transaction_repository=SQLAlchemyTransactionRepository(),
+        snapshot_repository=SQLAlchemyWalletSnapshotRepository(),
+        snapshot_every=2,
+        stream_batch_size=2,
+        snapshot_lag=timedelta(0),
+    )
+
+
+@pytest.mark.asyncio
+async def test_reconcile_wallet_from_snapshots(
+    ledger_service: LedgerService,
+    transaction_service: TransactionService,
+    wallet_service: WalletService,
+):
+    wallet = await wallet_service.create_wallet(wallet=WalletEntity())
+    for operation_type, amount in [(OperationType.DEPOSIT, 100), (OperationType.WITHDRAW, 30), (OperationType.DEPOSIT, 5)]:
+        await transaction_service.create_transaction(
+            TransactionEntity(operation_type=operation_type, amount=Decimal(amount), wallet_oid=wallet.oid),
+        )
+
+    report = ReconciliationReport()
+    assert await ledger_service.reconcile_wallet(wallet_oid=wallet.oid, report=report) is None
+    assert (report.transactions_scanned, report.snapshots_written) == (3, 1)
+
+    snapshot = await ledger_service.snapshot_repository.get_latest(
+        wallet_oid=wallet.oid,
+        session=ledger_service.session_manager.session_factory(),
+    )
+    assert snapshot.balance == Decimal(70)
+
+    report = ReconciliationReport()
+    assert await ledger_service.reconcile_wallet(wallet_oid=wallet.oid, report=report) is None
+    assert report.transactions_scanned == 1
+
+
+@pytest.mark.asyncio
+async def test_reconcile_reports_drift(ledger_service: LedgerService, wallet_service: WalletService):
+    wallet = await wallet_service.create_wallet(wallet=WalletEntity())
+    async with ledger_service.session_manager as session:
+        await session.execute(update(WalletModel).where(WalletModel.oid == wallet.oid).values(balance=Decimal(7)))
+
+    report = await ledger_service.reconcile()
+
+    drifts = [drift for drift in report.drifts if drift.wallet_oid == wallet.oid]
+    assert [(drift.expected_balance, drift.actual_balance) for drift in drifts] == [(Decimal(0), Decimal(7))]
@@ -0,0 +1,20 @@
+import pytest
+
+from infra.rate_limits.store import MemoryRateLimitStore
+from logic.exceptions.admission import RateLimitExceededException
+from logic.services.rate_limits import RateLimiter
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_limits_wallets_and_clients_separately():
+    limiter = RateLimiter(store=MemoryRateLimitStore(), wallet_limit=2, client_limit=2, window=60)
+
+    await limiter.check(wallet_oid="wallet", client="first")
+    await limiter.check(wallet_oid="wallet", client="second")
+    with pytest.raises(RateLimitExceededException) as exception:
+        await limiter.check(wallet_oid="wallet", client="third")
+    assert exception.value.retry_after > 0
+
+    await limiter.check(wallet_oid="other", client="first")
+    with pytest.raises(RateLimitExceededException):
+        await limiter.check(wallet_oid="another", client="first")
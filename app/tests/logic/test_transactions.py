@@ -0,0 +1,325 @@
+import asyncio
+import random
+from datetime import timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+
+from application.api.filters import PaginationIn
+from domain.entities.wallets import (
+    OperationType,
+    Transaction as TransactionEntity,
+    Transfer as TransferEntity,
+    Wallet as WalletEntity,
+)
+from domain.exceptions import InvalidCursorException
+from domain.values.cursors import TransactionCursor
+from infra.database.manager import SessionManager
+from infra.metrics.instruments import WALLET_VERSION_CONFLICTS
+from infra.repositories.idempotency.memo_idempotency_repository import MemoryIdempotencyKeyRepository
+from infra.repositories.transactions.memo_transaction_repository import MemoryTransactionRepository
+from infra.repositories.wallets.memo_wallet_repository import MemoryWalletRepository
+from logic.exceptions.transactions import (
+    BulkOperationRolledBackException,
+    IdempotencyKeyMismatchException,
+    SameWalletTransferException,
+)
+from logic.exceptions.wallets import (
+    NotEnoughFundsException,
+    WalletNotFoundException,
+)
+from logic.services.transactions import (
+    BatchedTransactionService,
+    TransactionService,
+)
+from logic.services.wallets import (
+    WalletManagementService,
+    WalletService,
+)
+
+
+@pytest.mark.asyncio
+async def test_batched_transactions_resolved_individually(
+    batched_transaction_service: BatchedTransactionService,
+    wallet_service: WalletService,
+):
+    wallet = await wallet_service.create_wallet(wallet=WalletEntity())
+    transactions = [
+        TransactionEntity(operation_type=OperationType.DEPOSIT, amount=Decimal(100), wallet_oid=wallet.oid),
+        TransactionEntity(operation_type=OperationType.WITHDRAW, amount=Decimal(150), wallet_oid=wallet.oid),
+        TransactionEntity(operation_type=OperationType.WITHDRAW, amount=Decimal(60), wallet_oid=wallet.oid),
+        TransactionEntity(operation_type=OperationType.WITHDRAW, amount=Decimal(60), wallet_oid=wallet.oid),
+    ]
+
+    results = await asyncio.gather(
+        *(batched_transaction_service.create_transaction(transaction) for transaction in transactions),
+        return_exceptions=True,
+    )
+
+    assert results[0].oid == transactions[0].oid
+    assert isinstance(results[1], NotEnoughFundsException)
+    assert results[2].oid == transactions[2].oid
+    assert isinstance(results[3], NotEnoughFundsException)
+    assert (await wallet_service.get_wallet(wallet_oid=wallet.oid)).balance == Decimal(40)
+
+
+@pytest.mark.asyncio
+async def test_batched_transaction_wallet_not_found(batched_transaction_service: BatchedTransactionService):
+    transaction = TransactionEntity(operation_type=OperationType.DEPOSIT, amount=Decimal(100), wallet_oid="1234")
+
+    with pytest.raises(WalletNotFoundException):
+        await batched_transaction_service.create_transaction(transaction)
+
+
+@pytest.mark.asyncio
+async def test_withdraw_is_conditional_on_balance(transaction_service: TransactionService, wallet_service: WalletService):
+    wallet = await wallet_service.create_wallet(wallet=WalletEntity())
+    await transaction_service.create_transaction(
+        TransactionEntity(operation_type=OperationType.DEPOSIT, amount=Decimal(50), wallet_oid=wallet.oid),
+    )
+    await transaction_service.create_transaction(
+        TransactionEntity(operation_type=OperationType.WITHDRAW, amount=Decimal(50), wallet_oid=wallet.oid),
+    )
+
+    with pytest.raises(NotEnoughFundsException):
+        await transaction_service.create_transaction(
+            TransactionEntity(operation_type=OperationType.WITHDRAW, amount=Decimal("0.01"), wallet_oid=wallet.oid),
+        )
+    assert (await wallet_service.get_wallet(wallet_oid=wallet.oid)).balance == Decimal(0)
+
+
+@pytest.mark.asyncio
+async def test_get_transaction_list_by_cursor(transaction_service: TransactionService, wallet_service: WalletService):
+    wallet = await wallet_service.create_wallet(wallet=WalletEntity())
+    for amount in range(1, 6):
+        await transaction_service.create_transaction(
+            TransactionEntity(operation_type=OperationType.DEPOSIT, amount=Decimal(amount), wallet_oid=wallet.oid),
+        )
+
+    pages, cursor = [], None
+    while True:
+        page = await transaction_service.get_transactions_list(
+            wallet_oid=wallet.oid,
+            pagination=PaginationIn(limit=2, cursor=cursor),
+        )
+        if not page:
+            break
+        pages.append([transaction.amount for transaction in page])
+        cursor = TransactionCursor.from_transaction(page[-1]).encode()
+
+    assert pages == [[1, 2], [3, 4], [5]]
+
+
+@pytest.mark.asyncio
+async def test_get_transaction_list_invalid_cursor(transaction_service: TransactionService, wallet: WalletEntity):
+    with pytest.raises(InvalidCursorException):
+        await transaction_service.get_transactions_list(
+            wallet_oid=wallet.oid,
+            pagination=PaginationIn(cursor="not-a-cursor"),
+        )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("atomic", "expected_balances"),
+    [(False, [Decimal(70), Decimal(20)]), (True, [Decimal(0), Decimal(0)])],
+)
+async def test_create_transactions_bulk(
+    transaction_service: TransactionService,
+    wallet_service: WalletService,
+    atomic: bool,
+    expected_balances: list[Decimal],
+):
+    first, second = [await wallet_service.create_wallet(wallet=WalletEntity()) for _ in range(2)]
+    transactions = [
+        TransactionEntity(operation_type=OperationType.DEPOSIT, amount=Decimal(100), wallet_oid=first.oid),
+        TransactionEntity(operation_type=OperationType.DEPOSIT, amount=Decimal(20), wallet_oid=second.oid),
+        TransactionEntity(operation_type=OperationType.WITHDRAW, amount=Decimal(30), wallet_oid=first.oid),
+        TransactionEntity(operation_type=OperationType.WITHDRAW, amount=Decimal(30), wallet_oid=second.oid),
+        TransactionEntity(operation_type=OperationType.DEPOSIT, amount=Decimal(1), wallet_oid="1234"),
+    ]
+
+    results = await transaction_service.create_transactions_bulk(transactions=transactions, atomic=atomic)
+
+    assert isinstance(results[3], NotEnoughFundsException)
+    assert isinstance(results[4], WalletNotFoundException)
+    for result, transaction in zip(results[:3], transactions[:3], strict=True):
+        if atomic:
+            assert isinstance(result, BulkOperationRolledBackException)
+        else:
+            assert result.oid == transaction.oid
+    balances = [(await wallet_service.get_wallet(wallet_oid=wallet.oid)).balance for wallet in (first, second)]
+    assert balances == expected_balances
+
+
+@pytest.mark.asyncio
+async def test_create_transaction_with_idempotency_key_is_applied_once(
+    transaction_service: TransactionService,
+    wallet_service: WalletService,
+):
+    wallet = await wallet_service.create_wallet(wallet=WalletEntity())
+    key = str(uuid4())
+
+    first = await transaction_service.create_transaction(
+        TransactionEntity(operation_type=OperationType.DEPOSIT, amount=Decimal(100), wallet_oid=wallet.oid),
+        idempotency_key=key,
+    )
+    retries = await asyncio.gather(
+        *(
+            transaction_service.create_transaction(
+                TransactionEntity(operation_type=OperationType.DEPOSIT, amount=Decimal("100.00"), wallet_oid=wallet.oid),
+                idempotency_key=key,
+            )
+            for _ in range(3)
+        ),
+    )
+
+    assert {retry.oid for retry in retries} == {first.oid}
+    assert (await wallet_service.get_wallet(wallet_oid=wallet.oid)).balance == Decimal(100)
+
+
+@pytest.mark.asyncio
+async def test_create_transaction_idempotency_key_reused_for_another_operation(
+    transaction_service: TransactionService,
+    wallet_service: WalletService,
+):
+    wallet = await wallet_service.create_wallet(wallet=WalletEntity())
+    await transaction_service.create_transaction(
+        TransactionEntity(operation_type=OperationType.DEPOSIT, amount=Decimal(100), wallet_oid=wallet.oid),
+        idempotency_key="key",
+    )
+
+    with pytest.raises(IdempotencyKeyMismatchException):
+        await transaction_service.create_transaction(
+            TransactionEntity(operation_type=OperationType.WITHDRAW, amount=Decimal(100), wallet_oid=wallet.oid),
+            idempotency_key="key",
+        )
+
+
+@pytest.mark.asyncio
+async def test_purge_idempotency_keys(transaction_service: TransactionService, wallet_service: WalletService):
+    wallet = await wallet_service.create_wallet(wallet=WalletEntity())
+    transaction = TransactionEntity(operation_type=OperationType.DEPOSIT, amount=Decimal(10), wallet_oid=wallet.oid)
+    await transaction_service.create_transaction(transaction, idempotency_key="purged")
+
+    assert await transaction_service.purge_idempotency_keys(older_than=timedelta(0)) >= 1
+
+    retried = await transaction_service.create_transaction(
+        TransactionEntity(operation_type=OperationType.DEPOSIT, amount=Decimal(10), wallet_oid=wallet.oid),
+        idempotency_key="purged",
+    )
+    assert retried.oid != transaction.oid
+
+
+@pytest.mark.asyncio
+async def test_concurrent_cross_transfers_keep_total_balance(database_manager):
+    # the memory repositories hold real per-wallet locks until the session closes, unlike the shared SQLite
+    # connection, so opposite transfers would deadlock here if wallets were locked in any other order
+    session_manager = SessionManager(database_manager.SessionLocal)
+    wallet_repository = MemoryWalletRepository()
+    transaction_service = TransactionService(
+        session_manager=session_manager,
+        transaction_repository=MemoryTransactionRepository(),
+        wallet_manager_service=WalletManagementService(wallet_repository=wallet_repository),
+        idempotency_key_repository=MemoryIdempotencyKeyRepository(),
+    )
+    wallets = [await wallet_repository.add(WalletEntity(balance=Decimal(50))) for _ in range(100)]
+    randomizer = random.Random(0)  # noqa: S311
+
+    async def transfer(source: WalletEntity, destination: WalletEntity) -> TransferEntity | None:
+        try:
+            return await transaction_service.create_transfer(
+                TransferEntity(
+                    source_wallet_oid=source.oid,
+                    destination_wallet_oid=destination.oid,
+                    amount=Decimal(randomizer.randint(1, 60)),
+                ),
+            )
+        except NotEnoughFundsException:
+            return None
+
+    results = await asyncio.wait_for(
+        asyncio.gather(*(transfer(*randomizer.sample(wallets, 2)) for _ in range(1000))),
+        timeout=10,
+    )
+    transfers = [result for result in results if result is not None]
+
+    balances = {wallet.oid: (await wallet_repository.get_by_oid(wallet.oid)).balance for wallet in wallets}
+    expected = dict.fromkeys(balances, Decimal(50))
+    for result in transfers:
+        expected[result.source_wallet_oid] -= result.amount
+        expected[result.destination_wallet_oid] += result.amount
+    assert balances == expected
+    assert sum(balances.values()) == Decimal(50 * 100)
+    assert min(balances.values()) >= 0
+
+    first = transfers[0]
+    debit, credit = [
+        transaction
+        for wallet_oid in (first.source_wallet_oid, first.destination_wallet_oid)
+        for transaction in await transaction_service.get_transactions_list(
+            wallet_oid=wallet_oid,
+            pagination=PaginationIn(limit=100),
+        )
+        if transaction.transfer_oid == first.oid
+    ]
+    assert (debit.amount, credit.amount) == (-first.amount, first.amount)
+    assert debit.counterparty_wallet_oid == credit.wallet_oid
+
+    with pytest.raises(SameWalletTransferException):
+        await transaction_service.create_transfer(
+            TransferEntity(
+                source_wallet_oid=first.source_wallet_oid,
+                destination_wallet_oid=first.source_wallet_oid,
+                amount=Decimal(1),
+            ),
+        )
+
+
+class InterleavingWalletRepository(MemoryWalletRepository):
+    # yields between reading a wallet and writing it, so concurrent operations collide there
+    async def get_current(self, wallet_oid: str, *args, **kwargs) -> WalletEntity | None:
+        wallet = await super().get_current(wallet_oid, *args, **kwargs)
+        await asyncio.sleep(0)
+        return wallet
+
+
+@pytest.mark.asyncio
+async def test_optimistic_operations_retry_on_version_conflicts(database_manager):
+    wallet_repository = InterleavingWalletRepository()
+    transaction_service = TransactionService(
+        session_manager=SessionManager(database_manager.SessionLocal),
+        transaction_repository=MemoryTransactionRepository(),
+        wallet_manager_service=WalletManagementService(wallet_repository=wallet_repository),
+        idempotency_key_repository=MemoryIdempotencyKeyRepository(),
+        concurrency_mode="optimistic",
+        max_retries=3,
+        retry_backoff=0.0001,
+    )
+    wallet = await wallet_repository.add(WalletEntity(balance=Decimal(100)))
+    conflicts = WALLET_VERSION_CONFLICTS.labels().value
+    randomizer = random.Random(0)  # noqa: S311
+
+    async def operate(operation_type: OperationType, amount: int) -> TransactionEntity | None:
+        try:
+            return await transaction_service.create_transaction(
+                TransactionEntity(operation_type=operation_type, amount=Decimal(amount), wallet_oid=wallet.oid),
+            )
+        except NotEnoughFundsException:
+            return None
+
+    results = await asyncio.wait_for(
+        asyncio.gather(
+            *(
+                operate(randomizer.choice((OperationType.DEPOSIT, OperationType.WITHDRAW)), randomizer.randint(1, 20))
+                for _ in range(200)
+            ),
+        ),
+        timeout=10,
+    )
+
+    balance = (await wallet_repository.get_by_oid(wallet.oid)).balance
+    assert balance == Decimal(100) + sum(result.balance_delta for result in results if result is not None)
+    assert balance >= 0
+    assert WALLET_VERSION_CONFLICTS.labels().value > conflicts
@@ -0,0 +1,122 @@
+from decimal import Decimal
+
+import pytest
+
+from domain.entities.wallets import (
+    OperationType,
+    Transaction as TransactionEntity,
+    Wallet as WalletEntity,
+)
+from infra.cache.lru import LRUCache
+from infra.cache.wallets import MemoryWalletCache
+from infra.database.manager import SessionManager
+from infra.repositories.idempotency.sqlalchemy_idempotency_repository import SQLAlchemyIdempotencyKeyRepository
+from infra.repositories.transactions.sqlalchemy_transaction_repository import SQLAlchemyTransactionRepository
+from infra.repositories.wallets.cached_wallet_repository import CachedWalletRepository
+from infra.repositories.wallets.sqlalchemy_wallet_repository import SQLAlchemyWalletRepository
+from logic.services.transactions import TransactionService
+from logic.services.wallets import (
+    WalletManagementService,
+    WalletService,
+)
+
+
+@pytest.fixture
+def wallet_cache() -> MemoryWalletCache:
+    return MemoryWalletCache(max_size=100, ttl=60)
+
+
+@pytest.fixture
+def cached_services(database_manager, wallet_cache: MemoryWalletCache) -> tuple[WalletService, TransactionService]:
+    session_manager = SessionManager(database_manager.SessionLocal)
+    repository = CachedWalletRepository(repository=SQLAlchemyWalletRepository(), cache=wallet_cache)
+    return (
+        WalletService(session_manager=session_manager, wallet_repository=repository),
+        TransactionService(
+            session_manager=session_manager,
+            transaction_repository=SQLAlchemyTransactionRepository(),
+            wallet_manager_service=WalletManagementService(wallet_repository=repository),
+            idempotency_key_repository=SQLAlchemyIdempotencyKeyRepository(),
+        ),
+    )
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.evictions) == (2, 1, 1)
+
+
+def test_lru_cache_expires_entries():
+    cache = LRUCache(max_size=2, ttl=-1)
+    cache.set("a", 1)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_stale_fill_is_dropped_after_invalidation(wallet_cache: MemoryWalletCache):
+    version = await wallet_cache.current_version()
+    await wallet_cache.invalidate("wallet")
+    await wallet_cache.set("wallet", WalletEntity(oid="wallet"), version)
+
+    assert await wallet_cache.get("wallet") is None
+
+
+@pytest.mark.asyncio
+async def test_committed_write_invalidates_cached_wallet(cached_services, wallet_cache: MemoryWalletCache):
+    wallet_service, transaction_service = cached_services
+    wallet = await wallet_service.create_wallet(wallet=WalletEntity())
+    assert (await wallet_service.get_wallet(wallet_oid=wallet.oid)).balance == 0
+    assert wallet_cache.stats().hits == 1
+
+    await transaction_service.create_transaction(
+        TransactionEntity(operation_type=OperationType.DEPOSIT, amount=Decimal(10), wallet_oid=wallet.oid),
+    )
+
+    assert (await wallet_service.get_wallet(wallet_oid=wallet.oid)).balance == Decimal(10)
+
+
+@pytest.mark.asyncio
+async def test_rolled_back_write_keeps_cached_balance(cached_services, wallet_cache: MemoryWalletCache):
+    wallet_service, transaction_service = cached_services
+    wallet = await wallet_service.create_wallet(wallet=WalletEntity())
+
+    async def deposit_and_fail():
+        async with transaction_service.session_manager as session:
+            await transaction_service.wallet_manager_service._apply_transaction(
+                transaction=TransactionEntity(
+                    operation_type=OperationType.DEPOSIT,
+                    amount=Decimal(10),
+                    wallet_oid=wallet.oid,
+                ),
+                session=session,
+            )
+            await wallet_service.wallet_repository.get_by_oid(wallet_oid=wallet.oid, session=session)
+            raise RuntimeError
+
+    with pytest.raises(RuntimeError):
+        await deposit_and_fail()
+
+    assert (await wallet_cache.get(wallet.oid)).balance == 0
+    assert (await wallet_service.get_wallet(wallet_oid=wallet.oid)).balance == 0
+
+
+@pytest.mark.asyncio
+async def test_resharding_invalidates_cached_wallet(cached_services, wallet_cache: MemoryWalletCache):
+    wallet_service, _ = cached_services
+    wallet = await wallet_service.create_wallet(wallet=WalletEntity())
+    await wallet_service.get_wallet(wallet_oid=wallet.oid)
+
+    async with wallet_service.session_manager as session:
+        assert await wallet_service.wallet_repository.reshard_balance(wallet_oid=wallet.oid, shards=2, session=session)
+
+    assert await wallet_cache.get(wallet.oid) is None
+    assert (await wallet_service.get_wallet(wallet_oid=wallet.oid)).version == wallet.version + 1
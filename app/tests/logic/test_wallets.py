@@ -1,4 +1,12 @@
+from decimal import Decimal
+
 import pytest
+from sqlalchemy import (
+    event,
+    update,
+)
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import ORMExecuteState
 
 from application.api.filters import PaginationIn
 from domain.entities.wallets import (
@@ -6,11 +14,20 @@ from domain.entities.wallets import (
     Transaction as TransactionEntity,
     Wallet as WalletEntity,
 )
+from infra.database.manager import SessionManager
+from infra.database.models import WalletBalanceShardModel
+from infra.metrics.instruments import WALLET_LOCK_WAIT
+from infra.repositories.wallets.sqlalchemy_wallet_repository import SQLAlchemyWalletRepository
 from logic.exceptions.wallets import (
     NotEnoughFundsException,
     WalletNotFoundException,
 )
 from logic.services.transactions import TransactionService
+from logic.services.wallets import (
+    WalletManagementService,
+    WalletService,
+)
+from tests.logic.fixtures import DatabaseManager
 
 
 @pytest.mark.asyncio
@@ -53,3 +70,121 @@ async def test_not_enough_funds_exception(transaction_service: TransactionServic
     )
     with pytest.raises(NotEnoughFundsException):
         await transaction_service.create_transaction(transaction)
+
+
+@pytest.mark.asyncio
+async def test_sharded_wallet_balance(database_manager: DatabaseManager, transaction_service: TransactionService):
+    repository = SQLAlchemyWalletRepository(balance_shards=4)
+    session_manager = SessionManager(database_manager.SessionLocal)
+    wallet_service = WalletService(session_manager=session_manager, wallet_repository=repository)
+    sharded_transaction_service = TransactionService(
+        session_manager=session_manager,
+        transaction_repository=transaction_service.transaction_repository,
+        wallet_manager_service=WalletManagementService(wallet_repository=repository),
+        idempotency_key_repository=transaction_service.idempotency_key_repository,
+    )
+    wallet = await wallet_service.create_wallet(WalletEntity())
+
+    for _ in range(20):
+        await sharded_transaction_service.create_transaction(
+            TransactionEntity(operation_type=OperationType.DEPOSIT, amount=Decimal(5), wallet_oid=wallet.oid),
+        )
+    assert (await wallet_service.get_wallet(wallet.oid)).balance == Decimal(100)
+
+    # needs the shard rows collected into the wallet row
+    await sharded_transaction_service.create_transaction(
+        TransactionEntity(operation_type=OperationType.WITHDRAW, amount=Decimal(90), wallet_oid=wallet.oid),
+    )
+    with pytest.raises(NotEnoughFundsException):
+        await sharded_transaction_service.create_transaction(
+            TransactionEntity(operation_type=OperationType.WITHDRAW, amount=Decimal(11), wallet_oid=wallet.oid),
+        )
+
+    async with session_manager as session:
+        assert await repository.reshard_balance(wallet_oid=wallet.oid, shards=1, session=session)
+    assert (await wallet_service.get_wallet(wallet.oid)).balance == Decimal(10)
+
+
+@pytest.mark.asyncio
+async def test_create_and_lookup_wallets(database_manager: DatabaseManager):
+    repository = SQLAlchemyWalletRepository(balance_shards=2)
+    wallet_service = WalletService(
+        session_manager=SessionManager(database_manager.SessionLocal),
+        wallet_repository=repository,
+    )
+    wallets = await wallet_service.create_wallets(count=3)
+    oids = [wallet.oid for wallet in reversed(wallets)]
+
+    found = await wallet_service.get_wallets(wallet_oids=[*oids, "unknown", oids[0]])
+
+    assert [wallet and wallet.oid for wallet in found] == [*oids, None, oids[0]]
+    assert all(wallet.balance == Decimal(0) for wallet in found if wallet is not None)
+
+
+@pytest.mark.asyncio
+async def test_update_balance_at_version(database_manager: DatabaseManager, wallet_service: WalletService):
+    repository = SQLAlchemyWalletRepository()
+    wallet = await wallet_service.create_wallet(WalletEntity())
+
+    async with SessionManager(database_manager.SessionLocal) as session:
+        read = await repository.get_by_oid(wallet_oid=wallet.oid, session=session)
+        assert await repository.update_balance_at_version(wallet.oid, Decimal(5), read.version, session) == Decimal(5)
+        assert await repository.update_balance_at_version(wallet.oid, Decimal(5), read.version, session) is None
+        assert await repository.update_balance_at_version(wallet.oid, Decimal(-6), read.version + 1, session) is None
+
+    assert (await wallet_service.get_wallet(wallet.oid)).version == read.version + 1
+
+
+@pytest.mark.asyncio
+async def test_update_balance_at_version_collects_shards(database_manager: DatabaseManager):
+    repository = SQLAlchemyWalletRepository(balance_shards=2)
+    wallet = await WalletService(
+        session_manager=SessionManager(database_manager.SessionLocal),
+        wallet_repository=repository,
+    ).create_wallet(WalletEntity())
+
+    async with SessionManager(database_manager.SessionLocal) as session:
+        await session.execute(
+            update(WalletBalanceShardModel)
+            .where(WalletBalanceShardModel.wallet_oid == wallet.oid)
+            .values(balance=Decimal(10)),
+        )
+        read = await repository.get_current(wallet_oid=wallet.oid, session=session)
+        assert read.balance == Decimal(10)
+        # the wallet row alone holds nothing, the debit is covered by collecting the shard
+        assert await repository.update_balance_at_version(wallet.oid, Decimal(-7), read.version, session) == 3
+
+
+@pytest.mark.asyncio
+async def test_collecting_shards_does_not_block_foreign_key_checks(database_manager: DatabaseManager):
+    repository = SQLAlchemyWalletRepository(balance_shards=2)
+    wallet = await WalletService(
+        session_manager=SessionManager(database_manager.SessionLocal),
+        wallet_repository=repository,
+    ).create_wallet(WalletEntity())
+    locks = []
+
+    def record_lock(state: ORMExecuteState):
+        if state.is_select and state.statement._for_update_arg is not None:
+            compiled = str(state.statement.compile(dialect=postgresql.dialect()))
+            locks.append(compiled[compiled.rindex(" FOR ") + 1 :])
+
+    async with SessionManager(database_manager.SessionLocal) as session:
+        event.listen(session.sync_session, "do_orm_execute", record_lock)
+        await repository.withdraw(wallet_oid=wallet.oid, amount=Decimal(1), session=session)
+
+    # a deposit holding a shard row takes FOR KEY SHARE on the wallet row when it inserts its transaction
+    assert locks == ["FOR NO KEY UPDATE", "FOR UPDATE"]
+
+
+@pytest.mark.asyncio
+async def test_balance_updates_time_the_row_lock(transaction_service: TransactionService, wallet: WalletEntity):
+    lock_wait = WALLET_LOCK_WAIT.labels("sqlalchemy")
+    observed = lock_wait.count
+
+    for operation_type in (OperationType.DEPOSIT, OperationType.WITHDRAW):
+        await transaction_service.create_transaction(
+            TransactionEntity(operation_type=operation_type, amount=Decimal(1), wallet_oid=wallet.oid),
+        )
+
+    assert lock_wait.count == observed + 2